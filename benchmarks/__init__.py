@@ -0,0 +1,11 @@
+"""
+Benchmarks for the data pipeline: loading, post-processing, validation and the SQL build.
+
+Every step is timed separately, so that the effect of a change can be attributed to a stage.
+Run from the root project directory with `python -m benchmarks`.
+Results can be saved as a JSON baseline, and later runs are compared against it
+to flag stages that became slower than a threshold.
+"""
+
+from .stages import StageResult, run_pipeline, run_benchmark
+from .results import save_results, load_results, compare_results
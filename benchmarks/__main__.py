@@ -0,0 +1,63 @@
+import sys
+import click
+from os.path import abspath, join, dirname, exists
+
+from .stages import run_benchmark
+from .results import save_results, load_results, compare_results
+
+default_baseline = join(dirname(dirname(abspath(__file__))), '.cache', 'benchmarks', 'baseline.json')
+
+def format_change(result, base):
+    if base is None:
+        return ''
+    if base.wall == 0:
+        return 'n/a'
+    return f"{(result.wall / base.wall - 1) * 100:+.1f}%"
+
+def print_results(results, baseline, regressions):
+    regressed = set(r.name for (r, _) in regressions)
+    baseline = { r.name:r for r in baseline }
+
+    print(f"{'stage':<42} {'wall (ms)':>10} {'peak rss (MB)':>14} {'rows':>8} {'change':>9}")
+    for result in results:
+        rss = f"{result.peak_rss_kb / 1024:.1f}" if result.peak_rss_kb is not None else '-'
+        rows = result.rows if result.rows is not None else '-'
+        change = format_change(result, baseline.get(result.name, None))
+        flag = '  REGRESSION' if result.name in regressed else ''
+        print(f"{result.name:<42} {result.wall * 1000:>10.1f} {rss:>14} {rows:>8} {change:>9}{flag}")
+
+    total = sum(r.wall for r in results)
+    print(f"{'total':<42} {total * 1000:>10.1f}")
+
+@click.command()
+@click.option('--repeat', default=3, help="Number of timed runs, after an untimed warm-up run. Each stage reports its median run.")
+@click.option('--baseline', default=default_baseline, help="Baseline JSON file to compare against and save to.")
+@click.option('--save', is_flag=True, help="Save the results as the new baseline.")
+@click.option('--output', default=None, help="Also save the results to this JSON file.")
+@click.option('--threshold', default=0.2, help="Flag stages slower than the baseline by more than this ratio and their run to run spread.")
+@click.option('--derived/--no-derived', default=True, help="Include the lookup and search tables.")
+def benchmark_cmd(repeat, baseline, save, output, threshold, derived):
+    "Times every stage of the data pipeline, and compares it against a saved baseline"
+    results = run_benchmark(repeat=repeat, derived=derived)
+
+    baseline_results = []
+    if exists(baseline) and not save:
+        baseline_results = load_results(baseline)
+    regressions = compare_results(baseline_results, results, threshold=threshold)
+
+    print_results(results, baseline_results, regressions)
+
+    if output:
+        save_results(output, results)
+    if save:
+        save_results(baseline, results)
+        print(f"Saved baseline to {baseline}")
+    elif not baseline_results:
+        print("No baseline to compare against, use --save to create one")
+
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed by more than {threshold * 100:.0f}%")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    benchmark_cmd()
@@ -0,0 +1,49 @@
+import os
+import json
+import sqlite3
+import platform
+from os.path import dirname
+
+from .stages import StageResult
+
+def save_results(filename, results):
+    "Saves a list of StageResults as JSON, along with information about the machine that ran them"
+    data = {
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'sqlite': sqlite3.sqlite_version
+        },
+        'stages': { r.name:r.to_dict() for r in results }
+    }
+
+    if dirname(filename):
+        os.makedirs(dirname(filename), exist_ok=True)
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+def load_results(filename):
+    "Loads a list of StageResults saved by save_results"
+    with open(filename, encoding='utf-8') as f:
+        data = json.load(f)
+    return [StageResult.from_dict(name, values) for name, values in data['stages'].items()]
+
+def compare_results(baseline, results, *, threshold=0.2, min_seconds=0.05):
+    """Compares results against a baseline, returning (result, baseline_result) pairs for regressions.
+    A stage regressed if it became slower by more than threshold (a ratio of the baseline time),
+    and by more than its noise: the spread between the runs of either side, and at least min_seconds,
+    so that run to run noise in fast or unstable stages isn't flagged.
+    Stages missing from either side are ignored."""
+    baseline = { r.name:r for r in baseline }
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name, None)
+        if base is None:
+            continue
+        slowdown = result.wall - base.wall
+        noise = max(min_seconds, base.spread, result.spread)
+        if slowdown > noise and slowdown > base.wall * threshold:
+            regressions.append((result, base))
+    return regressions
@@ -0,0 +1,149 @@
+import io
+import os
+import sys
+import time
+import statistics
+import tempfile
+import contextlib
+from types import SimpleNamespace
+
+import mhdata.sql as db
+from mhdata.load.loaddata import data_loaders
+from mhdata.load.process import processors
+from mhdata.load.validate import validators
+from mhdata.build.sql import build_languages, build_categories, build_derived_tables
+from mhdata.build.itemtracker import ItemTracker
+from mhdata.build.recipes import allocate_recipes
+from mhdata.build.lookups import lookup_tables
+
+try:
+    import resource
+except ImportError:
+    resource = None # not available on Windows
+
+class StageResult:
+    """The measurements of a single stage of the pipeline.
+    wall is in seconds. peak_rss_kb is the peak memory usage of the process after the stage ran,
+    so the first stage reaching the overall peak is the one that used it.
+    rows is the number of entries or database rows the stage produced, if it applies.
+    spread is the difference between the slowest and fastest runs of a combined result, in seconds."""
+
+    def __init__(self, name, wall, peak_rss_kb=None, rows=None, spread=0.0):
+        self.name = name
+        self.wall = wall
+        self.peak_rss_kb = peak_rss_kb
+        self.rows = rows
+        self.spread = spread
+
+    def to_dict(self):
+        return { 'wall': self.wall, 'peak_rss_kb': self.peak_rss_kb, 'rows': self.rows, 'spread': self.spread }
+
+    @classmethod
+    def from_dict(cls, name, data):
+        return cls(name, data['wall'], data.get('peak_rss_kb', None), data.get('rows', None), data.get('spread', 0.0))
+
+    def __repr__(self):
+        return (f"StageResult({self.name!r}, wall={self.wall:.4f}, peak_rss_kb={self.peak_rss_kb}, " +
+            f"rows={self.rows}, spread={self.spread:.4f})")
+
+def get_peak_rss_kb():
+    "Returns the peak resident memory of this process in KiB, or None if it can't be measured"
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024 # macOS reports bytes
+    return peak
+
+def measure(name, fn):
+    "Runs fn, returning a StageResult. fn returns the number of rows it produced, or None"
+    # Stages print progress messages, which would distort the timings of small stages
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        rows = fn()
+        wall = time.perf_counter() - start
+    return StageResult(name, wall, get_peak_rss_kb(), rows)
+
+def _count_rows(sessionbuilder, tables):
+    engine = sessionbuilder.kw['bind']
+    with engine.connect() as conn:
+        return sum(conn.execute(f'SELECT count(*) FROM "{t}"').scalar() for t in tables)
+
+def run_pipeline(output_filename, *, derived=True):
+    """Runs every stage of the pipeline once, in the same order as a build,
+    and returns the list of StageResults. The source data is loaded without the load cache.
+    If derived is set, the lookup and search tables are built as well."""
+    results = []
+    def run(name, fn):
+        results.append(measure(name, fn))
+
+    loaded = {}
+    for name, loader in data_loaders.items():
+        def load(name=name, loader=loader):
+            loaded[name] = loader()
+            return len(loaded[name])
+        run('load.' + name, load)
+    mhdata = SimpleNamespace(**loaded)
+
+    for name, processor in processors.items():
+        run('process.' + name, lambda: processor(mhdata))
+
+    for validator in validators:
+        def check(validator=validator):
+            validator(mhdata)
+        run('validate.' + validator.__name__.replace('validate_', '', 1), check)
+
+    sessionbuilder = db.recreate_database(output_filename, fast=True)
+    item_tracker = ItemTracker(mhdata)
+    recipes = None
+
+    def allocate():
+        nonlocal recipes
+        recipes = allocate_recipes(mhdata)
+        return len(recipes.recipes)
+    run('build.allocate_recipes', allocate)
+
+    def build_language_rows():
+        with db.session_scope(sessionbuilder) as session:
+            build_languages(session)
+        return _count_rows(sessionbuilder, ['language'])
+    run('build.languages', build_language_rows)
+
+    for category in build_categories:
+        def build_category(category=category):
+            with db.session_scope(sessionbuilder) as session:
+                category.build(session, mhdata, item_tracker, recipes)
+            return _count_rows(sessionbuilder, [t.__tablename__ for t in category.tables])
+        run('build.' + category.name, build_category)
+
+    if derived:
+        def build_derived():
+            build_derived_tables(sessionbuilder, lookups=True, search=True)
+            return _count_rows(sessionbuilder, [name for (name, _, _) in lookup_tables] + ['search_text'])
+        run('build.derived_tables', build_derived)
+
+    run('build.finalize', lambda: db.finalize_database(sessionbuilder))
+    return results
+
+def run_benchmark(*, repeat=3, warmup=True, derived=True):
+    """Runs the pipeline repeat times, and returns the combined StageResults.
+    If warmup is set, the pipeline runs once more beforehand without being timed,
+    so that imports, compiled decoders and the file system cache don't count towards the first stages.
+    The wall time of each stage is the median of the timed runs, and its spread is the range of the runs.
+    Peak memory is taken from the first run, as later runs start from the peak of the previous ones."""
+    runs = []
+    first_run = None
+    with tempfile.TemporaryDirectory() as workdir:
+        output_filename = os.path.join(workdir, 'benchmark.db')
+        if warmup:
+            first_run = run_pipeline(output_filename, derived=derived)
+        for _ in range(repeat):
+            runs.append(run_pipeline(output_filename, derived=derived))
+
+    combined = []
+    for idx, stage_runs in enumerate(zip(*runs)):
+        first = first_run[idx] if first_run else stage_runs[0]
+        walls = [r.wall for r in stage_runs]
+        wall = statistics.median(walls)
+        combined.append(StageResult(first.name, wall, first.peak_rss_kb, first.rows, max(walls) - min(walls)))
+    return combined
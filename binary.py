@@ -14,9 +14,10 @@ def binary_cmd():
     "Commands to work with binary data."
 
 @binary_cmd.command()
-def update():
+@click.option('--workers', default=1, help="Number of processes used to load quests. 0 uses one per core.")
+def update(workers):
     "Performs an update using ingame binaries"
-    binary.update_all()
+    binary.update_all(workers=workers or None)
 
 @binary_cmd.command()
 @click.argument('file', type=click.Path(exists=True))
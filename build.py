@@ -15,10 +15,17 @@ if sys.version_info < (3,6):
 
 
 @click.command()
-def build_cmd():
-    data = load_data_processed()
+@click.option('--workers', default=1, help="Number of processes used to load and build data. 0 uses one per core.")
+@click.option('--cache/--no-cache', default=True, help="Reuse data loaded by a previous run if the source files are unchanged.")
+@click.option('--incremental', is_flag=True, help="Only rebuild the tables of an existing mhw.db whose data changed.")
+@click.option('--fingerprint', is_flag=True, help="Save the fingerprints of a full build, so that it can be updated with --incremental.")
+@click.option('--lookups', is_flag=True, help="Add denormalized lookup tables for common app queries.")
+@click.option('--search', is_flag=True, help="Add a full text search table over all translated names and descriptions.")
+def build_cmd(workers, cache, incremental, fingerprint, lookups, search):
+    data = load_data_processed(workers=workers or None, use_cache=cache)
     output_filename = 'mhw.db'
-    build.build_sql_database(output_filename, data)
+    build.build_sql_database(output_filename, data,
+        incremental=incremental, fingerprint=fingerprint, workers=workers or None, lookups=lookups, search=search)
     
 if __name__ == '__main__':
     build_cmd()
@@ -36,12 +36,28 @@ lang_map = {
 def get_chunk_root():
     return CHUNK_DIRECTORY
 
-def load_schema(schema: Union[Type[ftypes.StructFile],Type[sr.Readable]], relative_dir: str) -> ftypes.StructFile:
-    "Uses an ftypes struct file class to load() a file relative to the chunk directory"
-    with open(join(CHUNK_DIRECTORY, relative_dir), 'rb') as f:
-        if isinstance(schema, sr.Readable) or issubclass(schema, sr.Readable):
-            return sr.read_struct(bytearray(f.read()), schema)
-        return schema.load(f)
+def load_schema(schema: Union[Type[ftypes.StructFile],Type[sr.Readable]], relative_dir: str, *, mapped=False) -> ftypes.StructFile:
+    """Uses an ftypes struct file class or a readable to load a file relative to the chunk directory.
+    
+    The file is read into a bytearray. If mapped is set and the schema is a struct file,
+    it is memory mapped copy on write instead, so fields are read from the file as they are accessed,
+    and only the pages that are modified are copied. The map stays open as long as the struct file
+    or any of its entries exist, so only use it for large files whose entries are kept.
+    In both cases, modifying the loaded data never changes the file.
+    """
+    path = join(CHUNK_DIRECTORY, relative_dir)
+    is_readable = isinstance(schema, sr.Readable) or issubclass(schema, sr.Readable)
+
+    # Readables are copied out into new objects, so the file isn't needed after reading
+    if mapped and not is_readable:
+        data = sr.map_file(path)
+    else:
+        with open(path, 'rb') as f:
+            data = bytearray(f.read())
+
+    if is_readable:
+        return sr.read_struct(data, schema)
+    return schema.from_buffer(data)
 
 class GmdGroup(Mapping[Union[int, str], Mapping[str,str]]):
     def __init__(self, indexed_entries, keyed_entries):
@@ -310,9 +310,9 @@ class WeaponDataLoader():
 
         weapon_text = load_text(f"common/text/steam/{binary_weapon_type}")
         if weapon_type in cfg.weapon_types_melee:
-            weapon_binaries = load_schema(wp_dat.WpDat, f"common/equip/{binary_weapon_type}.wp_dat")
+            weapon_binaries = load_schema(wp_dat.WpDat, f"common/equip/{binary_weapon_type}.wp_dat", mapped=True)
         else:
-            weapon_binaries = load_schema(wp_dat_g.WpDatG, f"common/equip/{binary_weapon_type}.wp_dat_g")
+            weapon_binaries = load_schema(wp_dat_g.WpDatG, f"common/equip/{binary_weapon_type}.wp_dat_g", mapped=True)
         
         equip_type = self._equip_types[weapon_type]
 
@@ -541,7 +541,7 @@ class ArmorCollection():
         # Parses binary armor data.
         armor_by_setid = {}
         charm_map = {}
-        for armor_binary in load_schema(am_dat.AmDat, "common/equip/armor.am_dat").entries:
+        for armor_binary in load_schema(am_dat.AmDat, "common/equip/armor.am_dat", mapped=True).entries:
             name_dict = armor_text[armor_binary.gmd_name_index]
             
             if not name_dict or not name_dict['en']: continue
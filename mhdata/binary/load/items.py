@@ -81,7 +81,7 @@ class ItemCollection:
         self.items = [
             Item(i, self._resolve_name(i), self.item_text[i.id * 2 + 1])
             for i in sorted(
-                load_schema(itm.Itm, "common/item/itemData.itm").entries,
+                load_schema(itm.Itm, "common/item/itemData.itm", mapped=True).entries,
                 key=lambda i: i.order)
             if i.id not in item_dummies]
 
@@ -2,8 +2,10 @@
 Module file detected to loading quest binary data, but not saving or converting it.
 '''
 
-from typing import Iterable
+from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import os
 import re
 
 from .bcore import load_schema, load_text, get_chunk_root
@@ -35,38 +37,61 @@ class QuestInfo:
         star = self.binary.header.starRating
         return star - 10 if star > 10 else star
 
-def load_quests() -> Iterable[QuestInfo]:
-    quests = []
-    quest_base_path = Path(get_chunk_root()).joinpath('quest')
-    rem_base_path = quest_base_path.joinpath('rem')
+def get_quest_id(path) -> int:
+    "Returns the quest id of a questData_*.mib file"
+    return int(re.search(r'([0-9]+).mib$', Path(path).name)[1])
+
+def find_quest_files(quest_base_path) -> List[Path]:
+    "Returns the paths of every quest file under the quest folder, in quest id order"
+    return sorted(Path(quest_base_path).rglob("*.mib"), key=get_quest_id)
+
+def load_quest_info(path) -> Optional[QuestInfo]:
+    """Loads a quest file with its text and reward files.
+    Returns None for quests that are unavailable or invalid."""
+    path = Path(path)
+    rem_base_path = Path(get_chunk_root()).joinpath('quest', 'rem')
 
-    quest_files = quest_base_path.rglob("*.mib")
+    quest_text_fname = path.stem.replace('questData_', 'q')
+    quest_text = load_text(f'common/text/quest/{quest_text_fname}')
+    name = quest_text[0]
+    objective = quest_text[1]
+    # 2 is failure condition, 3 is quest giver
+    description = quest_text[4]
 
-    for path in quest_files:
-        quest_text_fname = path.stem.replace('questData_', 'q')
-        quest_text = load_text(f'common/text/quest/{quest_text_fname}')
-        name = quest_text[0]
-        objective = quest_text[1]
-        # 2 is failure condition, 3 is quest giver
-        description = quest_text[4]
+    # todo: disable this line if we wanna find out other ways to mark something as invalid
+    if name['en'] in ('Unavailable', 'Invalid Message'):
+        return None
 
-        # todo: disable this line if we wanna find out other ways to mark something as invalid
-        if name['en'] in ('Unavailable', 'Invalid Message'):
-            continue
+    quest_id = get_quest_id(path)
+    binary = load_quest(path)
 
-        quest_id = int(re.search(r'([0-9]+).mib$', path.name)[1])
-        binary = load_quest(path)
+    if binary.header.starRating == 0:
+        return None
 
-        if binary.header.starRating == 0:
-            continue
+    # Load REMS (reward files)
+    rem_ids = binary.objective.rem_ids
+    rem_files = [rem_base_path.joinpath(f'remData_{rem_id}.rem') for rem_id in rem_ids]
+    rem_files = filter(lambda r: r.exists(), rem_files)
+    rem_files = [read_struct_from_file(path, RemFile) for path in rem_files]
 
-        # Load REMS (reward files)
-        rem_ids = binary.objective.rem_ids
-        rem_files = [rem_base_path.joinpath(f'remData_{rem_id}.rem') for rem_id in rem_ids]
-        rem_files = filter(lambda r: r.exists(), rem_files)
-        rem_files = [read_struct_from_file(path, RemFile) for path in rem_files]
+    return QuestInfo(quest_id, name, objective, description, binary, rem_files)
 
-        quests.append(QuestInfo(quest_id, name, objective, description, binary, rem_files))
+def load_quests(*, workers=1) -> List[QuestInfo]:
+    """Loads every available quest, in quest id order.
+
+    If workers is not 1, quests are loaded in parallel over a process pool
+    of that many processes. If None, the pool uses one process per core.
+    The result is the same regardless of the number of workers.
+    """
+    quest_base_path = Path(get_chunk_root()).joinpath('quest')
+    quest_files = find_quest_files(quest_base_path)
 
-    return quests
+    if workers == 1:
+        quests = [load_quest_info(path) for path in quest_files]
+    else:
+        # Each quest is small, so they are sent in chunks to reduce the overhead per quest
+        chunksize = max(1, len(quest_files) // ((workers or os.cpu_count() or 1) * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            quests = list(executor.map(load_quest_info, quest_files, chunksize=chunksize))
 
+    return [quest for quest in quests if quest is not None]
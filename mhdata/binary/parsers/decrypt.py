@@ -1,18 +1,66 @@
 """
-File used to decrypt certain files. 
+File used to decrypt certain files.
 Decryption scheme was learned from the open source QuestDataDump project.
+
+Capcom's scheme is Blowfish in ECB mode over byte swapped 4 byte words.
+The words are swapped in place with array.byteswap(), and the cipher decrypts in place,
+so decrypting a file only copies it when reading it and when returning the result.
 """
 
+import os
+from array import array
 from Crypto.Cipher import Blowfish
 
-def chunks(l, n):
-    """Yield successive n-sized chunks from l."""
-    for i in range(0, len(l), n):
-        yield l[i:i + n]
+# Array type code of unsigned 4 byte words
+_word_code = 'I' if array('I').itemsize == 4 else 'L'
+
+# Ciphers by key. ECB ciphers keep no state between calls, so one is shared for every file of a key
+_ciphers = {}
+
+def _get_cipher(key):
+    try:
+        return _ciphers[key]
+    except KeyError:
+        result = _ciphers[key] = Blowfish.new(key, Blowfish.MODE_ECB)
+        return result
 
 def endianness_reversal(data):
-    return b''.join(map(lambda x: x[::-1],chunks(data, 4)))
+    "Returns data as bytes, with the byte order of every 4 byte word reversed"
+    aligned = len(data) - len(data) % 4
+    words = array(_word_code)
+    words.frombytes(data[:aligned])
+    words.byteswap()
+    return words.tobytes() + bytes(data[aligned:])[::-1]
+
+def _decrypt_words(words, key):
+    "Decrypts an array of words in place, and returns the decrypted bytes"
+    words.byteswap()
+    with memoryview(words) as view, view.cast('B') as data:
+        _get_cipher(key).decrypt(data, output=data)
+    words.byteswap()
+    return words.tobytes()
 
 def CapcomBlowfish(data, key):
-    cipher = Blowfish.new(key, Blowfish.MODE_ECB)
-    return endianness_reversal(cipher.decrypt(endianness_reversal(data)))
+    if len(data) % Blowfish.block_size != 0:
+        raise ValueError(f"Data must be a multiple of {Blowfish.block_size} bytes long")
+    words = array(_word_code)
+    words.frombytes(data)
+    return _decrypt_words(words, key)
+
+def decrypt_file(path, key):
+    "Reads and decrypts a file, reading it directly into the buffer it is decrypted in"
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size % Blowfish.block_size != 0:
+            raise ValueError(f"Encrypted file {path} must be a multiple of {Blowfish.block_size} bytes long")
+
+        words = array(_word_code, [0]) * (size // 4)
+        with memoryview(words) as view, view.cast('B') as data:
+            if f.readinto(data) != size:
+                raise ValueError(f"Failed to read all of {path}")
+    return _decrypt_words(words, key)
+
+def decrypt_files(paths, key):
+    "Decrypts files encrypted with the same key, yielding (path, decrypted bytes) in order"
+    for path in paths:
+        yield (path, decrypt_file(path, key))
@@ -56,5 +56,6 @@ class DttEda(sr.AnnotatedStruct):
     
 def load_eda(filepath):
     filepath = Path(filepath)
-    data = open(filepath,'rb').read()
+    with open(filepath, 'rb') as f:
+        data = f.read()
     return sr.StructReader(data).read_struct(DttEda)
\ No newline at end of file
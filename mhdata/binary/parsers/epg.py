@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from . import structreader as sr
-from .decrypt import CapcomBlowfish
+from .decrypt import decrypt_file
 
 class EpgSubpart(sr.AnnotatedStruct):
     hzv_base: sr.int()
@@ -82,5 +82,5 @@ EPG_KEY = b"sJV4g7d55gKnQB5nS6XJ9pZ1qZmmQwNnSbidUW1OeAhHrpPd6MKbfsrt"
 
 def load_epg(filepath):
     filepath = Path(filepath)
-    data = CapcomBlowfish(open(filepath,'rb').read(), EPG_KEY)
+    data = decrypt_file(filepath, EPG_KEY)
     return sr.StructReader(data).read_struct(DttEpg)
\ No newline at end of file
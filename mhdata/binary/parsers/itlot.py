@@ -1,6 +1,6 @@
 from pathlib import Path
 from . import structreader as sr
-from .decrypt import CapcomBlowfish
+from .decrypt import decrypt_file
 
 ITLOT_KEY = b"D7N88VEGEnRl0HEHTO0xMQkbeMb37arJF488lREp90WYojAONkLoxfMt"
 
@@ -27,5 +27,5 @@ class Itlot(sr.AnnotatedStruct):
 
 def load_itlot(filepath) -> Itlot:
     filepath = Path(filepath)
-    data = CapcomBlowfish(open(filepath, 'rb').read(), ITLOT_KEY)
+    data = decrypt_file(filepath, ITLOT_KEY)
     return sr.read_struct(data, Itlot)
\ No newline at end of file
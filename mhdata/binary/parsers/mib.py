@@ -2,7 +2,7 @@ from typing import Iterable
 from pathlib import Path
 
 from . import structreader as sr
-from .decrypt import CapcomBlowfish
+from .decrypt import decrypt_file
 
 # note: some code here is from QuestDataDump
 
@@ -128,6 +128,6 @@ QUEST_KEY = b"TZNgJfzyD2WKiuV4SglmI6oN5jP2hhRJcBwzUooyfIUTM4ptDYGjuRTP"
 
 def load_quest(filepath) -> Mib:
     filepath = Path(filepath)
-    data = CapcomBlowfish(open(filepath,'rb').read(), QUEST_KEY)
+    data = decrypt_file(filepath, QUEST_KEY)
     return sr.read_struct(data, Mib)
 
@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from . import structreader as sr
-from .decrypt import CapcomBlowfish
+from .decrypt import decrypt_file
 
 MSK_MSKE_KEY = b'qm7psvaMXQoay7kARXpNPcLNWqsbqcOyI4lqHtxFh26HSuE6RHNq7J4e'
 
@@ -70,11 +70,11 @@ class Mske(sr.AnnotatedStruct):
 
 def load_msk(filepath):
     filepath = Path(filepath)
-    data = CapcomBlowfish(open(filepath,'rb').read(), MSK_MSKE_KEY)
+    data = decrypt_file(filepath, MSK_MSKE_KEY)
     return sr.StructReader(data).read_struct(Msk)
 
 
 def load_mske(filepath):
     filepath = Path(filepath)
-    data = CapcomBlowfish(open(filepath,'rb').read(), MSK_MSKE_KEY)
+    data = decrypt_file(filepath, MSK_MSKE_KEY)
     return sr.StructReader(data).read_struct(Mske)
\ No newline at end of file
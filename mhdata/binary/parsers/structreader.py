@@ -1,4 +1,8 @@
 from collections.abc import Sequence
+import os
+import sys
+import mmap
+import array
 import struct
 import inspect
 import copy
@@ -6,6 +10,28 @@ from typing import get_type_hints, Type
 
 import mhw_armor_edit.ftypes as ft
 
+# Precompiled struct objects for the formats of read_field
+_structs = {}
+
+def _get_struct(fmt):
+    try:
+        return _structs[fmt]
+    except KeyError:
+        result = _structs[fmt] = struct.Struct(fmt)
+        return result
+
+# Array type codes that match the size and kind of struct format codes, used to read primitive lists
+_array_codes = {}
+for (_code, _candidates) in [('b', 'b'), ('B', 'B'), ('h', 'h'), ('H', 'H'), ('i', 'il'), ('I', 'IL'),
+        ('q', 'ql'), ('Q', 'QL'), ('f', 'f'), ('d', 'd')]:
+    for _typecode in _candidates:
+        if array.array(_typecode).itemsize == struct.calcsize('<' + _code):
+            _array_codes[_code] = _typecode
+            break
+
+# Value used for layouts that haven't been resolved yet, as None means there is no fixed layout
+_unresolved = object()
+
 class Readable:
     def read(self, reader: 'StructReader'):
         raise Exception("Read not implemented")
@@ -30,6 +56,43 @@ class StructReader:
         else:
             raise Exception('Unknown struct value: ' + str(struct_class))
 
+    def read_array(self, base, count, layout=_unresolved):
+        """Reads count consecutive values of a readable, returning a list.
+        If the readable has a fixed size, the whole block is read at once,
+        otherwise the values are read one at a time.
+        layout is the result of get_layout(base), if it was already resolved."""
+        if layout is _unresolved:
+            layout = get_layout(base)
+        if layout is None or count == 0:
+            return [self.read_struct(base) for _ in range(count)]
+
+        (fmt, value_count, build) = layout
+        item_struct = _get_struct('<' + fmt)
+        start = self.offset
+        end = start + item_struct.size * count
+        if end > len(self.data):
+            # Read one at a time, to raise the error of the entry that failed
+            return [self.read_struct(base) for _ in range(count)]
+
+        try:
+            with memoryview(self.data) as view, view[start:end] as block:
+                if build is None and fmt in _array_codes:
+                    values = array.array(_array_codes[fmt])
+                    values.frombytes(block)
+                    if sys.byteorder != 'little':
+                        values.byteswap()
+                    results = values.tolist()
+                elif build is None:
+                    results = [v[0] for v in item_struct.iter_unpack(block)]
+                else:
+                    results = [build(v, 0) for v in item_struct.iter_unpack(block)]
+        except Exception:
+            # Conversions such as MappedValues may fail, read one at a time to raise the right error
+            return [self.read_struct(base) for _ in range(count)]
+
+        self.offset = end
+        return results
+
     def read_structs(self, struct_class, count):
         results = []
         for i in range(count):
@@ -42,8 +105,9 @@ class StructReader:
         return read_structs(struct_class, count)
         
     def read_field(self, fmt):
-        result = struct.unpack_from(fmt, self.data, self.offset)[0]
-        self.offset += struct.calcsize(fmt)
+        fmt_struct = _get_struct(fmt)
+        result = fmt_struct.unpack_from(self.data, self.offset)[0]
+        self.offset += fmt_struct.size
         return result
 
 class ReadablePrimitive(Readable):
@@ -99,14 +163,22 @@ class float(ReadablePrimitive):
 
 
 class blist(Readable):
+    """A fixed number of values of the base readable.
+    If the base has a fixed size, the values are read as a single block"""
     def __init__(self, base, count):
         self.base = base
         self.count = count
+        self._layout = _unresolved
 
         if inspect.isclass(self.base):
             self.base = self.base()
     
     def read(self, reader):
+        if self._layout is _unresolved:
+            self._layout = get_layout(self.base)
+        if self._layout is not None:
+            return reader.read_array(self.base, self.count, self._layout)
+
         results = []
         for i in range(self.count):
             value = reader.read_struct(copy.copy(self.base))
@@ -115,9 +187,12 @@ class blist(Readable):
         return results
 
 class DynamicList(Readable):
+    """A list of values of the base readable, preceded by the number of values.
+    If the base has a fixed size, the values are read as a single block"""
     def __init__(self, base, *, count_type=uint):
         self.base = base
         self.count_type = count_type
+        self._layout = _unresolved
     
     def read(self, reader: StructReader):
         try:
@@ -125,6 +200,16 @@ class DynamicList(Readable):
         except Exception as ex:
             raise Exception(f"Failed to read the number of entries") from ex
 
+        if self._layout is _unresolved:
+            self._layout = get_layout(self.base)
+        if self._layout is not None:
+            start = reader.offset
+            try:
+                return reader.read_array(self.base, count, self._layout)
+            except Exception:
+                # Read one at a time below, to report the entry that failed
+                reader.offset = start
+
         try:
             results = []
             for i in range(count):
@@ -138,31 +223,23 @@ class AnnotatedStruct(Readable):
     Defines a structure of binary data, which is defined by type hints.
 
     Reading the structure returns a copy of this object, rather than the object itself.
-    """
-    def __init__(self):
-        self.fields = []
-
-        hints = get_type_hints(self.__class__)
-        for name, readable in hints.items():
-            self.fields.append(name)
 
-    def read(self, reader: StructReader):
-        result = copy.copy(self)
+    Every subclass is compiled into a read plan when it is created (see StructPlan).
+    Runs of fixed size fields are read with a single precompiled struct.Struct,
+    and only variable sized fields like DynamicList are read one at a time.
+    """
+    _plan = None
 
-        # Use the typehints to guide reading
-        hints = get_type_hints(self.__class__)
-        for name, readable in hints.items():
-            # As typehints are at the class level, we need to copy them if its a readable
-            if isinstance(readable, Readable):
-                readable = copy.copy(readable)
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._plan = StructPlan(cls)
 
-            try:
-                value = reader.read_struct(readable)
-                setattr(result, name, value)
-            except Exception as ex:
-                classname = type(self).__name__
-                raise Exception(f"Failed to read prop {name} in {classname}") from ex
+    def __init__(self):
+        self.fields = list(self._plan.names)
 
+    def read(self, reader: StructReader):
+        result = _copy_struct(self)
+        self._plan.read_into(result, reader)
         return result
 
     def as_dict(self):
@@ -177,10 +254,167 @@ class AnnotatedStruct(Readable):
             for attr in self.fields
         )
 
+def _copy_struct(obj):
+    "Equivalent to copy.copy for an AnnotatedStruct, without the generic copy protocol"
+    result = object.__new__(type(obj))
+    result.__dict__.update(obj.__dict__)
+    return result
+
+# Format codes that have the same size in native and standard mode,
+# so that they can be merged into a single little endian format
+_mergeable_codes = frozenset('bBhHiIqQfd?')
+
+def get_layout(readable):
+    """Returns the fixed size layout of a readable as (format, value count, build function),
+    or None if the readable isn't a fixed size.
+    The format is a little endian struct format without the byte order prefix.
+    The build function creates the read value from the unpacked values and the index of its first value,
+    or is None if the value is a single unpacked value as is."""
+    if inspect.isclass(readable) and issubclass(readable, Readable):
+        readable = readable()
+
+    if isinstance(readable, ReadablePrimitive):
+        code = readable.fmt.lstrip('<')
+        if code not in _mergeable_codes:
+            return None
+        return (code, 1, None)
+
+    if isinstance(readable, MappedValue):
+        base_layout = get_layout(readable.base)
+        if base_layout is None or base_layout[1] != 1 or base_layout[2] is not None:
+            return None
+        convert = readable.convert
+        return (base_layout[0], 1, lambda values, idx: convert(values[idx]))
+
+    if isinstance(readable, blist):
+        base_layout = get_layout(readable.base)
+        if base_layout is None:
+            return None
+        (base_fmt, base_count, base_build) = base_layout
+        count = readable.count
+
+        if base_count == 1 and base_build is None:
+            return (f'{count}{base_fmt}', count, lambda values, idx: list(values[idx:idx+count]))
+
+        def build_list(values, idx):
+            return [base_build(values, idx + i * base_count) for i in range(count)]
+        return (base_fmt * count, base_count * count, build_list)
+
+    if isinstance(readable, AnnotatedStruct):
+        plan = type(readable)._plan
+        if plan is None or not plan.fixed:
+            return None
+        (fmt, count, fields) = plan.steps[0][2:]
+        template = readable
+
+        def build_struct(values, idx):
+            result = _copy_struct(template)
+            result_dict = result.__dict__
+            for name, offset, build in fields:
+                if build is None:
+                    result_dict[name] = values[idx + offset]
+                else:
+                    result_dict[name] = build(values, idx + offset)
+            return result
+        return (fmt, count, build_struct)
+
+    return None
+
+class StructPlan:
+    """The compiled read plan of an AnnotatedStruct class.
+
+    steps is a list of (struct, names, format, value count, fields) for a run of fixed size fields,
+    where fields are (name, value index, build function) and struct is the precompiled struct.Struct,
+    or (None, names, readable) for a field read on its own.
+    """
+    def __init__(self, struct_class):
+        self.struct_class = struct_class
+        self.hints = get_type_hints(struct_class)
+        self.names = tuple(self.hints.keys())
+        self.steps = []
+
+        run = []
+        for name, readable in self.hints.items():
+            # Fields that are data descriptors (such as properties) have to be set by setattr
+            descriptor = getattr(struct_class, name, None)
+            is_descriptor = hasattr(type(descriptor), '__set__')
+
+            layout = None if is_descriptor else get_layout(readable)
+            if layout is None:
+                self._add_run(run)
+                run = []
+                self.steps.append((None, (name,), readable))
+            else:
+                run.append((name, layout))
+        self._add_run(run)
+
+        self.fixed = len(self.steps) == 1 and self.steps[0][0] is not None
+
+    def _add_run(self, run):
+        if not run:
+            return
+
+        fmt = ''
+        count = 0
+        fields = []
+        for name, (field_fmt, field_count, build) in run:
+            fields.append((name, count, build))
+            fmt += field_fmt
+            count += field_count
+
+        names = tuple(name for (name, _) in run)
+        self.steps.append((struct.Struct('<' + fmt), names, fmt, count, tuple(fields)))
+
+    def read_into(self, result, reader: StructReader):
+        "Reads every field into the result object"
+        result_dict = result.__dict__
+        for step in self.steps:
+            step_struct = step[0]
+            if step_struct is None:
+                self.read_fields(result, reader, step[1])
+                continue
+
+            try:
+                values = step_struct.unpack_from(reader.data, reader.offset)
+                for name, idx, build in step[4]:
+                    if build is None:
+                        result_dict[name] = values[idx]
+                    else:
+                        result_dict[name] = build(values, idx)
+            except Exception:
+                # Read the fields one at a time, which raises the error for the field that failed
+                self.read_fields(result, reader, step[1])
+            else:
+                reader.offset += step_struct.size
+
+    def read_fields(self, result, reader: StructReader, names):
+        "Reads the given fields one at a time, using each readable's own read method"
+        for name in names:
+            try:
+                value = reader.read_struct(self.hints[name])
+                setattr(result, name, value)
+            except Exception as ex:
+                classname = self.struct_class.__name__
+                raise Exception(f"Failed to read prop {name} in {classname}") from ex
+
 def read_struct(data, struct_type: Type[Readable]):
     "Creates a new struct reader and reads that struct, and only that struct, from the binary data"
     return StructReader(data).read_struct(struct_type)
 
+def map_file(path):
+    """Memory maps a file, returning a buffer of its contents that is paged in as it is read.
+    The map is copy on write: writing to the buffer never changes the file,
+    and only the pages that are written to are copied.
+    Empty files can't be mapped, and return an empty bytearray.
+
+    The map keeps a file descriptor open (and the file locked on Windows) until it is closed or freed,
+    so only map files whose contents are kept and accessed in place.
+    Files that are parsed into new objects should be read instead."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return bytearray()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
 def read_struct_from_file(path, struct_type: Type[Readable]):
     "Creates a new struct reader and reads that struct, and only that struct, from that file"
     with open(path, 'rb') as f:
@@ -193,7 +427,10 @@ class MappedValue(Readable):
         self.warn = warn
 
     def read(self, reader: StructReader):
-        key = reader.read_struct(self.base)
+        return self.convert(reader.read_struct(self.base))
+
+    def convert(self, key):
+        "Returns the mapped value of a key that was read"
         try:
             return self.map[key]
         except KeyError:
@@ -0,0 +1,146 @@
+from collections.abc import Mapping
+
+from mhdata import cfg
+
+class BulkWriter:
+    """An object used to write rows to the database in large batches.
+
+    Rows are collected per table as plain dictionaries and written using
+    a single executemany per batch, bypassing the ORM unit of work.
+    The ORM mapping classes in mhdata.sql are still used as the schema source.
+
+    Rows of translation tables added with add_translated() are instead collected per entry,
+    and expanded into a row per language when flushed.
+
+    Use as a context manager to flush all remaining rows on a successful exit.
+    """
+
+    def __init__(self, session, *, batch_size=10000, languages=None):
+        self.session = session
+        self.batch_size = batch_size
+        self.languages = languages or cfg.supported_languages
+        self._pending = {}
+        self._columns = {}
+        self._translated = {}
+
+    def add(self, mapping, **values):
+        """Queues a row for the table of the given mapping class.
+        Columns that are missing or null use their scalar default, like the ORM would."""
+        table = mapping.__table__
+        try:
+            rows = self._pending[table]
+        except KeyError:
+            rows = self._pending[table] = []
+            self._columns[table] = self._resolve_columns(table)
+
+        rows.append(values)
+        if len(rows) >= self.batch_size:
+            self._flush_table(table)
+
+    def add_translated(self, mapping, obj, fields, *, fallback=True, **values):
+        """Queues a row for every language in a translation table, such as ItemText.
+        fields are the translated fields of obj, given as a list or as a mapping of column -> field.
+        Each column is set to the field's value in the row's language,
+        falling back to english unless fallback is False.
+        The other values are set on every row, and lang_id is set automatically.
+
+        Every row of a translation table is written by one executemany when flushed.
+        """
+        table = mapping.__table__
+        if not isinstance(fields, Mapping):
+            fields = { field:field for field in fields }
+
+        try:
+            (table_fields, table_fallback, entries) = self._translated[table]
+        except KeyError:
+            (table_fields, table_fallback, entries) = (fields, fallback, [])
+            self._translated[table] = (fields, fallback, entries)
+            self._columns[table] = self._resolve_columns(table)
+
+        if fields != table_fields or fallback != table_fallback:
+            raise ValueError(f"Rows of {table.name} must all translate the same fields")
+
+        translations = tuple((obj[field] if field in obj else None) for field in fields.values())
+        entries.append((translations, values))
+
+    def flush(self):
+        "Writes all pending rows, in the order their tables were first used"
+        for table in self._pending.keys():
+            self._flush_table(table)
+        for table in self._translated.keys():
+            self._flush_translated(table)
+
+    def _resolve_columns(self, table):
+        "Returns (name, default) pairs for every column in the table"
+        columns = []
+        for column in table.columns:
+            default = None
+            if column.default is not None and column.default.is_scalar:
+                default = column.default.arg
+            columns.append((column.key, default))
+        return columns
+
+    def _flush_table(self, table):
+        rows = self._pending[table]
+        if not rows:
+            return
+
+        # executemany requires every row to have the same keys.
+        # Keys that aren't columns are dropped, similar to unmapped ORM attributes
+        columns = self._columns[table]
+        normalized = []
+        for row in rows:
+            values = {}
+            for name, default in columns:
+                value = row.get(name, None)
+                values[name] = default if value is None else value
+            normalized.append(values)
+
+        self.session.execute(table.insert(), normalized)
+        rows.clear()
+
+    def _flush_translated(self, table):
+        (fields, fallback, entries) = self._translated[table]
+        if not entries:
+            return
+
+        # Resolve each translated column for all entries at once, one language at a time
+        resolved = []
+        for idx in range(len(fields)):
+            field_values = [translations[idx] for (translations, _) in entries]
+            if fallback:
+                resolved.append([
+                    [(None if v is None else (v.get(lang, None) or v['en'])) for v in field_values]
+                    for lang in self.languages
+                ])
+            else:
+                resolved.append([
+                    [(None if v is None else v.get(lang, None)) for v in field_values]
+                    for lang in self.languages
+                ])
+
+        # Rows are ordered by entry and then language, as if added one at a time
+        columns = self._columns[table]
+        column_names = list(fields.keys())
+        normalized = []
+        for entry_idx, (_, values) in enumerate(entries):
+            for lang_idx, lang in enumerate(self.languages):
+                row = dict(values, lang_id=lang)
+                for column_idx, column in enumerate(column_names):
+                    row[column] = resolved[column_idx][lang_idx][entry_idx]
+
+                normalized_row = {}
+                for name, default in columns:
+                    value = row.get(name, None)
+                    normalized_row[name] = default if value is None else value
+                normalized.append(normalized_row)
+
+        self.session.execute(table.insert(), normalized)
+        entries.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,83 @@
+"""
+Content fingerprints used to incrementally rebuild the database.
+
+A build category is fingerprinted using the loaded data it is built from,
+the ids and names of the entries it links to in other categories,
+and a hash of the build code. If none of those changed, the category's tables are up to date.
+"""
+
+import glob
+import json
+import hashlib
+import functools
+from collections.abc import Mapping
+from os.path import abspath, join, dirname, relpath
+
+from mhdata import cfg
+from mhdata.io import DataMap
+from mhdata.load.cache import hash_file
+
+_mhdata_path = dirname(dirname(abspath(__file__)))
+
+# Modules that affect the built tables. Any change to these forces a full build
+_code_globs = ('build/*.py', 'sql/*.py', 'cfg.py')
+
+def _to_json_default(obj):
+    "Serializes the objects json doesn't support. DataMaps and DataRows are converted as dictionaries"
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return str(obj)
+
+def _hash_json(h, obj):
+    h.update(json.dumps(obj, default=_to_json_default, ensure_ascii=False).encode())
+
+@functools.lru_cache(maxsize=None)
+def get_build_hash():
+    "Returns a hash of the build code and the configured languages"
+    h = hashlib.sha1()
+    for pattern in _code_globs:
+        for path in sorted(glob.glob(join(_mhdata_path, pattern))):
+            h.update(relpath(path, _mhdata_path).encode())
+            h.update(hash_file(path).encode())
+    _hash_json(h, [cfg.all_languages, cfg.supported_languages, cfg.incomplete_languages])
+    return h.hexdigest()
+
+def get_data_hash(data):
+    "Returns a hash of the contents of a data map or list of loaded data"
+    h = hashlib.sha1()
+    _hash_json(h, data)
+    return h.hexdigest()
+
+def get_id_hash(data_map: DataMap):
+    """Returns a hash of only the ids and keys of a data map's entries.
+    Other categories only look up ids, so they don't need to rebuild when anything else changes."""
+    h = hashlib.sha1()
+    for entry in data_map.values():
+        keys_ex = [entry[k] for k in data_map.keys_ex]
+        _hash_json(h, [entry.id, entry['name'], keys_ex])
+    return h.hexdigest()
+
+def _get_cached_hash(cache, hash_fn, mhdata, field):
+    key = (hash_fn, field)
+    if key not in cache:
+        cache[key] = hash_fn(getattr(mhdata, field))
+    return cache[key]
+
+def get_fingerprint(mhdata, fields, linked_fields=[], *, linked_hashes=[], cache=None):
+    """Returns the fingerprint of a build category.
+    fields are the loaded data the category is built from,
+    and linked_fields are the data maps of other categories it uses ids from.
+    linked_hashes are the hashes of anything else the category depends on.
+    cache is a dictionary shared by the fingerprints of the same mhdata, so that each field is hashed once."""
+    if cache is None:
+        cache = {}
+
+    h = hashlib.sha1()
+    h.update(get_build_hash().encode())
+    for field in fields:
+        h.update(f'{field}:{_get_cached_hash(cache, get_data_hash, mhdata, field)}'.encode())
+    for field in linked_fields:
+        h.update(f'{field}:{_get_cached_hash(cache, get_id_hash, mhdata, field)}'.encode())
+    for linked_hash in linked_hashes:
+        h.update(linked_hash.encode())
+    return h.hexdigest()
@@ -0,0 +1,153 @@
+"""
+Denormalized lookup tables, materialized from the built tables after a build.
+
+Each table holds the fully joined rows of a common app screen in every language,
+so that the screen is a single lookup by the table's primary key.
+The tables are WITHOUT ROWID tables, which are stored ordered by their primary key,
+so the primary key is a covering index for every column.
+
+These are derived data and are not part of the mappings. Any change to the data requires them to be rebuilt.
+"""
+
+# Where to get an item: monster rewards, gathering spots and quest rewards
+ITEM_SOURCE_TABLE = """
+CREATE TABLE lookup_item_source (
+    item_id INTEGER NOT NULL,
+    lang_id TEXT NOT NULL,
+    source_type TEXT NOT NULL,
+    source_row_id INTEGER NOT NULL,
+    source_id INTEGER,
+    source_name TEXT,
+    rank TEXT,
+    condition_name TEXT,
+    area INTEGER,
+    nodes INTEGER,
+    reward_group TEXT,
+    stack INTEGER,
+    percentage INTEGER,
+    PRIMARY KEY (item_id, lang_id, source_type, source_row_id)
+) WITHOUT ROWID
+"""
+
+ITEM_SOURCE_INSERT = """
+INSERT INTO lookup_item_source
+SELECT * FROM (
+    SELECT r.item_id, l.id, 'monster', r.id, r.monster_id, mt.name, r.rank,
+        ct.name, NULL, NULL, NULL, r.stack, r.percentage
+    FROM monster_reward r
+        CROSS JOIN language l
+        LEFT JOIN monster_text mt ON mt.id = r.monster_id AND mt.lang_id = l.id
+        LEFT JOIN monster_reward_condition_text ct ON ct.id = r.condition_id AND ct.lang_id = l.id
+    UNION ALL
+    SELECT li.item_id, l.id, 'location', li.id, li.location_id, lt.name, li.rank,
+        NULL, li.area, li.nodes, NULL, li.stack, li.percentage
+    FROM location_item li
+        CROSS JOIN language l
+        LEFT JOIN location_text lt ON lt.id = li.location_id AND lt.lang_id = l.id
+    UNION ALL
+    SELECT qr.item_id, l.id, 'quest', qr.id, qr.quest_id, qt.name, q.rank,
+        NULL, NULL, NULL, qr."group", qr.stack, qr.percentage
+    FROM quest_reward qr
+        CROSS JOIN language l
+        JOIN quest q ON q.id = qr.quest_id
+        LEFT JOIN quest_text qt ON qt.id = qr.quest_id AND qt.lang_id = l.id
+)
+ORDER BY 1, 2, 3, 4
+"""
+
+# The rewards of a monster, with item and condition names
+MONSTER_REWARD_TABLE = """
+CREATE TABLE lookup_monster_reward (
+    monster_id INTEGER NOT NULL,
+    lang_id TEXT NOT NULL,
+    reward_id INTEGER NOT NULL,
+    rank TEXT,
+    condition_id INTEGER,
+    condition_name TEXT,
+    item_id INTEGER,
+    item_name TEXT,
+    icon_name TEXT,
+    icon_color TEXT,
+    stack INTEGER,
+    percentage INTEGER,
+    PRIMARY KEY (monster_id, lang_id, reward_id)
+) WITHOUT ROWID
+"""
+
+MONSTER_REWARD_INSERT = """
+INSERT INTO lookup_monster_reward
+SELECT r.monster_id, l.id, r.id, r.rank, r.condition_id, ct.name,
+    r.item_id, it.name, i.icon_name, i.icon_color, r.stack, r.percentage
+FROM monster_reward r
+    CROSS JOIN language l
+    LEFT JOIN item i ON i.id = r.item_id
+    LEFT JOIN item_text it ON it.id = r.item_id AND it.lang_id = l.id
+    LEFT JOIN monster_reward_condition_text ct ON ct.id = r.condition_id AND ct.lang_id = l.id
+ORDER BY 1, 2, 3
+"""
+
+# The recipes of weapons, armor, charms and kinsects, with item names
+EQUIPMENT_RECIPE_TABLE = """
+CREATE TABLE lookup_equipment_recipe (
+    equipment_type TEXT NOT NULL,
+    equipment_id INTEGER NOT NULL,
+    lang_id TEXT NOT NULL,
+    recipe_type TEXT NOT NULL,
+    item_id INTEGER NOT NULL,
+    recipe_id INTEGER,
+    item_name TEXT,
+    icon_name TEXT,
+    icon_color TEXT,
+    quantity INTEGER,
+    PRIMARY KEY (equipment_type, equipment_id, lang_id, recipe_type, item_id)
+) WITHOUT ROWID
+"""
+
+EQUIPMENT_RECIPE_INSERT = """
+INSERT INTO lookup_equipment_recipe
+SELECT e.equipment_type, e.equipment_id, l.id, e.recipe_type, ri.item_id,
+    e.recipe_id, it.name, i.icon_name, i.icon_color, ri.quantity
+FROM (
+    SELECT 'weapon' AS equipment_type, id AS equipment_id, 'create' AS recipe_type, create_recipe_id AS recipe_id
+    FROM weapon WHERE create_recipe_id IS NOT NULL
+    UNION ALL
+    SELECT 'weapon', id, 'upgrade', upgrade_recipe_id FROM weapon WHERE upgrade_recipe_id IS NOT NULL
+    UNION ALL
+    SELECT 'armor', id, 'craft', recipe_id FROM armor WHERE recipe_id IS NOT NULL
+    UNION ALL
+    SELECT 'charm', id, 'craft', recipe_id FROM charm WHERE recipe_id IS NOT NULL
+    UNION ALL
+    SELECT 'kinsect', id, 'craft', recipe_id FROM kinsect WHERE recipe_id IS NOT NULL
+) e
+    JOIN recipe_item ri ON ri.recipe_id = e.recipe_id
+    CROSS JOIN language l
+    LEFT JOIN item i ON i.id = ri.item_id
+    LEFT JOIN item_text it ON it.id = ri.item_id AND it.lang_id = l.id
+ORDER BY 1, 2, 3, 4, 5
+"""
+
+# Lookup tables as (name, create statement, insert statement), in build order
+lookup_tables = (
+    ('lookup_item_source', ITEM_SOURCE_TABLE, ITEM_SOURCE_INSERT),
+    ('lookup_monster_reward', MONSTER_REWARD_TABLE, MONSTER_REWARD_INSERT),
+    ('lookup_equipment_recipe', EQUIPMENT_RECIPE_TABLE, EQUIPMENT_RECIPE_INSERT),
+)
+
+def drop_lookup_tables(sessionmaker):
+    "Drops every lookup table from the database, if they exist"
+    engine = sessionmaker.kw['bind']
+    with engine.begin() as conn:
+        for name, _, _ in lookup_tables:
+            conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+
+def build_lookup_tables(sessionmaker):
+    """(Re)creates every lookup table from the built data, in a single transaction.
+    All sessions must be closed before calling this."""
+    engine = sessionmaker.kw['bind']
+    with engine.begin() as conn:
+        for name, create_sql, insert_sql in lookup_tables:
+            conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+            conn.execute(create_sql)
+            conn.execute(insert_sql)
+
+    print("Built lookup tables")
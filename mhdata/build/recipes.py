@@ -0,0 +1,49 @@
+from mhdata.load import datafn
+
+from .objectindex import ObjectIndex
+
+def get_recipe_items(item_map, recipe):
+    "Converts a recipe of the loaded data to a dictionary of item id -> quantity"
+    return { item_map.id_of('en', name):quantity for (name, quantity) in datafn.iter_recipe(recipe) }
+
+class RecipeAllocator:
+    """Assigns ids to recipes without querying the database.
+    Recipes are dictionaries of item id -> quantity. Identical recipes share the same id.
+    The items of every recipe are kept in recipes (id -> items), to be saved separately.
+    """
+
+    def __init__(self):
+        self._index = ObjectIndex()
+        self.recipes = {}
+
+    def id(self, items: dict):
+        "Returns the id of a recipe, assigning a new one if it's new. Empty recipes have no id"
+        if not items:
+            return None
+        return self._index.id(items, on_new=self._on_new)
+
+    def _on_new(self, recipe_id, items):
+        self.recipes[recipe_id] = dict(items)
+
+def allocate_recipes(mhdata):
+    """Returns a RecipeAllocator with the recipes of every build function assigned, in build order.
+    As every id is known ahead of time, categories can be built in any order or in parallel."""
+    item_map = mhdata.item_map
+    recipes = RecipeAllocator()
+
+    for entry in mhdata.armor_map.values():
+        recipes.id(get_recipe_items(item_map, entry['craft']))
+
+    for entry in mhdata.weapon_map.values():
+        for recipe in entry.get('craft', {}):
+            recipes.id(get_recipe_items(item_map, recipe))
+
+    for entry in mhdata.kinsect_map.values():
+        if entry.get('craft', None):
+            recipes.id(get_recipe_items(item_map, entry['craft']))
+
+    for entry in mhdata.charm_map.values():
+        if entry.get('craft'):
+            recipes.id(get_recipe_items(item_map, entry['craft'][0]))
+
+    return recipes
@@ -0,0 +1,68 @@
+"""
+Full text search table over the translated names and descriptions of the database.
+
+Every *_text table is copied into a single FTS5 table, search_text, with the entity type,
+id and language of each row. The trigram tokenizer indexes every 3 character sequence,
+so substring search is index backed for every language, including ones that don't separate words
+such as Japanese, Korean and Chinese. Use mhdata.query.MHWDatabase.search() to query it.
+
+The trigram tokenizer requires SQLite 3.34 or newer.
+"""
+
+SEARCH_TABLE = """
+CREATE VIRTUAL TABLE search_text USING fts5(
+    name,
+    description,
+    entity_type UNINDEXED,
+    id UNINDEXED,
+    lang_id UNINDEXED,
+    tokenize = 'trigram'
+)
+"""
+
+# Entity types with their text table, and the columns of their name and description
+search_sources = (
+    ('item', 'item_text', 'name', 'description'),
+    ('monster', 'monster_text', 'name', 'description'),
+    ('location', 'location_text', 'name', None),
+    ('skilltree', 'skilltree_text', 'name', 'description'),
+    ('armorset', 'armorset_text', 'name', None),
+    ('armor', 'armor_text', 'name', None),
+    ('weapon', 'weapon_text', 'name', None),
+    ('kinsect', 'kinsect_text', 'name', None),
+    ('decoration', 'decoration_text', 'name', None),
+    ('charm', 'charm_text', 'name', 'description'),
+    ('tool', 'tool_text', 'name', 'description'),
+    ('quest', 'quest_text', 'name', 'description'),
+)
+
+# Every entity type in the search table
+search_types = tuple(entity_type for (entity_type, _, _, _) in search_sources)
+
+def _get_search_insert():
+    selects = []
+    for entity_type, table, name_column, description_column in search_sources:
+        selects.append(
+            f"SELECT {name_column}, {description_column or 'NULL'}, '{entity_type}', id, lang_id " +
+            f"FROM {table} WHERE {name_column} IS NOT NULL")
+
+    return "INSERT INTO search_text (name, description, entity_type, id, lang_id)\n" + \
+        "\nUNION ALL\n".join(selects)
+
+def drop_search_table(sessionmaker):
+    "Drops the search table from the database, if it exists"
+    engine = sessionmaker.kw['bind']
+    with engine.begin() as conn:
+        conn.execute('DROP TABLE IF EXISTS search_text')
+
+def build_search_table(sessionmaker):
+    """(Re)creates the search table from the built text tables, and optimizes the index.
+    All sessions must be closed before calling this."""
+    engine = sessionmaker.kw['bind']
+    with engine.begin() as conn:
+        conn.execute('DROP TABLE IF EXISTS search_text')
+        conn.execute(SEARCH_TABLE)
+        conn.execute(_get_search_insert())
+        conn.execute("INSERT INTO search_text (search_text) VALUES ('optimize')")
+
+    print("Built search table")
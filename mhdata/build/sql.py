@@ -1,5 +1,9 @@
+import os
+import tempfile
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
 import sqlalchemy.orm
-from sqlalchemy import func
 import mhdata.sql as db
 
 from mhdata import cfg
@@ -7,131 +11,247 @@ from mhdata.io import DataMap
 from mhdata.util import ensure, ensure_warn, get_duplicates
 from mhdata.load import datafn
 
-from .objectindex import ObjectIndex
 from .itemtracker import ItemTracker
+from .bulkwriter import BulkWriter
+from .recipes import RecipeAllocator, allocate_recipes, get_recipe_items
+from .fingerprint import get_fingerprint, get_build_hash, get_data_hash
+from .lookups import build_lookup_tables, drop_lookup_tables
+from .search import build_search_table, drop_search_table
+
+def build_sql_database(output_filename, mhdata, *, fast=True, incremental=False, fingerprint=False, workers=1,
+        lookups=False, search=False):
+    """Builds a SQLite database and outputs to output_filename.
+    If fast is set, the database is built with unsafe pragmas and indexes are created at the end.
+
+    If workers is not 1, the categories of a full build are built in parallel
+    over a process pool of that many processes. If None, the pool uses one process per core.
+    The result is the same regardless of the number of workers.
+
+    If incremental is set and output_filename is a previous build, only the categories
+    whose data changed are rebuilt, all in one transaction. If the build code changed
+    since, or the file isn't a previous build, it is recreated instead.
+    Only builds that save their fingerprints can be updated later. Incremental builds always save them,
+    full builds only if fingerprint is set, as fingerprinting all the data slows down the build.
+
+    If lookups is set, denormalized lookup tables are materialized after the build (see lookups.py).
+    If search is set, a full text search table is built after the build (see search.py).
+    Derived tables that aren't requested are dropped from a previous build, as they would be stale."""
+    # Recipe ids are assigned before building, shared by all categories
+    recipes = allocate_recipes(mhdata)
+    fingerprints = None
+    if incremental or fingerprint:
+        fingerprints = get_fingerprints(mhdata, recipes)
+
+    if incremental:
+        sessionbuilder = db.open_database(output_filename)
+        if sessionbuilder and update_sql_database(sessionbuilder, mhdata, recipes, fingerprints):
+            build_derived_tables(sessionbuilder, lookups=lookups, search=search)
+            print("Finished build")
+            return
+        print("Previous build cannot be updated, rebuilding all data")
+
+    sessionbuilder = db.recreate_database(output_filename, fast=fast)
+
+    # Create object used for detecting if an item is unmapped
+    item_tracker = ItemTracker(mhdata)
+
+    with db.session_scope(sessionbuilder) as session:
+        # Add languages before starting the build
+        build_languages(session)
+
+        # Build the individual components
+        # These functions are defined lower down in the file
+        if workers == 1:
+            for category in build_categories:
+                category.build(session, mhdata, item_tracker, recipes)
 
-def get_translated(obj, attr, lang):
-    if attr not in obj:
-        return None
-    value = obj[attr].get(lang, None)
-    return value or obj[attr]['en']
+    if workers != 1:
+        build_sql_shards(sessionbuilder, mhdata, item_tracker, recipes, workers)
 
-def calculate_next_recipe_id(session):
-    current_max = session.query(func.max(db.RecipeItem.recipe_id)).scalar() 
-    if not current_max:
-        return 1
-    return current_max + 1
+    item_tracker.print_unmarked()
 
-def build_sql_database(output_filename, mhdata):
-    "Builds a SQLite database and outputs to output_filename"
-    sessionbuilder = db.recreate_database(output_filename)
+    if fingerprints is not None:
+        with db.session_scope(sessionbuilder) as session:
+            write_fingerprints(session, fingerprints)
 
+    build_derived_tables(sessionbuilder, lookups=lookups, search=search)
+
+    if fast:
+        db.finalize_database(sessionbuilder)
+        
+    print("Finished build")
+
+def build_derived_tables(sessionbuilder, *, lookups, search):
+    """Builds the optional tables derived from the built data, dropping the ones that aren't requested.
+    All sessions must be closed before calling this."""
+    if lookups:
+        build_lookup_tables(sessionbuilder)
+    else:
+        drop_lookup_tables(sessionbuilder)
+
+    if search:
+        build_search_table(sessionbuilder)
+    else:
+        drop_search_table(sessionbuilder)
+
+def build_sql_shards(sessionbuilder, mhdata, item_tracker: ItemTracker, recipes: RecipeAllocator, workers):
+    """Builds every category in parallel over a process pool, and merges the results into the database.
+    Each category is built into its own temporary database file (a shard).
+    Every shard uses the recipe ids allocated by the caller, so the result is the same as a serial build."""
+    with tempfile.TemporaryDirectory() as shard_dir:
+        initargs = (mhdata, recipes)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_shard_worker, initargs=initargs) as executor:
+            futures = []
+            for category in build_categories:
+                shard_filename = os.path.join(shard_dir, category.name + '.db')
+                future = executor.submit(_build_shard, category.name, shard_filename)
+                futures.append((category, shard_filename, future))
+
+            # Merge in build order as shards complete, so rows are in the same order as a serial build
+            for category, shard_filename, future in futures:
+                for item_id in future.result():
+                    item_tracker.mark_encountered_id(item_id)
+
+                db.merge_database(sessionbuilder, shard_filename, category.tables)
+
+# The loaded data and allocated recipes used by _build_shard in a worker process
+_shard_mhdata = None
+_shard_recipes = None
+
+def _init_shard_worker(mhdata, recipes):
+    global _shard_mhdata, _shard_recipes
+    _shard_mhdata = mhdata
+    _shard_recipes = recipes
+
+def _build_shard(category_name, shard_filename):
+    """Builds a single category into a new database file, in a worker process.
+    Returns the ids of the items that were marked as encountered."""
+    category = next(c for c in build_categories if c.name == category_name)
+
+    item_tracker = ItemTracker(_shard_mhdata)
+    unmarked = set(item_tracker.all_items.keys())
+
+    sessionbuilder = db.recreate_database(shard_filename, fast=True)
     with db.session_scope(sessionbuilder) as session:
-        # Add languages before starting the build
+        category.build(session, _shard_mhdata, item_tracker, _shard_recipes)
+    sessionbuilder.kw['bind'].dispose()
+
+    return unmarked - set(item_tracker.all_items.keys())
+
+def update_sql_database(sessionbuilder, mhdata, recipes, fingerprints):
+    """Rebuilds the categories of a previous build whose fingerprints changed.
+    Returns False without changing anything if the previous build was made by different build code."""
+    with db.session_scope(sessionbuilder) as session:
+        existing = dict(session.query(db.BuildMetadata.category, db.BuildMetadata.fingerprint))
+        if existing.get('build', None) != fingerprints['build']:
+            return False
+
+        changed = [c for c in build_categories if existing.get(c.name, None) != fingerprints[c.name]]
+        if not changed:
+            print("Database is already up to date")
+            return True
+
+        for category in changed:
+            category.clear(session)
+
+        item_tracker = ItemTracker(mhdata)
+        for category in changed:
+            category.build(session, mhdata, item_tracker, recipes)
+
+        write_fingerprints(session, fingerprints)
+
+    sessionbuilder.kw['bind'].dispose()
+    return True
+
+def get_fingerprints(mhdata, recipes: RecipeAllocator):
+    """Returns a mapping of category name -> fingerprint, including the build code under 'build'.
+    Categories that use recipes also depend on the allocated recipe ids."""
+    recipe_hash = get_data_hash(recipes.recipes)
+
+    fingerprints = { 'build': get_build_hash() }
+    cache = {}
+    for category in build_categories:
+        linked_hashes = [recipe_hash] if category.uses_recipes else []
+        fingerprints[category.name] = get_fingerprint(mhdata,
+            category.fields, category.linked_fields, linked_hashes=linked_hashes, cache=cache)
+    return fingerprints
+
+def write_fingerprints(session, fingerprints):
+    session.query(db.BuildMetadata).delete(synchronize_session=False)
+    with BulkWriter(session) as writer:
+        for category, fingerprint in fingerprints.items():
+            writer.add(db.BuildMetadata, category=category, fingerprint=fingerprint)
+
+def build_languages(session : sqlalchemy.orm.Session):
+    with BulkWriter(session) as writer:
         for language in cfg.supported_languages:
-            session.add(db.Language(
+            writer.add(db.Language,
                 id=language,
                 name=cfg.all_languages[language],
                 is_complete=(language not in cfg.incomplete_languages)
-            ))
-
-        # Create object used for detecting if an item is unmapped
-        item_tracker = ItemTracker(mhdata)
+            )
 
-        # Build the individual components
-        # These functions are defined lower down in the file
-        build_items(session, mhdata, item_tracker)
-        build_locations(session, mhdata, item_tracker)
-        build_monsters(session, mhdata, item_tracker)
-        build_skills(session, mhdata)
-        build_armor(session, mhdata)
-        build_weapons(session, mhdata)
-        build_kinsects(session, mhdata)
-        build_decorations(session, mhdata)
-        build_charms(session, mhdata)
-        build_tools(session, mhdata)
-        build_quests(session, mhdata, item_tracker)
-
-        item_tracker.print_unmarked()
-        
-    print("Finished build")
+def build_items(session : sqlalchemy.orm.Session, mhdata, item_tracker: ItemTracker):
+    with BulkWriter(session) as writer:
+        # Save basic item data first
+        for entry in mhdata.item_map.values():
+            writer.add(db.Item,
+                id=entry.id,
+                category=entry['category'],
+                subcategory=entry['subcategory'],
+                rarity=entry['rarity'] or 0,
+                buy_price=entry['buy_price'] or 0,
+                sell_price=entry['sell_price'] or 0,
+                carry_limit=entry['carry_limit'] or 0,
+                points=entry['points'] or 0,
+                icon_name=entry['icon_name'],
+                icon_color=entry['icon_color']
+            )
 
+            writer.add_translated(db.ItemText, entry, ['name', 'description'], id=entry.id)
 
-def build_items(session : sqlalchemy.orm.Session, mhdata, item_tracker: ItemTracker):
-    # Save basic item data first
-    for entry in mhdata.item_map.values():
-        item = db.Item(id=entry.id)
-        item.category = entry['category']
-        item.subcategory = entry['subcategory']
-        item.rarity = entry['rarity'] or 0
-        item.buy_price = entry['buy_price'] or 0
-        item.sell_price = entry['sell_price'] or 0
-        item.carry_limit = entry['carry_limit'] or 0
-        item.points = entry['points'] or 0
-        item.icon_name = entry['icon_name']
-        item.icon_color = entry['icon_color']
+        # Now save item combination data
+        for entry in mhdata.item_combinations:
+            result_id = mhdata.item_map.id_of('en', entry['result'])
+            item_tracker.mark_encountered_id(result_id)
 
-        for language in cfg.supported_languages:
-            item.translations.append(db.ItemText(
-                lang_id=language,
-                name=get_translated(entry, 'name', language),
-                description=get_translated(entry, 'description', language),
-            ))
-
-        session.add(item)
-
-    # Now save item combination data
-    for entry in mhdata.item_combinations:
-        result_id = mhdata.item_map.id_of('en', entry['result'])
-        item_tracker.mark_encountered_id(result_id)
-
-        session.add(db.ItemCombination(
-            id=entry['id'],
-            result_id=result_id,
-            first_id=mhdata.item_map.id_of('en', entry['first']),
-            second_id=mhdata.item_map.id_of('en', entry['second']),
-            quantity=entry['quantity']
-        ))
+            writer.add(db.ItemCombination,
+                id=entry['id'],
+                result_id=result_id,
+                first_id=mhdata.item_map.id_of('en', entry['first']),
+                second_id=mhdata.item_map.id_of('en', entry['second']),
+                quantity=entry['quantity']
+            )
     
     print("Built Items")
 
 def build_locations(session : sqlalchemy.orm.Session, mhdata, item_tracker: ItemTracker):
-    for order_id, entry in enumerate(mhdata.location_map.values()):
-        location_name = entry['name']['en']
+    with BulkWriter(session) as writer:
+        for order_id, entry in enumerate(mhdata.location_map.values()):
+            writer.add_translated(db.Location, entry, ['name'], id=entry.id, order_id=order_id)
 
-        for language in cfg.supported_languages:
-            session.add(db.Location(
-                id=entry.id,
-                order_id=order_id,
-                lang_id=language,
-                name=get_translated(entry, 'name', language),
-            ))
-
-        for item_entry in entry['items']:
-            item_lang = item_entry['item_lang']
-            item_name = item_entry['item']
-            item_id = mhdata.item_map.id_of(item_lang, item_name)
-
-            item_tracker.mark_encountered_id(item_id)
-
-            session.add(db.LocationItem(
-                location_id=entry.id,
-                area=item_entry['area'],
-                rank=item_entry['rank'],
-                item_id=item_id,
-                stack=item_entry['stack'],
-                percentage=item_entry['percentage'],
-                nodes=item_entry['nodes']
-            ))
-
-        for camp in entry['camps']:
-            for language in cfg.supported_languages:
-                session.add(db.LocationCamp(
+            for item_entry in entry['items']:
+                item_lang = item_entry['item_lang']
+                item_name = item_entry['item']
+                item_id = mhdata.item_map.id_of(item_lang, item_name)
+
+                item_tracker.mark_encountered_id(item_id)
+
+                writer.add(db.LocationItem,
                     location_id=entry.id,
-                    lang_id = language,
-                    name = get_translated(camp, 'name', language),
-                    area = camp['area']
-                ))
+                    area=item_entry['area'],
+                    rank=item_entry['rank'],
+                    item_id=item_id,
+                    stack=item_entry['stack'],
+                    percentage=item_entry['percentage'],
+                    nodes=item_entry['nodes']
+                )
+
+            for camp in entry['camps']:
+                writer.add_translated(db.LocationCamp, camp, ['name'],
+                    location_id=entry.id,
+                    area=camp['area']
+                )
             
     print("Built locations")
 
@@ -141,201 +261,186 @@ def build_monsters(session : sqlalchemy.orm.Session, mhdata, item_tracker: ItemT
     monster_map = mhdata.monster_map
     monster_reward_conditions_map = mhdata.monster_reward_conditions_map
 
-    # Save conditions first
-    for condition_id, entry in monster_reward_conditions_map.items():
-        for language in cfg.supported_languages:
-            session.add(db.MonsterRewardConditionText(
-                id=condition_id,
-                lang_id=language,
-                name=get_translated(entry, 'name', language),
-            ))
-
-    # Save monsters
-    for order_id, entry in enumerate(monster_map.values()):
-        monster = db.Monster(
-            id=entry.id,
-            order_id=order_id,
-            size=entry['size'],
-            pitfall_trap=entry['pitfall_trap'],
-            shock_trap=entry['shock_trap'],
-            vine_trap=entry['vine_trap']
-        )
+    # Surrogate ids for child tables, required to link their translations
+    hitzone_ids = itertools.count(1)
+    break_ids = itertools.count(1)
+
+    with BulkWriter(session) as writer:
+        # Save conditions first
+        for condition_id, entry in monster_reward_conditions_map.items():
+            writer.add_translated(db.MonsterRewardConditionText, entry, ['name'], id=condition_id)
+
+        # Save monsters
+        for order_id, entry in enumerate(monster_map.values()):
+            monster = {
+                'id': entry.id,
+                'order_id': order_id,
+                'size': entry['size'],
+                'pitfall_trap': entry['pitfall_trap'],
+                'shock_trap': entry['shock_trap'],
+                'vine_trap': entry['vine_trap']
+            }
         
-        # todo: refactor to allow translations. Currently set when weaknesses are read
-        alt_state_description = None
-
-        # Save basic weakness summary data
-        if 'weaknesses' in entry and entry['weaknesses']:
-            elements = [
-                'fire', 'water', 'ice', 'thunder', 'dragon', 
-                'poison', 'sleep', 'paralysis', 'blast', 'stun']
-
-            weaknesses = { e['form']:e for e in entry['weaknesses'] }
-            form_normal = weaknesses.get('normal')
-            form_alt = weaknesses.get('alt')
-
-            invalid_keys = [k for k in weaknesses.keys() if k not in ('normal', 'alt')]
-            if invalid_keys:
-                raise Exception(f"Monster {entry.name('en')} has invalid form(s) {', '.join(invalid_keys)}")
-
-            if form_normal:
-                monster.has_weakness = True
-                for element in elements:
-                    setattr(monster, 'weakness_'+element, form_normal[element])
-
-            if form_alt:
-                monster.has_alt_weakness = True
-                alt_state_description = form_alt['alt_description']
-
-                for element in elements:
-                    value = form_alt[element]
-                    if value is None:
-                        value = form_normal[element]
-                    setattr(monster, 'alt_weakness_'+element, value)
-
-        # Save language data
-        for language in cfg.supported_languages:
-            monster.translations.append(db.MonsterText(
-                lang_id=language,
-                name=get_translated(entry, 'name', language),
+            # todo: refactor to allow translations. Currently set when weaknesses are read
+            alt_state_description = None
+
+            # Save basic weakness summary data
+            if 'weaknesses' in entry and entry['weaknesses']:
+                elements = [
+                    'fire', 'water', 'ice', 'thunder', 'dragon', 
+                    'poison', 'sleep', 'paralysis', 'blast', 'stun']
+
+                weaknesses = { e['form']:e for e in entry['weaknesses'] }
+                form_normal = weaknesses.get('normal')
+                form_alt = weaknesses.get('alt')
+
+                invalid_keys = [k for k in weaknesses.keys() if k not in ('normal', 'alt')]
+                if invalid_keys:
+                    raise Exception(f"Monster {entry.name('en')} has invalid form(s) {', '.join(invalid_keys)}")
+
+                if form_normal:
+                    monster['has_weakness'] = True
+                    for element in elements:
+                        monster['weakness_'+element] = form_normal[element]
+
+                if form_alt:
+                    monster['has_alt_weakness'] = True
+                    alt_state_description = form_alt['alt_description']
+
+                    for element in elements:
+                        value = form_alt[element]
+                        if value is None:
+                            value = form_normal[element]
+                        monster['alt_weakness_'+element] = value
+
+            # Save language data
+            writer.add_translated(db.MonsterText, entry, ['name', 'description'],
+                id=entry.id,
                 ecology=entry['ecology_en'],
-                description=get_translated(entry, 'description', language),
                 alt_state_description=alt_state_description
-            ))
-
-        # Save hitzones
-        for hitzone_data in entry.get('hitzones', []):
-            hitzone = db.MonsterHitzone(
-                cut=hitzone_data['cut'],
-                impact=hitzone_data['impact'],
-                shot=hitzone_data['shot'],
-                fire=hitzone_data['fire'],
-                water=hitzone_data['water'],
-                thunder=hitzone_data['thunder'],
-                ice=hitzone_data['ice'],
-                dragon=hitzone_data['dragon'],
-                ko=hitzone_data['ko'])
-
-            for language in cfg.supported_languages:
-                part_name = get_translated(hitzone_data, 'hitzone', language)
-                hitzone.translations.append(db.MonsterHitzoneText(
-                    lang_id=language,
-                    name=part_name
-                ))
-
-            monster.hitzones.append(hitzone)
-
-        # Save breaks
-        for break_data in entry.get('breaks', []):
-            breakzone = db.MonsterBreak(
-                flinch=break_data['flinch'],
-                wound=break_data['wound'],
-                sever=break_data['sever'],
-                extract=break_data['extract']
             )
 
-            for language in cfg.supported_languages:
-                breakzone.translations.append(db.MonsterBreakText(
-                    lang_id=language,
-                    part_name=get_translated(break_data, 'part', language),
-                ))
-
-            monster.breaks.append(breakzone)
-
-        # Save ailments
-        ailments = entry.get('ailments', None)
-        if ailments:
-            monster.ailment_roar = ailments['roar']
-            monster.ailment_wind = ailments['wind']
-            monster.ailment_tremor = ailments['tremor']
-            monster.ailment_defensedown = ailments['defense_down']
-            monster.ailment_fireblight = ailments['fireblight']
-            monster.ailment_waterblight = ailments['waterblight']
-            monster.ailment_thunderblight = ailments['thunderblight']
-            monster.ailment_iceblight = ailments['iceblight']
-            monster.ailment_dragonblight = ailments['dragonblight']
-            monster.ailment_blastblight = ailments['blastblight']
-            monster.ailment_regional = ailments['regional']
-            monster.ailment_poison = ailments['poison']
-            monster.ailment_sleep = ailments['sleep']
-            monster.ailment_paralysis = ailments['paralysis']
-            monster.ailment_bleed = ailments['bleed']
-            monster.ailment_stun = ailments['stun']
-            monster.ailment_mud = ailments['mud']
-            monster.ailment_effluvia = ailments['effluvia']
-
-        # Create a temp base map of the conditions
-        # This temp map extends the global map with monster-specific conditions
-        #monster_conditions = DataMap(reward_conditions_map)
-        #monster_conditions.extend(entry.get('break_conditions', []))
-
-        # Save hunting rewards
-        for reward in entry.get('rewards', []):
-            condition_en = reward['condition_en']
-            rank = reward['rank']
-            item_name = reward['item_en']
-
-            condition_id = monster_reward_conditions_map.id_of('en', condition_en)
-            item_id = item_map.id_of('en', item_name)
-
-            item_tracker.mark_encountered_id(item_id)
-
-            monster.rewards.append(db.MonsterReward(
-                condition_id=condition_id,
-                rank=rank,
-                item_id=item_id,
-                stack=reward['stack'],
-                percentage=reward['percentage'] or 0
-            ))
-
-        # Save Habitats
-        for habitat_data in entry.get('habitats', []):
-            location_name = habitat_data['map_en']
-            location_id = location_map.id_of("en", location_name)
-            ensure(location_id, "Invalid location name " + location_name)
-
-            monster.habitats.append(db.MonsterHabitat(
-                location_id=location_id,
-                start_area=habitat_data['start_area'],
-                move_area=habitat_data['move_area'],
-                rest_area=habitat_data['rest_area']
-            ))
-
-        # Complete - add to session
-        session.add(monster)
+            # Save hitzones
+            for hitzone_data in entry.get('hitzones', []):
+                hitzone_id = next(hitzone_ids)
+                writer.add(db.MonsterHitzone,
+                    id=hitzone_id,
+                    monster_id=entry.id,
+                    cut=hitzone_data['cut'],
+                    impact=hitzone_data['impact'],
+                    shot=hitzone_data['shot'],
+                    fire=hitzone_data['fire'],
+                    water=hitzone_data['water'],
+                    thunder=hitzone_data['thunder'],
+                    ice=hitzone_data['ice'],
+                    dragon=hitzone_data['dragon'],
+                    ko=hitzone_data['ko'])
+
+                writer.add_translated(db.MonsterHitzoneText, hitzone_data, { 'name': 'hitzone' }, id=hitzone_id)
+
+            # Save breaks
+            for break_data in entry.get('breaks', []):
+                break_id = next(break_ids)
+                writer.add(db.MonsterBreak,
+                    id=break_id,
+                    monster_id=entry.id,
+                    flinch=break_data['flinch'],
+                    wound=break_data['wound'],
+                    sever=break_data['sever'],
+                    extract=break_data['extract']
+                )
+
+                writer.add_translated(db.MonsterBreakText, break_data, { 'part_name': 'part' }, id=break_id)
+
+            # Save ailments
+            ailments = entry.get('ailments', None)
+            if ailments:
+                monster['ailment_roar'] = ailments['roar']
+                monster['ailment_wind'] = ailments['wind']
+                monster['ailment_tremor'] = ailments['tremor']
+                monster['ailment_defensedown'] = ailments['defense_down']
+                monster['ailment_fireblight'] = ailments['fireblight']
+                monster['ailment_waterblight'] = ailments['waterblight']
+                monster['ailment_thunderblight'] = ailments['thunderblight']
+                monster['ailment_iceblight'] = ailments['iceblight']
+                monster['ailment_dragonblight'] = ailments['dragonblight']
+                monster['ailment_blastblight'] = ailments['blastblight']
+                monster['ailment_regional'] = ailments['regional']
+                monster['ailment_poison'] = ailments['poison']
+                monster['ailment_sleep'] = ailments['sleep']
+                monster['ailment_paralysis'] = ailments['paralysis']
+                monster['ailment_bleed'] = ailments['bleed']
+                monster['ailment_stun'] = ailments['stun']
+                monster['ailment_mud'] = ailments['mud']
+                monster['ailment_effluvia'] = ailments['effluvia']
+
+            # Create a temp base map of the conditions
+            # This temp map extends the global map with monster-specific conditions
+            #monster_conditions = DataMap(reward_conditions_map)
+            #monster_conditions.extend(entry.get('break_conditions', []))
+
+            # Save hunting rewards
+            for reward in entry.get('rewards', []):
+                condition_en = reward['condition_en']
+                rank = reward['rank']
+                item_name = reward['item_en']
+
+                condition_id = monster_reward_conditions_map.id_of('en', condition_en)
+                item_id = item_map.id_of('en', item_name)
+
+                item_tracker.mark_encountered_id(item_id)
+
+                writer.add(db.MonsterReward,
+                    monster_id=entry.id,
+                    condition_id=condition_id,
+                    rank=rank,
+                    item_id=item_id,
+                    stack=reward['stack'],
+                    percentage=reward['percentage'] or 0
+                )
+
+            # Save Habitats
+            for habitat_data in entry.get('habitats', []):
+                location_name = habitat_data['map_en']
+                location_id = location_map.id_of("en", location_name)
+                ensure(location_id, "Invalid location name " + location_name)
+
+                writer.add(db.MonsterHabitat,
+                    monster_id=entry.id,
+                    location_id=location_id,
+                    start_area=habitat_data['start_area'],
+                    move_area=habitat_data['move_area'],
+                    rest_area=habitat_data['rest_area']
+                )
+
+            # Complete - add to writer
+            writer.add(db.Monster, **monster)
 
     print("Built Monsters")
 
 def build_skills(session : sqlalchemy.orm.Session, mhdata):
     skill_map = mhdata.skill_map
 
-    for skill_entry in skill_map.values():
-        skilltree = db.SkillTree(
-            id=skill_entry.id,
-            max_level=len(skill_entry['levels']),
-            icon_color=skill_entry['icon_color'],
-            secret=skill_entry['secret'] or 0,
-            unlocks_id=skill_map.id_of('en', skill_entry['unlocks']))
+    with BulkWriter(session) as writer:
+        for skill_entry in skill_map.values():
+            writer.add(db.SkillTree,
+                id=skill_entry.id,
+                max_level=len(skill_entry['levels']),
+                icon_color=skill_entry['icon_color'],
+                secret=skill_entry['secret'] or 0,
+                unlocks_id=skill_map.id_of('en', skill_entry['unlocks']))
 
-        for language in cfg.supported_languages:
-            skilltree.translations.append(db.SkillTreeText(
-                lang_id=language,
-                name=get_translated(skill_entry, 'name', language),
-                description=get_translated(skill_entry, 'description', language)
-            ))
+            writer.add_translated(db.SkillTreeText, skill_entry, ['name', 'description'], id=skill_entry.id)
 
             for effect in skill_entry['levels']:
-                skilltree.skills.append(db.Skill(
-                    lang_id=language,
-                    level=effect['level'],
-                    description=get_translated(effect, 'description', language)
-                ))
-
-        session.add(skilltree)
+                writer.add_translated(db.Skill, effect, ['description'],
+                    skilltree_id=skill_entry.id,
+                    level=effect['level']
+                )
     
     print("Built Skills")
 
-def build_armor(session : sqlalchemy.orm.Session, mhdata):
+def build_armor(session : sqlalchemy.orm.Session, mhdata, recipes: RecipeAllocator):
     item_map = mhdata.item_map
     skill_map = mhdata.skill_map
     armorset_map = mhdata.armorset_map
@@ -346,327 +451,285 @@ def build_armor(session : sqlalchemy.orm.Session, mhdata):
     armor_to_armorset = {}
     armorset_to_bonus = {}
 
-    # Write entries from armor set bonuses
-    # These are written first as they are "linked to"
-    for bonus_entry in armorset_bonus_map.values():
-        for language in cfg.supported_languages:
-            session.add(db.ArmorSetBonusText(
-                id=bonus_entry.id,
-                lang_id=language,
-                name=get_translated(bonus_entry, 'name', language)
-            ))
+    with BulkWriter(session) as writer:
+        # Write entries from armor set bonuses
+        # These are written first as they are "linked to"
+        for bonus_entry in armorset_bonus_map.values():
+            writer.add_translated(db.ArmorSetBonusText, bonus_entry, ['name'], id=bonus_entry.id)
         
-        for skill_name, required in datafn.iter_setbonus_skills(bonus_entry):
-            skill_id = skill_map.id_of('en', skill_name)
-            session.add(db.ArmorSetBonusSkill(
-                setbonus_id=bonus_entry.id,
-                skilltree_id=skill_id,
-                required=required
-            ))
-
-    # Write entries for armor sets
-    for set_id, entry in armorset_map.items():
-        armorset_bonus_id = None
-
-        if entry['bonus']:
-            armorset_bonus_id = armorset_bonus_map.id_of('en', entry['bonus'])
-            ensure(armorset_bonus_id, f"Armorset bonus {entry['bonus']} in armorsets doesn't exist")
-            armorset_to_bonus[set_id] = armorset_bonus_id
-
-        armorset = db.ArmorSet(
-            id=set_id,
-            rank=entry['rank'],
-            armorset_bonus_id=armorset_bonus_id
-        ) 
-
-        if entry['monster']:
-            armorset.monster_id = mhdata.monster_map.id_of('en', entry['monster'])
+            for skill_name, required in datafn.iter_setbonus_skills(bonus_entry):
+                skill_id = skill_map.id_of('en', skill_name)
+                writer.add(db.ArmorSetBonusSkill,
+                    setbonus_id=bonus_entry.id,
+                    skilltree_id=skill_id,
+                    required=required
+                )
+
+        # Write entries for armor sets
+        for set_id, entry in armorset_map.items():
+            armorset_bonus_id = None
+
+            if entry['bonus']:
+                armorset_bonus_id = armorset_bonus_map.id_of('en', entry['bonus'])
+                ensure(armorset_bonus_id, f"Armorset bonus {entry['bonus']} in armorsets doesn't exist")
+                armorset_to_bonus[set_id] = armorset_bonus_id
+
+            monster_id = None
+            if entry['monster']:
+                monster_id = mhdata.monster_map.id_of('en', entry['monster'])
+
+            writer.add(db.ArmorSet,
+                id=set_id,
+                rank=entry['rank'],
+                monster_id=monster_id,
+                armorset_bonus_id=armorset_bonus_id
+            ) 
         
-        for language in cfg.supported_languages:
-            armorset.translations.append(db.ArmorSetText(
-                lang_id=language,
-                name=get_translated(entry, 'name', language)
-            ))
+            writer.add_translated(db.ArmorSetText, entry, ['name'], id=set_id)
 
-        session.add(armorset)
-
-        # Populate reverse map (to allow armor to link to armorset)
-        for part in cfg.armor_parts:
-            if not entry[part]:
-                continue
+            # Populate reverse map (to allow armor to link to armorset)
+            for part in cfg.armor_parts:
+                if not entry[part]:
+                    continue
             
-            armor_reverse_id = mhdata.armor_map.id_of('en', entry[part])
-            armor_to_armorset[armor_reverse_id] = set_id
-
-    # Store recipe id to start from for armor
-    next_recipe_id = calculate_next_recipe_id(session)
-
-    # Write entries for armor
-    for order_id, entry in enumerate(armor_map.values()):
-        armor_name_en = entry.name('en')
-
-        armor = db.Armor(id = entry.id)
-        armor.order_id = order_id
-        armor.rarity = entry['rarity']
-        armor.armor_type = entry['type']
-        armor.male = entry['gender'] in ('male', 'both')
-        armor.female = entry['gender'] in ('female', 'both')
-        armor.slot_1 = entry['slot_1']
-        armor.slot_2 = entry['slot_2']
-        armor.slot_3 = entry['slot_3']
-        armor.defense_base = entry['defense_base']
-        armor.defense_max = entry['defense_max']
-        armor.defense_augment_max = entry['defense_augment_max']
-        armor.fire = entry['defense_fire']
-        armor.water = entry['defense_water']
-        armor.thunder = entry['defense_thunder']
-        armor.ice = entry['defense_ice']
-        armor.dragon = entry['defense_dragon']
-
-        armorset_id = armor_to_armorset.get(entry.id, None)
-        armorset_entry = armorset_map[armorset_id]
-        armor.rank = armorset_entry['rank']
-        armor.armorset_id = armorset_id
-        armor.armorset_bonus_id = armorset_to_bonus.get(armorset_id, None)
+                armor_reverse_id = mhdata.armor_map.id_of('en', entry[part])
+                armor_to_armorset[armor_reverse_id] = set_id
+
+        # Write entries for armor
+        for order_id, entry in enumerate(armor_map.values()):
+            armorset_id = armor_to_armorset.get(entry.id, None)
+            armorset_entry = armorset_map[armorset_id]
+
+            armor = {
+                'id': entry.id,
+                'order_id': order_id,
+                'rarity': entry['rarity'],
+                'armor_type': entry['type'],
+                'male': entry['gender'] in ('male', 'both'),
+                'female': entry['gender'] in ('female', 'both'),
+                'slot_1': entry['slot_1'],
+                'slot_2': entry['slot_2'],
+                'slot_3': entry['slot_3'],
+                'defense_base': entry['defense_base'],
+                'defense_max': entry['defense_max'],
+                'defense_augment_max': entry['defense_augment_max'],
+                'fire': entry['defense_fire'],
+                'water': entry['defense_water'],
+                'thunder': entry['defense_thunder'],
+                'ice': entry['defense_ice'],
+                'dragon': entry['defense_dragon'],
+                'rank': armorset_entry['rank'],
+                'armorset_id': armorset_id,
+                'armorset_bonus_id': armorset_to_bonus.get(armorset_id, None)
+            }
+
+            writer.add_translated(db.ArmorText, entry, ['name'], id=entry.id)
+
+            # Armor Skills
+            for skill, level in datafn.iter_skill_levels(entry['skills']):
+                skill_id = skill_map.id_of('en', skill)
+                writer.add(db.ArmorSkill,
+                    armor_id=entry.id,
+                    skilltree_id=skill_id,
+                    level=level
+                )
 
-        for language in cfg.supported_languages:
-            armor.translations.append(db.ArmorText(
-                lang_id=language, 
-                name=get_translated(entry, 'name', language),
-            ))
-
-        # Armor Skills
-        for skill, level in datafn.iter_skill_levels(entry['skills']):
-            skill_id = skill_map.id_of('en', skill)
-            armor.skills.append(db.ArmorSkill(
-                skilltree_id=skill_id,
-                level=level
-            ))
-
-        # Armor Crafting
-        for item_name, quantity in datafn.iter_armor_recipe(entry):
-            item_id = item_map.id_of('en', item_name)
-            armor.craft_items.append(db.RecipeItem(
-                recipe_id=next_recipe_id,
-                item_id=item_id,
-                quantity=quantity
-            ))
-
-        next_recipe_id += 1
-
-        session.add(armor)
+            # Armor Crafting
+            armor['recipe_id'] = recipes.id(get_recipe_items(item_map, entry['craft']))
+
+            writer.add(db.Armor, **armor)
 
     print("Built Armor")
 
-def build_weapons(session : sqlalchemy.orm.Session, mhdata):
+def build_weapons(session : sqlalchemy.orm.Session, mhdata, recipes: RecipeAllocator):
     item_map = mhdata.item_map
     weapon_map = mhdata.weapon_map
 
-    # Save all weapon ammo configurations
-    for entry in mhdata.weapon_ammo_map.values():
-        ammo = db.WeaponAmmo(
-            id=entry.id,
-            deviation=entry['deviation'],
-            special_ammo=entry['special']
-        )
-
-        # helper to assign the entirety of a group to the db
-        def assign_group(ammotype):
-            group = entry[ammotype]
-            setattr(ammo, ammotype + "_clip", group['clip'])
-            setattr(ammo, ammotype + "_rapid", group['rapid'])
-            setattr(ammo, ammotype + "_recoil", group.get('recoil', None) or 0)
-            setattr(ammo, ammotype + "_reload", group.get('reload', None))
-
-        assign_group('normal1')
-        assign_group('normal2')
-        assign_group('normal3')
-        assign_group('pierce1')
-        assign_group('pierce2')
-        assign_group('pierce3')
-        assign_group('spread1')
-        assign_group('spread2')
-        assign_group('spread3')
-        assign_group('sticky1')
-        assign_group('sticky2')
-        assign_group('sticky3')
-        assign_group('cluster1')
-        assign_group('cluster2')
-        assign_group('recover1')
-        assign_group('recover2')
-        assign_group('poison1')
-        assign_group('poison2')
-        assign_group('paralysis1')
-        assign_group('paralysis2')
-        assign_group('sleep1')
-        assign_group('sleep2')
-        assign_group('exhaust1')
-        assign_group('exhaust2')
-        assign_group('flaming')
-        assign_group('water')
-        assign_group('freeze')
-        assign_group('thunder')
-        assign_group('dragon')
-
-        assign_group('slicing')
-        assign_group('demon')
-        assign_group('armor')
-        assign_group('tranq')
+    with BulkWriter(session) as writer:
+        # Save all weapon ammo configurations
+        for entry in mhdata.weapon_ammo_map.values():
+            ammo = {
+                'id': entry.id,
+                'deviation': entry['deviation'],
+                'special_ammo': entry['special']
+            }
+
+            # helper to assign the entirety of a group to the db
+            def assign_group(ammotype):
+                group = entry[ammotype]
+                ammo[ammotype + "_clip"] = group['clip']
+                ammo[ammotype + "_rapid"] = group['rapid']
+                ammo[ammotype + "_recoil"] = group.get('recoil', None) or 0
+                ammo[ammotype + "_reload"] = group.get('reload', None)
+
+            assign_group('normal1')
+            assign_group('normal2')
+            assign_group('normal3')
+            assign_group('pierce1')
+            assign_group('pierce2')
+            assign_group('pierce3')
+            assign_group('spread1')
+            assign_group('spread2')
+            assign_group('spread3')
+            assign_group('sticky1')
+            assign_group('sticky2')
+            assign_group('sticky3')
+            assign_group('cluster1')
+            assign_group('cluster2')
+            assign_group('recover1')
+            assign_group('recover2')
+            assign_group('poison1')
+            assign_group('poison2')
+            assign_group('paralysis1')
+            assign_group('paralysis2')
+            assign_group('sleep1')
+            assign_group('sleep2')
+            assign_group('exhaust1')
+            assign_group('exhaust2')
+            assign_group('flaming')
+            assign_group('water')
+            assign_group('freeze')
+            assign_group('thunder')
+            assign_group('dragon')
+
+            assign_group('slicing')
+            assign_group('demon')
+            assign_group('armor')
+            assign_group('tranq')
         
-        ammo.wyvern_clip = entry['wyvern']['clip']
-        ammo.wyvern_reload = entry['wyvern']['reload']
-
-        session.add(ammo)
-
-    # Save all weapon melodies
-    for melody_entry in mhdata.weapon_melodies.values():
-        melody = db.WeaponMelody(
-            base_duration=melody_entry['base_duration'],
-            base_extension=melody_entry['base_extension'],
-            m1_duration=melody_entry['m1_duration'],
-            m1_extension=melody_entry['m1_extension'],
-            m2_duration=melody_entry['m2_duration'],
-            m2_extension=melody_entry['m2_extension']
-        )
-
-        for language in cfg.supported_languages:
-            melody.translations.append(db.WeaponMelodyText(
-                lang_id=language,
-                name=get_translated(melody_entry, 'name', language),
-                effect1=get_translated(melody_entry, 'effect1', language),
-                effect2=get_translated(melody_entry, 'effect2', language)
-            ))
-
-        for note_entry in melody_entry['notes']:
-            melody.notes.append(db.WeaponMelodyNotes(
-                notes=note_entry['notes']
-            ))
-
-        session.add(melody)
-
-    # Prepass to determine which weapons are "final"
-    # All items that are a previous to another are "not final"
-    all_final = set(weapon_map.keys())
-    for entry in weapon_map.values():
-        if not entry.get('previous_en', None):
-            continue
-        try:
-            prev_id = weapon_map.id_of('en', entry['previous_en'], entry['weapon_type'])
-            all_final.remove(prev_id)
-        except KeyError:
-            pass
+            ammo['wyvern_clip'] = entry['wyvern']['clip']
+            ammo['wyvern_reload'] = entry['wyvern']['reload']
+
+            writer.add(db.WeaponAmmo, **ammo)
+
+        # Save all weapon melodies
+        for melody_id, melody_entry in enumerate(mhdata.weapon_melodies.values(), 1):
+            writer.add(db.WeaponMelody,
+                id=melody_id,
+                base_duration=melody_entry['base_duration'],
+                base_extension=melody_entry['base_extension'],
+                m1_duration=melody_entry['m1_duration'],
+                m1_extension=melody_entry['m1_extension'],
+                m2_duration=melody_entry['m2_duration'],
+                m2_extension=melody_entry['m2_extension']
+            )
 
-    # Query next recipe id beforehand
-    next_recipe_id = calculate_next_recipe_id(session)
+            writer.add_translated(db.WeaponMelodyText, melody_entry, ['name', 'effect1', 'effect2'], id=melody_id)
 
-    # now iterate over actual weapons
-    for idx, entry in enumerate(weapon_map.values()):
-        weapon_id = entry.id
-        weapon_type = entry['weapon_type']
+            for note_entry in melody_entry['notes']:
+                writer.add(db.WeaponMelodyNotes,
+                    id=melody_id,
+                    notes=note_entry['notes']
+                )
 
-        weapon = db.Weapon(
-            id=weapon_id,
-            order_id=idx,
-            weapon_type=weapon_type,
-        )
+        # Prepass to determine which weapons are "final"
+        # All items that are a previous to another are "not final"
+        all_final = set(weapon_map.keys())
+        for entry in weapon_map.values():
+            if not entry.get('previous_en', None):
+                continue
+            try:
+                prev_id = weapon_map.id_of('en', entry['previous_en'], entry['weapon_type'])
+                all_final.remove(prev_id)
+            except KeyError:
+                pass
+
+        # now iterate over actual weapons
+        for idx, entry in enumerate(weapon_map.values()):
+            weapon_id = entry.id
+            weapon_type = entry['weapon_type']
+
+            weapon = {
+                'id': weapon_id,
+                'order_id': idx,
+                'weapon_type': weapon_type,
+            }
         
-        # Add language translations
-        for language in cfg.supported_languages:
-            weapon.translations.append(db.WeaponText(
-                lang_id=language,
-                name=get_translated(entry, 'name', language)
-            ))
-
-        weapon.category = entry['category']
-        weapon.rarity = entry['rarity']
-        weapon.attack = entry['attack']
-        weapon.attack_true = int(entry['attack'] / cfg.weapon_multiplier[weapon_type])
-        weapon.affinity = entry['affinity']
-        weapon.defense = entry['defense'] or 0
-        weapon.slot_1 = entry['slot_1']
-        weapon.slot_2 = entry['slot_2']
-        weapon.slot_3 = entry['slot_3']
-
-        weapon.element1 = entry['element1']
-        weapon.element1_attack = entry['element1_attack']
-        weapon.element2 = entry['element2']
-        weapon.element2_attack = entry['element2_attack']
-        weapon.element_hidden = entry['element_hidden']
-        weapon.elderseal = entry['elderseal']
-
-        if entry.get('sharpness', None):
-            weapon.sharpness = datafn.merge_sharpness(entry)
-            weapon.sharpness_maxed = entry['sharpness']['maxed']
-
-        weapon.kinsect_bonus = entry['kinsect_bonus']
-        weapon.phial = entry['phial']
-        weapon.phial_power = entry['phial_power']
-        weapon.shelling = entry['shelling']
-        weapon.shelling_level = entry['shelling_level']
-        weapon.notes = entry['notes']
-
-        weapon.craftable = False # set to true later if it can be crafted
-        weapon.final = weapon_id in all_final
-
-        previous_weapon_name = entry.get('previous_en', None)
-        if previous_weapon_name:
-            previous_weapon_id = weapon_map.id_of("en", previous_weapon_name, weapon_type)
-            ensure(previous_weapon_id, f"Weapon {previous_weapon_name} does not exist")
-            weapon.previous_weapon_id = previous_weapon_id
-
-        # Add crafting/upgrade recipes
-        for recipe in entry.get('craft', {}):
-            recipe_type = recipe['type']
-            if recipe_type == "Create":
-                weapon.craftable = True
-                weapon.create_recipe_id = next_recipe_id
-            else:
-                weapon.upgrade_recipe_id = next_recipe_id
-                
-            for item, quantity in datafn.iter_recipe(recipe):
-                item_id = item_map.id_of("en", item)
-                session.add(db.RecipeItem(
-                    recipe_id=next_recipe_id,
-                    item_id=item_id,
-                    quantity=quantity
-                ))
-
-            next_recipe_id += 1
-
-        # Bow data (if any)
-        if entry.get("bow", None):
-            bow_data = entry['bow']
-            weapon.coating_close = bow_data['close']
-            weapon.coating_power = bow_data['power']
-            weapon.coating_poison = bow_data['poison']
-            weapon.coating_paralysis = bow_data['paralysis']
-            weapon.coating_sleep = bow_data['sleep']
-            weapon.coating_blast = bow_data['blast']
-
-        # Gun data mapping (if any)
-        ammo_config_name = entry.get('ammo_config', None)
-        if ammo_config_name:
-            weapon.ammo_id = mhdata.weapon_ammo_map[ammo_config_name].id
+            # Add language translations
+            writer.add_translated(db.WeaponText, entry, ['name'], id=weapon_id)
+
+            weapon['category'] = entry['category']
+            weapon['rarity'] = entry['rarity']
+            weapon['attack'] = entry['attack']
+            weapon['attack_true'] = int(entry['attack'] / cfg.weapon_multiplier[weapon_type])
+            weapon['affinity'] = entry['affinity']
+            weapon['defense'] = entry['defense'] or 0
+            weapon['slot_1'] = entry['slot_1']
+            weapon['slot_2'] = entry['slot_2']
+            weapon['slot_3'] = entry['slot_3']
+
+            weapon['element1'] = entry['element1']
+            weapon['element1_attack'] = entry['element1_attack']
+            weapon['element2'] = entry['element2']
+            weapon['element2_attack'] = entry['element2_attack']
+            weapon['element_hidden'] = entry['element_hidden']
+            weapon['elderseal'] = entry['elderseal']
+
+            if entry.get('sharpness', None):
+                weapon['sharpness'] = datafn.merge_sharpness(entry)
+                weapon['sharpness_maxed'] = entry['sharpness']['maxed']
+
+            weapon['kinsect_bonus'] = entry['kinsect_bonus']
+            weapon['phial'] = entry['phial']
+            weapon['phial_power'] = entry['phial_power']
+            weapon['shelling'] = entry['shelling']
+            weapon['shelling_level'] = entry['shelling_level']
+            weapon['notes'] = entry['notes']
+
+            weapon['craftable'] = False # set to true later if it can be crafted
+            weapon['final'] = weapon_id in all_final
+
+            previous_weapon_name = entry.get('previous_en', None)
+            if previous_weapon_name:
+                previous_weapon_id = weapon_map.id_of("en", previous_weapon_name, weapon_type)
+                ensure(previous_weapon_id, f"Weapon {previous_weapon_name} does not exist")
+                weapon['previous_weapon_id'] = previous_weapon_id
+
+            # Add crafting/upgrade recipes
+            for recipe in entry.get('craft', {}):
+                recipe_id = recipes.id(get_recipe_items(item_map, recipe))
+                recipe_type = recipe['type']
+                if recipe_type == "Create":
+                    weapon['craftable'] = True
+                    weapon['create_recipe_id'] = recipe_id
+                else:
+                    weapon['upgrade_recipe_id'] = recipe_id
+
+            # Bow data (if any)
+            if entry.get("bow", None):
+                bow_data = entry['bow']
+                weapon['coating_close'] = bow_data['close']
+                weapon['coating_power'] = bow_data['power']
+                weapon['coating_poison'] = bow_data['poison']
+                weapon['coating_paralysis'] = bow_data['paralysis']
+                weapon['coating_sleep'] = bow_data['sleep']
+                weapon['coating_blast'] = bow_data['blast']
+
+            # Gun data mapping (if any)
+            ammo_config_name = entry.get('ammo_config', None)
+            if ammo_config_name:
+                weapon['ammo_id'] = mhdata.weapon_ammo_map[ammo_config_name].id
         
-        # Skills
-        if entry['skill']:
-            skill_id = mhdata.skill_map.id_of('en', entry['skill'])
-            setbonus_id = mhdata.armorset_bonus_map.id_of('en', entry['skill'])
-            if skill_id:
-                weapon.skills.append(db.WeaponSkill(
-                    skilltree_id=skill_id,
-                    level=1
-                ))
-            elif setbonus_id:
-                weapon.armorset_bonus_id = setbonus_id
-            else:
-                raise Exception(f"Invalid skill {entry['skill']}")
-
-        session.add(weapon)
+            # Skills
+            if entry['skill']:
+                skill_id = mhdata.skill_map.id_of('en', entry['skill'])
+                setbonus_id = mhdata.armorset_bonus_map.id_of('en', entry['skill'])
+                if skill_id:
+                    writer.add(db.WeaponSkill,
+                        weapon_id=weapon_id,
+                        skilltree_id=skill_id,
+                        level=1
+                    )
+                elif setbonus_id:
+                    weapon['armorset_bonus_id'] = setbonus_id
+                else:
+                    raise Exception(f"Invalid skill {entry['skill']}")
+
+            writer.add(db.Weapon, **weapon)
 
     print("Built Weapons")
 
-def build_kinsects(session: sqlalchemy.orm.Session, mhdata):
+def build_kinsects(session: sqlalchemy.orm.Session, mhdata, recipes: RecipeAllocator):
     # Prepass to determine which entries are "final"
     # Those that are a previous to another are "not final"
     all_final = set(mhdata.kinsect_map.keys())
@@ -679,45 +742,34 @@ def build_kinsects(session: sqlalchemy.orm.Session, mhdata):
         except KeyError:
             pass
 
-    # Store next recipe id ahead of time
-    next_recipe_id = calculate_next_recipe_id(session)
+    with BulkWriter(session) as writer:
+        # Save kinsects
+        for entry in mhdata.kinsect_map.values():
+            kinsect = {
+                'id': entry.id,
+                'rarity': entry['rarity'],
+                'previous_kinsect_id': mhdata.kinsect_map.id_of('en', entry['previous_en']),
+                'attack_type': entry['attack_type'],
+                'dust_effect': entry['dust_effect'],
+                'power': entry['power'],
+                'speed': entry['speed'],
+                'heal': entry['heal'],
+                'final': entry.id in all_final
+            }
+            
+            # Add language translations
+            writer.add_translated(db.KinsectText, entry, ['name'], id=entry.id)
 
-    # Save kinsects
-    for entry in mhdata.kinsect_map.values():
-        kinsect = db.Kinsect(
-            id=entry.id,
-            rarity=entry['rarity'],
-            previous_kinsect_id=mhdata.kinsect_map.id_of('en', entry['previous_en']),
-            attack_type=entry['attack_type'],
-            dust_effect=entry['dust_effect'],
-            power=entry['power'],
-            speed=entry['speed'],
-            heal=entry['heal'],
-            final= entry.id in all_final
-        )
-        
-        # Add language translations
-        for language in cfg.supported_languages:
-            kinsect.translations.append(db.KinsectText(
-                lang_id=language,
-                name=get_translated(entry, 'name', language)
-            ))
-
-        # Save kinsect recipe
-        recipe = entry.get('craft', None)
-        if recipe:
-            for item, quantity in datafn.iter_recipe(recipe):
-                item_id = mhdata.item_map.id_of("en", item)
-                ensure(item_id, f"Kinsect {entry.name('en')} refers to " +
-                    f"item {item}, which doesn't exist.")
-                kinsect.craft_items.append(db.RecipeItem(
-                    recipe_id=next_recipe_id,
-                    item_id=item_id,
-                    quantity=quantity
-                ))
-            next_recipe_id += 1
+            # Save kinsect recipe
+            recipe = entry.get('craft', None)
+            if recipe:
+                for item, quantity in datafn.iter_recipe(recipe):
+                    item_id = mhdata.item_map.id_of("en", item)
+                    ensure(item_id, f"Kinsect {entry.name('en')} refers to " +
+                        f"item {item}, which doesn't exist.")
+                kinsect['recipe_id'] = recipes.id(get_recipe_items(mhdata.item_map, recipe))
 
-        session.add(kinsect)
+            writer.add(db.Kinsect, **kinsect)
 
     print("Built Kinsects")
 
@@ -727,158 +779,242 @@ def build_decorations(session : sqlalchemy.orm.Session, mhdata):
     skill_map = mhdata.skill_map
     decoration_map = mhdata.decoration_map
 
-    for decoration_id, entry in decoration_map.items():
-        skills = list(datafn.iter_skill_levels(entry, amount=2, pad=True))
-        ensure("chances" in entry, "Missing chance data for " + entry.name('en'))
-        
-        decoration = db.Decoration(
-            id=decoration_id,
-            rarity=entry['rarity'],
-            slot=entry['slot'],
-            icon_color=entry['icon_color'],
-            skilltree_id=skill_map.id_of('en', skills[0][0]),
-            skilltree_level=skills[0][1],
-            skilltree2_id=skill_map.id_of('en', skills[1][0]),
-            skilltree2_level=skills[1][1],
-            mysterious_feystone_percent=entry['chances']['mysterious'],
-            glowing_feystone_percent=entry['chances']['glowing'],
-            worn_feystone_percent=entry['chances']['worn'],
-            warped_feystone_percent=entry['chances']['warped'],
-            ancient_feystone_percent=entry['chances']['ancient'],
-            carved_feystone_percent=entry['chances']['carved'],
-            sealed_feystone_percent=entry['chances']['sealed'],
-        )
-
-        for language in cfg.supported_languages:
-            decoration.translations.append(db.DecorationText(
-                lang_id=language,
-                name=get_translated(entry, 'name', language)
-            ))
+    with BulkWriter(session) as writer:
+        for decoration_id, entry in decoration_map.items():
+            skills = list(datafn.iter_skill_levels(entry, amount=2, pad=True))
+            ensure("chances" in entry, "Missing chance data for " + entry.name('en'))
+            
+            writer.add(db.Decoration,
+                id=decoration_id,
+                rarity=entry['rarity'],
+                slot=entry['slot'],
+                icon_color=entry['icon_color'],
+                skilltree_id=skill_map.id_of('en', skills[0][0]),
+                skilltree_level=skills[0][1],
+                skilltree2_id=skill_map.id_of('en', skills[1][0]),
+                skilltree2_level=skills[1][1],
+                mysterious_feystone_percent=entry['chances']['mysterious'],
+                glowing_feystone_percent=entry['chances']['glowing'],
+                worn_feystone_percent=entry['chances']['worn'],
+                warped_feystone_percent=entry['chances']['warped'],
+                ancient_feystone_percent=entry['chances']['ancient'],
+                carved_feystone_percent=entry['chances']['carved'],
+                sealed_feystone_percent=entry['chances']['sealed'],
+            )
 
-        session.add(decoration)
+            writer.add_translated(db.DecorationText, entry, ['name'], id=decoration_id)
 
     print("Built Decorations")
 
-def build_charms(session : sqlalchemy.orm.Session, mhdata):
+def build_charms(session : sqlalchemy.orm.Session, mhdata, recipes: RecipeAllocator):
     item_map = mhdata.item_map
     skill_map = mhdata.skill_map
     charm_map = mhdata.charm_map
 
-    # Store next recipe id ahead of time
-    next_recipe_id = calculate_next_recipe_id(session)
+    with BulkWriter(session) as writer:
+        for order_id, entry in enumerate(charm_map.values()):
+            # Note: previous is ok to be None
+            previous = charm_map.id_of('en', entry['previous_en'])
 
-    for order_id, entry in enumerate(charm_map.values()):
-        # Note: previous is ok to be None
-        previous = charm_map.id_of('en', entry['previous_en'])
+            charm = {
+                'id': entry.id,
+                'order_id': order_id,
+                'previous_id': previous,
+                'rarity': entry['rarity']
+            }
 
-        charm = db.Charm(
-            id=entry.id,
-            order_id=order_id,
-            previous_id=previous,
-            rarity=entry['rarity']
-        )
+            writer.add_translated(db.CharmText, entry, ['name'], id=entry.id)
 
-        for language in cfg.supported_languages:
-            charm.translations.append(db.CharmText(
-                lang_id=language,
-                name=get_translated(entry, 'name', language)
-            ))
-
-        # Add charm skills
-        for skill_en, level in datafn.iter_skill_levels(entry, amount=2):
-            skill_id = skill_map.id_of('en', skill_en)
-            ensure(skill_id, f"Charm {entry.name('en')} refers to " +
-                f"skill {skill_en}, which doesn't exist.")
-
-            charm.skills.append(db.CharmSkill(
-                skilltree_id=skill_id,
-                level=level
-            ))
-
-        # Add Charm Recipe
-        if entry.get('craft'):
-            for item_en, quantity in datafn.iter_recipe(entry['craft'][0]):
-                item_id = item_map.id_of('en', item_en)
-                ensure(item_id, f"Charm {entry.name('en')} refers to " +
-                    f"item {item_en}, which doesn't exist.")
-
-                charm.craft_items.append(db.RecipeItem(
-                    recipe_id=next_recipe_id,
-                    item_id=item_id,
-                    quantity=quantity
-                ))
-            next_recipe_id += 1
+            # Add charm skills
+            for skill_en, level in datafn.iter_skill_levels(entry, amount=2):
+                skill_id = skill_map.id_of('en', skill_en)
+                ensure(skill_id, f"Charm {entry.name('en')} refers to " +
+                    f"skill {skill_en}, which doesn't exist.")
+
+                writer.add(db.CharmSkill,
+                    charm_id=entry.id,
+                    skilltree_id=skill_id,
+                    level=level
+                )
+
+            # Add Charm Recipe
+            if entry.get('craft'):
+                for item_en, quantity in datafn.iter_recipe(entry['craft'][0]):
+                    item_id = item_map.id_of('en', item_en)
+                    ensure(item_id, f"Charm {entry.name('en')} refers to " +
+                        f"item {item_en}, which doesn't exist.")
 
-        session.add(charm)
+                charm['recipe_id'] = recipes.id(get_recipe_items(item_map, entry['craft'][0]))
+
+            writer.add(db.Charm, **charm)
 
     print("Built Charms")
 
 def build_tools(session : sqlalchemy.orm.Session, mhdata):
-    for order_id, tool_entry in enumerate(mhdata.tool_map.values()):
-        tool = db.Tool(
-            id=tool_entry.id,
-            order_id=order_id,
-            tool_type=tool_entry['tool_type'],
-            duration=tool_entry['duration'],
-            duration_upgraded=tool_entry['duration_upgraded'],
-            recharge=tool_entry['recharge'],
-            slot_1=tool_entry['slot_1'],
-            slot_2=tool_entry['slot_2'],
-            slot_3=tool_entry['slot_3'],
-            icon_color=tool_entry['icon_color'])
-
-        for language in cfg.supported_languages:
-            tool.translations.append(db.ToolText(
-                lang_id=language,
-                name=get_translated(tool_entry, 'name', language),
-                name_base=get_translated(tool_entry, 'name_base', language),
-                description=get_translated(tool_entry, 'description', language)
-            ))
-
-        session.add(tool)
+    with BulkWriter(session) as writer:
+        for order_id, tool_entry in enumerate(mhdata.tool_map.values()):
+            writer.add(db.Tool,
+                id=tool_entry.id,
+                order_id=order_id,
+                tool_type=tool_entry['tool_type'],
+                duration=tool_entry['duration'],
+                duration_upgraded=tool_entry['duration_upgraded'],
+                recharge=tool_entry['recharge'],
+                slot_1=tool_entry['slot_1'],
+                slot_2=tool_entry['slot_2'],
+                slot_3=tool_entry['slot_3'],
+                icon_color=tool_entry['icon_color'])
+
+            writer.add_translated(db.ToolText, tool_entry, ['name', 'name_base', 'description'], id=tool_entry.id)
     
     print("Built Tools")
 
 def build_quests(session : sqlalchemy.orm.Session, mhdata, item_tracker: ItemTracker):
-    for order_id, entry in enumerate(mhdata.quest_map.values()):
-        stars = entry['stars']
-        quest = db.Quest(
-            id=entry.id,
-            order_id=order_id,
-            category=entry['category'],
-            rank=entry['rank'],
-            stars=stars,
-            stars_raw=stars + 10 if entry['rank'] == 'MR' else stars,
-            quest_type=entry['quest_type'],
-            location_id=mhdata.location_map.id_of('en', entry['location_en']),
-            zenny=entry['zenny']
-        )
+    with BulkWriter(session) as writer:
+        for order_id, entry in enumerate(mhdata.quest_map.values()):
+            stars = entry['stars']
+            writer.add(db.Quest,
+                id=entry.id,
+                order_id=order_id,
+                category=entry['category'],
+                rank=entry['rank'],
+                stars=stars,
+                stars_raw=stars + 10 if entry['rank'] == 'MR' else stars,
+                quest_type=entry['quest_type'],
+                location_id=mhdata.location_map.id_of('en', entry['location_en']),
+                zenny=entry['zenny']
+            )
 
-        for language in cfg.supported_languages:
-            quest.translations.append(db.QuestText(
-                lang_id=language,
-                name=entry.name(language),
-                objective=entry['objective'][language],
-                description=entry['description'][language]
-            ))
-
-        for monster_entry in entry['monsters']:
-            quest.monsters.append(db.QuestMonster(
-                monster_id=mhdata.monster_map.id_of('en', monster_entry['monster_en']),
-                quantity=monster_entry['quantity'],
-                is_objective=monster_entry['is_objective']
-            ))
-
-        for reward_entry in entry['rewards']:
-            item_id = mhdata.item_map.id_of('en', reward_entry['item_en'])
-            item_tracker.mark_encountered_id(item_id)
-            quest.rewards.append(db.QuestReward(
-                group=reward_entry['group'],
-                item_id=item_id,
-                stack=reward_entry['stack'],
-                percentage=reward_entry['percentage']
-            ))
-
-        session.add(quest)
+            # Quest text is left empty in languages it wasn't translated to
+            writer.add_translated(db.QuestText, entry, ['name', 'objective', 'description'],
+                fallback=False, id=entry.id)
+
+            for monster_entry in entry['monsters']:
+                writer.add(db.QuestMonster,
+                    quest_id=entry.id,
+                    monster_id=mhdata.monster_map.id_of('en', monster_entry['monster_en']),
+                    quantity=monster_entry['quantity'],
+                    is_objective=monster_entry['is_objective']
+                )
+
+            for reward_entry in entry['rewards']:
+                item_id = mhdata.item_map.id_of('en', reward_entry['item_en'])
+                item_tracker.mark_encountered_id(item_id)
+                writer.add(db.QuestReward,
+                    quest_id=entry.id,
+                    group=reward_entry['group'],
+                    item_id=item_id,
+                    stack=reward_entry['stack'],
+                    percentage=reward_entry['percentage']
+                )
 
     print('Build Quests')
+
+def build_recipes(session : sqlalchemy.orm.Session, mhdata, recipes: RecipeAllocator):
+    "Saves the items of every allocated recipe. The recipes are used by armor, weapons, kinsects, and charms"
+    with BulkWriter(session) as writer:
+        for recipe_id, items in recipes.recipes.items():
+            for item_id, quantity in items.items():
+                writer.add(db.RecipeItem,
+                    recipe_id=recipe_id,
+                    item_id=item_id,
+                    quantity=quantity
+                )
+
+    print("Built Recipes")
+
+class BuildCategory:
+    """A group of tables that are built together by one of the build functions.
+    Used to only rebuild the tables whose data changed in an incremental build.
+
+    fields are the loaded data the tables are built from, and linked_fields are the
+    data maps of other categories whose ids are stored in the tables.
+    If uses_recipes is set, the build function takes the RecipeAllocator,
+    and the category is rebuilt whenever any recipe ids change.
+    """
+    def __init__(self, name, build_fn, *, tables, fields, linked_fields=[],
+            uses_recipes=False, tracks_items=False):
+        self.name = name
+        self.build_fn = build_fn
+        self.tables = tables
+        self.fields = fields
+        self.linked_fields = linked_fields
+        self.uses_recipes = uses_recipes
+        self.tracks_items = tracks_items
+
+    def build(self, session, mhdata, item_tracker: ItemTracker, recipes: RecipeAllocator):
+        if self.tracks_items:
+            self.build_fn(session, mhdata, item_tracker)
+        elif self.uses_recipes:
+            self.build_fn(session, mhdata, recipes)
+        else:
+            self.build_fn(session, mhdata)
+
+    def clear(self, session):
+        "Deletes every row created by this category's build function"
+        for table in self.tables:
+            session.query(table).delete(synchronize_session=False)
+
+# All build categories, in build order
+build_categories = [
+    BuildCategory('items', build_items,
+        tables=[db.Item, db.ItemText, db.ItemCombination],
+        fields=['item_map', 'item_combinations'],
+        tracks_items=True),
+    BuildCategory('locations', build_locations,
+        tables=[db.Location, db.LocationItem, db.LocationCamp],
+        fields=['location_map'],
+        linked_fields=['item_map'],
+        tracks_items=True),
+    BuildCategory('monsters', build_monsters,
+        tables=[
+            db.Monster, db.MonsterText, db.MonsterHabitat,
+            db.MonsterHitzone, db.MonsterHitzoneText, db.MonsterBreak, db.MonsterBreakText,
+            db.MonsterReward, db.MonsterRewardConditionText],
+        fields=['monster_map', 'monster_reward_conditions_map'],
+        linked_fields=['item_map', 'location_map'],
+        tracks_items=True),
+    BuildCategory('skills', build_skills,
+        tables=[db.SkillTree, db.SkillTreeText, db.Skill],
+        fields=['skill_map']),
+    BuildCategory('armor', build_armor,
+        tables=[
+            db.ArmorSetBonusText, db.ArmorSetBonusSkill, db.ArmorSet, db.ArmorSetText,
+            db.Armor, db.ArmorText, db.ArmorSkill],
+        fields=['armor_map', 'armorset_map', 'armorset_bonus_map'],
+        linked_fields=['item_map', 'skill_map', 'monster_map'],
+        uses_recipes=True),
+    BuildCategory('weapons', build_weapons,
+        tables=[
+            db.WeaponAmmo, db.WeaponMelody, db.WeaponMelodyText, db.WeaponMelodyNotes,
+            db.Weapon, db.WeaponText, db.WeaponSkill],
+        fields=['weapon_map', 'weapon_ammo_map', 'weapon_melodies'],
+        linked_fields=['item_map', 'skill_map', 'armorset_bonus_map'],
+        uses_recipes=True),
+    BuildCategory('kinsects', build_kinsects,
+        tables=[db.Kinsect, db.KinsectText],
+        fields=['kinsect_map'],
+        linked_fields=['item_map'],
+        uses_recipes=True),
+    BuildCategory('decorations', build_decorations,
+        tables=[db.Decoration, db.DecorationText],
+        fields=['decoration_map'],
+        linked_fields=['skill_map']),
+    BuildCategory('charms', build_charms,
+        tables=[db.Charm, db.CharmSkill, db.CharmText],
+        fields=['charm_map'],
+        linked_fields=['item_map', 'skill_map'],
+        uses_recipes=True),
+    BuildCategory('tools', build_tools,
+        tables=[db.Tool, db.ToolText],
+        fields=['tool_map']),
+    BuildCategory('quests', build_quests,
+        tables=[db.Quest, db.QuestText, db.QuestMonster, db.QuestReward],
+        fields=['quest_map'],
+        linked_fields=['location_map', 'monster_map', 'item_map'],
+        tracks_items=True),
+    BuildCategory('recipes', build_recipes,
+        tables=[db.RecipeItem],
+        fields=[],
+        uses_recipes=True),
+]
@@ -0,0 +1,86 @@
+"""
+Converts DataMaps into NumPy structured arrays, to run analytics over the data as columns.
+NumPy is an optional dependency, and is only required when using this module.
+
+Nested dictionaries become columns named like groups (name_en, sharpness_red).
+Nested lists are skipped, but can be converted on their own by passing their key,
+which creates one row per list item with a parent id column linking back to the entry.
+
+    hitzones = to_columns(mhdata.monster_map, 'hitzones', parent_key='monster_id')
+    fire_average = hitzones['fire'].mean()
+"""
+
+import typing
+import collections.abc
+from decimal import Decimal
+
+import numpy as np
+
+from .datamap import DataMap
+
+def _flatten(obj, prefix='', result=None):
+    "Flattens nested mappings into a single dictionary, with keys joined by _. Lists are skipped"
+    result = {} if result is None else result
+    for key, value in obj.items():
+        if isinstance(value, collections.abc.Mapping):
+            _flatten(value, f'{prefix}{key}_', result)
+        elif isinstance(value, str) or not isinstance(value, collections.abc.Iterable):
+            result[f'{prefix}{key}'] = value
+    return result
+
+def _create_column(values: list):
+    """Converts a list of values into a numpy array, picking the type from the values.
+    Columns of ints or floats with missing values become float columns using nan.
+    Columns of other types with missing values become object columns using None."""
+    present = [v for v in values if v is not None]
+    types = set(type(v) for v in present)
+    has_missing = len(present) != len(values)
+
+    if types == {bool} and not has_missing:
+        return np.array(values, dtype=np.bool_)
+    if types == {int} and not has_missing:
+        return np.array(values, dtype=np.int64)
+    if types and types <= {int, float, Decimal}:
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    return column
+
+def to_columns(data_map: DataMap, key=None, *, fields: typing.Iterable[str] = None, parent_key=None):
+    """Returns the entries of a data map as a NumPy structured array.
+
+    If key is given, the rows are instead the items of the list stored under key in each entry,
+    with an additional column that contains the id of the entry they belong to.
+    That column is named parent_key, which defaults to parent_id.
+
+    If fields is given, only those columns are included and in that order.
+    Otherwise every column that appears in any row is included.
+    """
+    if key is not None and parent_key is None:
+        parent_key = 'parent_id'
+
+    rows = []
+    for entry in data_map.values():
+        if key is None:
+            rows.append(_flatten(entry))
+            continue
+
+        for item in (entry.get(key, None) or []):
+            if not isinstance(item, collections.abc.Mapping):
+                item = { key: item }
+            rows.append(_flatten(item, result={ parent_key: entry.id }))
+
+    if fields is None:
+        fields = list(dict.fromkeys(name for row in rows for name in row.keys()))
+    else:
+        fields = list(fields)
+        if key is not None and parent_key not in fields:
+            fields.insert(0, parent_key)
+
+    columns = [_create_column([row.get(name, None) for row in rows]) for name in fields]
+
+    result = np.empty(len(rows), dtype=[(name, c.dtype) for (name, c) in zip(fields, columns)])
+    for name, column in zip(fields, columns):
+        result[name] = column
+    return result
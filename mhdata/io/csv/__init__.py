@@ -5,4 +5,4 @@ in a manner that can be used by the program.
 Functions here provide reasonable defaults, autodetect fields, and provide nesting.
 """
 
-from .functions import save_csv, read_csv
+from .functions import save_csv, read_csv, iter_csv
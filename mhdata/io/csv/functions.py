@@ -16,30 +16,6 @@ def determine_fields(obj_list):
 
     return fields
 
-def validate_csv(obj_list, filename):
-    "Minor validation. Warning for any key/value without whitespace"
-    warn_keys = False
-    warn_value_rows = []
-    for row_idx, item in enumerate(obj_list):
-        for key in item.keys():
-            if key.startswith(" ") or key.endswith(" "):
-                warn_keys = True
-
-        for column_idx, value in enumerate(item.values()):
-            if value is None:
-                continue
-
-            if value.startswith(" ") or value.endswith(" "):
-                warn_value_rows.append((row_idx + 1, column_idx + 1))
-                break
-                
-    if warn_keys:
-        print("Warning: Some keys in CSV are not trimmed: " + filename)
-    if warn_value_rows:
-        cell_strings = map(lambda c: "({0}, {1})".format(c[0], c[1]), warn_value_rows)
-        print("Warning: Some values in CSV are not trimmed: "
-            + filename + " cells: " + ", ".join(cell_strings))
-
 @contextlib.contextmanager
 def open_resolved(path_or_file, mode, encoding):
     is_path = isinstance(path_or_file, str)
@@ -69,19 +45,58 @@ def save_csv(obj_list, location, fields=None):
         writer.writerows(obj_list)
 
 
-def read_csv(location, fieldnames=None):
-    "Reads a csv file as an object list without additional processing"
+def iter_csv(location, fieldnames=None):
+    """Reads a csv file as a generator of rows without additional processing.
+    Empty values are returned as None.
+
+    Rows are validated while reading, and warnings are printed once the whole file was read.
+    The file is open until the generator is exhausted or closed."""
     with open(location, encoding="utf-8") as f:
-        reader = csv.DictReader(f, fieldnames=fieldnames)
-        items = list(reader)
+        reader = csv.reader(f)
+        if fieldnames is None:
+            fieldnames = next(reader, [])
+
+        if any(key.startswith(" ") or key.endswith(" ") for key in fieldnames):
+            print("Warning: Some keys in CSV are not trimmed: " + location)
 
         # CSV does not distinguish between empty string and null
-        # Set empties to null
-        for item in items:
-            for key, value in item.items():
-                if value == '':
+        # Set empties to null, while checking for untrimmed values in the same pass
+        field_count = len(fieldnames)
+        warn_value_rows = []
+        row_idx = 0
+        for values in reader:
+            if not values:
+                continue # skip empty lines, same as csv.DictReader
+            row_idx += 1
+
+            item = dict(zip(fieldnames, values))
+            if '' in values:
+                for key, value in item.items():
+                    if value == '':
+                        item[key] = None
+
+            # Joining the row first is much faster than testing every value
+            joined = '\0' + '\0'.join(values) + '\0'
+            if '\0 ' in joined or ' \0' in joined:
+                for column_idx, value in enumerate(values[:field_count]):
+                    if value and (value[0] == ' ' or value[-1] == ' '):
+                        warn_value_rows.append((row_idx, column_idx + 1))
+                        break
+
+            # Short and long rows are handled the same way as csv.DictReader
+            if len(values) < field_count:
+                for key in fieldnames[len(values):]:
                     item[key] = None
+            elif len(values) > field_count:
+                item[None] = values[field_count:]
+
+            yield item
 
-        validate_csv(items, location)
-            
-        return items
+    if warn_value_rows:
+        cell_strings = map(lambda c: "({0}, {1})".format(c[0], c[1]), warn_value_rows)
+        print("Warning: Some values in CSV are not trimmed: "
+            + location + " cells: " + ", ".join(cell_strings))
+
+def read_csv(location, fieldnames=None):
+    "Reads a csv file as an object list without additional processing"
+    return list(iter_csv(location, fieldnames))
@@ -0,0 +1,100 @@
+import bisect
+
+class HashIndex:
+    """A secondary index of DataMap rows by the value of a field or a function of the row.
+    Supports lookups by exact value in constant time.
+    Rows are indexed by id, and lookups return ids in the order they were indexed.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+        if callable(field):
+            self.key_fn = field
+            self.depends_on = None
+        else:
+            self.key_fn = lambda row: row.get(field, None)
+
+            # Nested fields like name_en can also change when the name field is set
+            self.depends_on = { field }
+            if '_' in field:
+                self.depends_on.add(field.rsplit('_', 1)[0])
+
+        self._values = {} # id -> indexed value, required to unindex after a row changes
+        self._buckets = {}
+
+    def affected_by(self, key):
+        "Returns true if changing the given row key could change the indexed value"
+        return self.depends_on is None or key in self.depends_on
+
+    def add(self, row):
+        value = self.key_fn(row)
+        self._values[row.id] = value
+        self._buckets.setdefault(value, {})[row.id] = None
+
+    def remove(self, row):
+        value = self._values.pop(row.id)
+        bucket = self._buckets[value]
+        del bucket[row.id]
+        if not bucket:
+            del self._buckets[value]
+
+    def lookup(self, value):
+        "Returns a list of the ids of all rows with the given value"
+        return list(self._buckets.get(value, ()))
+
+    def __getstate__(self):
+        # Functions created for field indexes are not picklable, recreate them on load
+        state = self.__dict__.copy()
+        if not callable(self.field):
+            del state['key_fn']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if not callable(self.field):
+            field = self.field
+            self.key_fn = lambda row: row.get(field, None)
+
+
+class SortedIndex(HashIndex):
+    """A secondary index that keeps rows sorted by the indexed value.
+    In addition to lookups by exact value, this supports range queries in logarithmic time.
+    Rows where the indexed value is None are not included.
+    Results are ordered by value, and then by id.
+    """
+
+    def __init__(self, field):
+        super().__init__(field)
+        self._entries = [] # sorted list of (value, id)
+
+    def add(self, row):
+        value = self.key_fn(row)
+        self._values[row.id] = value
+        if value is not None:
+            bisect.insort(self._entries, (value, row.id))
+
+    def remove(self, row):
+        value = self._values.pop(row.id)
+        if value is not None:
+            position = bisect.bisect_left(self._entries, (value, row.id))
+            del self._entries[position]
+
+    def lookup(self, value):
+        if value is None:
+            return []
+        return self.range(value, value)
+
+    def range(self, low=None, high=None):
+        """Returns a list of the ids of all rows whose value is between low and high, inclusive.
+        If low or high is None, that end of the range is unbounded."""
+        start = 0
+        if low is not None:
+            start = bisect.bisect_left(self._entries, (low,))
+
+        end = len(self._entries)
+        if high is not None:
+            # (high, inf) sorts after every (high, id) pair
+            end = bisect.bisect_right(self._entries, (high, float('inf')), start)
+
+        return [entry_id for (_, entry_id) in self._entries[start:end]]
@@ -1,12 +1,13 @@
 import typing
 import collections
-import itertools
+import heapq
 import copy
 
 from collections.abc import Mapping, KeysView
 from mhdata.util import joindicts, extract_fields, typecheck
 
-from .datarow import DataRow
+from .datarow import DataRow, RowLayoutTable
+from .dataindex import HashIndex, SortedIndex
 from .functions import to_basic
 
 
@@ -40,16 +41,21 @@ class DataMap(collections.abc.Mapping):
     def __init__(self, data: typing.Mapping[int, dict] = None, languages=None, keys_ex=[], start_id=1):
         self._data = collections.OrderedDict()
         self._reverse_entries = {}
+        self._indexes = {}
+        self._row_layouts = RowLayoutTable()
 
         # List of languages that the data map can innately handle.
         # This distinction is required as some languages have duplicate entries for certain items.
         self.languages = languages
 
-        # todo: replace id gen with the object index custom object...maybe...
         self.keys_ex = keys_ex
         self.start_id = start_id
-        self._id_gen = itertools.count(start_id)
-        self._last_id = 0
+
+        # The next generated id, always higher than any id ever added.
+        self._next_id = start_id
+
+        # Heap of negated ids used to find the max id. Removed ids are discarded lazily
+        self._id_heap = []
 
         if data:
             for id, entry in data.items():
@@ -68,29 +74,72 @@ class DataMap(collections.abc.Mapping):
         id_value = self.id_of(language_code, name, *keys)
         return self._data.get(id_value, None)
 
+    def create_index(self, field, *, name=None, ordered=False):
+        """Creates a secondary index over the rows of this map, usable by lookup() and range().
+
+        The field can be a key (including nested keys like name_en), or a function that takes a row.
+        The index is named after the field, unless a name is given. A name is required for functions.
+        If ordered is set, the index is sorted and also supports range() queries.
+
+        Indexes are updated when rows are added or removed, or when a row's value is set.
+        Changes made within nested values (like row['name']['en'] = x) are not detected,
+        for indexes on functions any set on the row will reindex it.
+        """
+        if name is None:
+            if callable(field):
+                raise ValueError("A name is required when indexing with a function")
+            name = field
+
+        if name in self._indexes:
+            raise ValueError(f"An index named {name} already exists in DataMap")
+
+        index = SortedIndex(field) if ordered else HashIndex(field)
+        for entry in self._data.values():
+            index.add(entry)
+        self._indexes[name] = index
+
+    def drop_index(self, name):
+        "Removes a secondary index created by create_index"
+        del self._indexes[name]
+
+    def lookup(self, index_name, value) -> typing.List[DataRow]:
+        "Returns a list of all entries whose indexed value equals the given value"
+        return [self._data[entry_id] for entry_id in self._indexes[index_name].lookup(value)]
+
+    def range(self, index_name, low=None, high=None) -> typing.List[DataRow]:
+        """Returns a list of all entries whose indexed value is between low and high inclusive,
+        sorted by the value. Requires an index created with ordered=True.
+        If low or high is None, that end of the range is unbounded."""
+        index = self._indexes[index_name]
+        if not isinstance(index, SortedIndex):
+            raise ValueError(f"Index {index_name} is not ordered and does not support ranges")
+        return [self._data[entry_id] for entry_id in index.range(low, high)]
+
+    def _indexes_affected_by(self, entry, key):
+        "Internal: returns the indexes that need to be updated when the key of an entry changes"
+        if not self._indexes or self._data.get(entry.id, None) is not entry:
+            return ()
+        return [index for index in self._indexes.values() if index.affected_by(key)]
+
     @property
     def max_id(self):
-        "Gets the max id value stored. Runs in linear time every time."
-        return max((entry.id for entry in self._data.values()), default=0)
+        "Gets the max id value stored, or 0 if empty. Runs in constant time unless the max was removed."
+        heap = self._id_heap
+        while heap and -heap[0] not in self._data:
+            heapq.heappop(heap)
+        return -heap[0] if heap else 0
 
     def _generate_id(self):
-        "Helper that creates a new id for a new object. Handles collisions"
-        entry_id = next(self._id_gen)
-        if entry_id in self:
-            # This should have been handled
-            print("Warning: Unexpected entry id expansion in DataMap")
-            self._revaluate_idgen(self.max_id)
-            entry_id = next(self._id_gen)
-
-        self._last_id = entry_id
+        "Helper that creates a new id for a new object"
+        entry_id = self._next_id
+        self._next_id += 1
         return entry_id
 
-    def _revaluate_idgen(self, entry_id):
-        "Helper that updates the id generator if the old generator is now invalid"
-        if isinstance(entry_id, int) and entry_id > self._last_id:
-            next_id = max(entry_id + 1, self.start_id)
-            self._id_gen = itertools.count(next_id)
-            self._last_id = entry_id
+    def _track_id(self, entry_id):
+        "Helper that updates the max id and the next generated id for an added id"
+        heapq.heappush(self._id_heap, -entry_id)
+        if entry_id >= self._next_id:
+            self._next_id = entry_id + 1
 
     def _unregister_entry(self, entry):
         "Internal function to remove the entry from the reverse mapping"
@@ -127,7 +176,9 @@ class DataMap(collections.abc.Mapping):
         self._register_entry(new_entry)
         
         self._data[entry_id] = new_entry
-        self._revaluate_idgen(entry_id)
+        for index in self._indexes.values():
+            index.add(new_entry)
+        self._track_id(entry_id)
 
         return new_entry
 
@@ -173,6 +224,12 @@ class DataMap(collections.abc.Mapping):
         "Fully converts the data entries stored into a serializable list"
         return to_basic(self.values())
 
+    def to_columns(self, key=None, **kwargs):
+        """Converts the entries stored into a NumPy structured array. Requires NumPy.
+        See mhdata.io.columnar.to_columns for the available options."""
+        from .columnar import to_columns
+        return to_columns(self, key, **kwargs)
+
     def copy(self):
         "Returns a new DataMap object with all fields cloned"
         clone_data = self.to_dict()
@@ -236,6 +293,8 @@ class DataMap(collections.abc.Mapping):
 
     def __delitem__(self, id):
         entry = self._data[id]
+        for index in self._indexes.values():
+            index.remove(entry)
         del self._data[id]
         for lang, val in entry.names():
             keys_ex = [entry[k] for k in (self.keys_ex or [])]
@@ -1,17 +1,78 @@
 from collections.abc import MutableMapping, Iterable
 from .functions import to_basic
 
+class RowLayoutTable:
+    """A collection of the RowLayouts used by the rows of a single DataMap.
+    Rows with the same keys in the same order share the same layout object."""
+
+    def __init__(self):
+        self._layouts = {}
+
+    def get(self, keys: tuple):
+        "Returns the layout for the given tuple of keys, creating it if necessary"
+        layout = self._layouts.get(keys, None)
+        if layout is None:
+            layout = self._layouts[keys] = RowLayout(self, keys)
+        return layout
+
+class RowLayout:
+    """The column layout shared by DataRows, which maps keys to offsets in the row's value list.
+    Layouts are immutable, changing the keys of a row switches it to a different layout.
+    """
+    __slots__ = ('table', 'keys', 'offsets', '_added', '_nested')
+
+    def __init__(self, table, keys):
+        self.table = table
+        self.keys = keys
+        self.offsets = { key:idx for (idx, key) in enumerate(keys) }
+        self._added = {}
+        self._nested = {}
+
+    def with_key(self, key):
+        "Returns the layout of a row with this layout after a key is added to the end"
+        layout = self._added.get(key, None)
+        if layout is None:
+            layout = self._added[key] = self.table.get(self.keys + (key,))
+        return layout
+
+    def nested_key(self, key):
+        """Returns an (offset, subkey) tuple used to resolve a nested key like name_en,
+        or None if the key cannot refer to a nested value in this layout."""
+        try:
+            return self._nested[key]
+        except KeyError:
+            pass
+
+        result = None
+        if '_' in key:
+            key1, key2 = key.rsplit('_', 1)
+            if key1 in self.offsets:
+                result = (self.offsets[key1], key2)
+
+        self._nested[key] = result
+        return result
+
 class DataRow(MutableMapping):
     """Defines a single row of a datamap object.
     These objects are regular dictionaries that can also get translated names.
+
+    Internally the values are stored in a list, and the keys are stored in a layout
+    shared with the other rows of the DataMap that have the same keys.
     """
+    __slots__ = ('_parent', '_layout', '_values')
 
     def __init__(self, parent, row_id: int, datarowdict: dict):
         self._parent = parent
-        self._data = { 'id': row_id }
+
+        keys = ['id']
+        values = [row_id]
         for key, value in datarowdict.items():
             if key != 'id':
-                self._data[key] = value
+                keys.append(key)
+                values.append(value)
+
+        self._layout = parent._row_layouts.get(tuple(keys))
+        self._values = values
 
     @property
     def id(self):
@@ -34,48 +95,76 @@ class DataRow(MutableMapping):
             self[key] = value
             return
 
+        keys = self._layout.keys
         keys_to_move = []
-        found_item = False
-        for item_key in self._data.keys():
-            if found_item:
-                keys_to_move.append(item_key)
-            elif item_key == after:
-                found_item = True
+        if after in self._layout.offsets:
+            keys_to_move = keys[self._layout.offsets[after] + 1:]
 
         self[key] = value
 
         # Move every entry to the end of the list
-        for item_key in keys_to_move:
-            value = self._data[item_key]
-            del self._data[item_key]
-            self._data[item_key] = value
+        if keys_to_move:
+            keys = tuple(k for k in self._layout.keys if k not in keys_to_move) + keys_to_move
+            self._reorder(keys)
+
+    def _reorder(self, keys: tuple):
+        "Internal: switches the row to a layout containing the same keys in a different order"
+        offsets = self._layout.offsets
+        values = self._values
+        self._values = [values[offsets[k]] for k in keys]
+        self._layout = self._layout.table.get(keys)
 
     def to_dict(self):
         return to_basic(self)
 
     def __getitem__(self, key: str):
-        if key in self._data:
-            return self._data[key]
-        elif '_' in key:
-            key1, key2 = key.rsplit('_', 1)
-            if key1 in self._data:
-                nested = self._data[key1]
-                if isinstance(nested, Iterable) and key2 in nested:
-                    return nested[key2]
-            
+        offset = self._layout.offsets.get(key, None)
+        if offset is not None:
+            return self._values[offset]
+
+        nested_key = self._layout.nested_key(key)
+        if nested_key is not None:
+            offset, key2 = nested_key
+            nested = self._values[offset]
+            if isinstance(nested, Iterable) and key2 in nested:
+                return nested[key2]
+
         raise KeyError(f'No entry with {key} found in data row')
 
     def __setitem__(self, key, value):
-        self._data[key] = value
+        indexes = self._parent._indexes_affected_by(self, key)
+        for index in indexes:
+            index.remove(self)
+
+        offset = self._layout.offsets.get(key, None)
+        if offset is not None:
+            self._values[offset] = value
+        else:
+            self._layout = self._layout.with_key(key)
+            self._values.append(value)
+
+        for index in indexes:
+            index.add(self)
 
     def __delitem__(self, key):
-        del self._data[key]
+        offset = self._layout.offsets[key]
+
+        indexes = self._parent._indexes_affected_by(self, key)
+        for index in indexes:
+            index.remove(self)
+
+        keys = self._layout.keys
+        self._layout = self._layout.table.get(keys[:offset] + keys[offset+1:])
+        del self._values[offset]
+
+        for index in indexes:
+            index.add(self)
 
     def __iter__(self):
-        return self._data.__iter__()
+        return iter(self._layout.keys)
 
     def __len__(self):
-        return self._data.__len__()
+        return len(self._values)
 
     def __repr__(self):
         # Show the repr of the shallow copy
@@ -1,26 +1,43 @@
 import typing
 from collections import abc
 import copy
+import itertools
 import re
 
 import mhdata.typecheck as typecheck
 import mhdata.util as util
 
+# Types that are returned as-is by to_basic, checked before any of the slower abc checks
+_basic_scalars = frozenset((str, int, float, bool, type(None)))
+
 def to_basic(obj, *, stack=[]):
     """Converts an object to its most basic form, recursively.
-    Does not prevent infinite recursion, careful with usage.
+    Raises an exception if a cyclical reference is found.
     """
+    return _to_basic(obj, set(stack))
+
+def _to_basic(obj, active):
+    "Internal implementation of to_basic. Active is the set of ids of the containers being converted"
+    if type(obj) in _basic_scalars:
+        return obj
+
     obj_id = id(obj)
-    if obj_id in stack:
+    if obj_id in active:
         raise Exception("Cyclical reference detected")
 
     if isinstance(obj, abc.Mapping):
         # This can be converted to a dictionary
-        return { k:to_basic(v, stack=stack+[obj_id]) for (k, v) in obj.items() }
+        active.add(obj_id)
+        result = { k:_to_basic(v, active) for (k, v) in obj.items() }
+        active.discard(obj_id)
+        return result
     elif isinstance(obj, str):
         return obj
     elif isinstance(obj, abc.Iterable):
-        return [to_basic(v, stack=stack+[obj_id]) for v in obj]
+        active.add(obj_id)
+        result = [_to_basic(v, active) for v in obj]
+        active.discard(obj_id)
+        return result
     else:
         return obj
 
@@ -35,14 +52,30 @@ def derive_lang(field):
     return match.group(1)
 
 def fix_id(rows: typing.Iterable[dict]):
+    "Lazily converts the id field of every row to an int, yielding the rows"
     for row in rows:
         if 'id' in row: row['id'] = int(row['id'])
-    return rows
+        yield row
 
-def merge_list(base, rows: typing.Iterable[dict], key=None, groups=[], many=False):
-    """Routine to merge lists of dictionaries together using one or more keys.
+def create_merge_index(base, key_fields):
+    """Creates the base side index used by merge_list, which maps key tuples to entries.
+    Every key component is stringified, so that ids loaded as numbers and strings can be joined.
+    """
+    result = {}
+    for entry in base.values():
+        items = (entry[f'base_{k}'] if f'base_{k}' in entry else entry[k] for k in key_fields)
+        result[tuple(str(i) for i in items)] = entry
+    return result
+
+def key_rows(base, rows: typing.Iterable[dict], groups=[], many=False):
+    """Groups rows by the key used to join them to the base map, removing the key columns.
+    The rows can be any iterable, including a generator, and are consumed once.
     The keys used are determined by first sequential key of the first row.
     If the key is an id, it will join on that, but if it is a name, it will join on that and key_ex fields.
+
+    Returns a (key_fields, keyed_data) tuple where keyed_data is a dictionary of key -> list of rows,
+    or None if there are no rows. The key columns are resolved from the first row,
+    so all rows must share the same columns.
     """
     def create_key_fields(data_map, column_name):
         lang = derive_lang(column_name)
@@ -56,40 +89,23 @@ def merge_list(base, rows: typing.Iterable[dict], key=None, groups=[], many=Fals
 
         return key_fields
 
-    def create_key_fn(key_fields):
-        def derive_key(dict):
-            items = []
-            for k in key_fields:
-                if f'base_{k}' in dict:
-                    items.append(dict[f'base_{k}'])
-                else:
-                    items.append(dict[k])
-            return tuple(str(i) for i in items)
-        return derive_key
-
-    if many and not key:
-        raise ValueError('Key must have a value')
-
-    if not rows:
-        return
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        return None
 
-    # Create keying function
-    first_column = next(iter(rows[0].keys()))
+    # Resolve the key columns once. base_ columns take priority, since
+    # its possible for base_name_en AND name_en to be in the same row.
+    first_column = next(iter(first_row.keys()))
     key_fields = create_key_fields(base, first_column)
-    derive_key = create_key_fn(key_fields)
+    key_columns = [(f'base_{k}' if f'base_{k}' in first_row else k) for k in key_fields]
 
     # group rows
     keyed_data = {}
-    for row in rows:
-        row_key = derive_key(row)
-
-        # Delete key fields. Its possible for base_name_en AND name_en to be in the same row.
-        # Therefore, prioritize deleting base_ versions first
-        for k in key_fields:
-            if f'base_{k}' in row:
-                del row[f'base_{k}']
-            elif k in row:
-                del row[k]
+    for row in itertools.chain([first_row], rows):
+        row_key = tuple(str(row[k]) for k in key_columns)
+        for k in key_columns:
+            del row[k]
                 
         if groups:
             row = util.group_fields(row, groups=groups)
@@ -98,24 +114,64 @@ def merge_list(base, rows: typing.Iterable[dict], key=None, groups=[], many=Fals
         if not many and len(entry) > 1:
             raise ValueError(f"Key {row_key} has too many matching entries in sub data")
 
-    # Group base
-    base = { derive_key(e):e for e in base.values() }
+    return (key_fields, keyed_data)
+
+def join_keyed_rows(base, key_fields, keyed_data, *, base_indexes=None):
+    """Matches the result of key_rows() to the entries of the base map.
+    Returns a list of (base_entry, data_entries) tuples, and raises if any key can't be joined.
+
+    If base_indexes is given, it is used as a cache of base indexes by key fields,
+    so that joining multiple lists to the same base only indexes the base once.
+    The cache must be discarded if the base's key fields are changed.
+    """
+    if base_indexes is None:
+        base_indexes = {}
+    index_key = tuple(key_fields)
+    base_index = base_indexes.get(index_key, None)
+    if base_index is None:
+        base_index = base_indexes[index_key] = create_merge_index(base, key_fields)
+
     "Test the keys to see that sub's keys exist in base"
-    unlinked = [k for k in keyed_data.keys() if k not in base.keys()]
+    unlinked = [k for k in keyed_data.keys() if k not in base_index]
     if unlinked:
         raise Exception(
             "Several entries in sub data map cannot be joined. Their keys are " +
             ','.join('None' if e is None else str(e) for e in unlinked))
 
-    for data_key, data_entries in keyed_data.items():
-        base_entry = base[data_key]
-        if key:
-            if many:
-                base_entry[key] = data_entries
-            else:
-                base_entry[key] = data_entries[0]
-        elif isinstance(data_entries[0], abc.Mapping):
-            util.joindicts(base_entry, data_entries[0])
+    return [(base_index[data_key], data_entries) for (data_key, data_entries) in keyed_data.items()]
+
+def attach_data(base_entry, data_entries: list, key=None, many=False):
+    """Adds joined data to a base entry.
+    If a key is given, the data is stored under key, as a list if many is true.
+    Otherwise the first data entry is merged into the base entry without overwrite.
+    """
+    if key:
+        if many:
+            base_entry[key] = data_entries
         else:
-            # We cannot merge a dictionary with a non-dictionary
-            raise Exception("Invalid data, the data map must be a dictionary for a keyless merge")
+            base_entry[key] = data_entries[0]
+    elif isinstance(data_entries[0], abc.Mapping):
+        util.joindicts(base_entry, data_entries[0])
+    else:
+        # We cannot merge a dictionary with a non-dictionary
+        raise Exception("Invalid data, the data map must be a dictionary for a keyless merge")
+
+def merge_list(base, rows: typing.Iterable[dict], key=None, groups=[], many=False, *, base_indexes=None):
+    """Routine to merge lists of dictionaries together using one or more keys.
+    The rows can be any iterable, including a generator, and are consumed once.
+    The keys used are determined by first sequential key of the first row.
+    If the key is an id, it will join on that, but if it is a name, it will join on that and key_ex fields.
+
+    The key columns are resolved from the first row, so all rows must share the same columns.
+    See join_keyed_rows() for base_indexes.
+    """
+    if many and not key:
+        raise ValueError('Key must have a value')
+
+    keyed = key_rows(base, rows, groups=groups, many=many)
+    if keyed is None:
+        return
+
+    (key_fields, keyed_data) = keyed
+    for base_entry, data_entries in join_keyed_rows(base, key_fields, keyed_data, base_indexes=base_indexes):
+        attach_data(base_entry, data_entries, key=key, many=many)
@@ -1,4 +1,5 @@
 import os
+import contextlib
 import re
 import collections.abc
 import typing
@@ -11,10 +12,18 @@ from .datamap import DataMap
 from mhdata.util import group_fields
 from .functions import merge_list, fix_id
 
-from mhdata.io.csv import read_csv
+from mhdata.io.csv import read_csv, iter_csv
 
 def apply_schema_to_map(map, schema):
     "Internal helper to apply a marshmallow schema to the values of a map."
+    keys = list(map.keys())
+    (converted_values, errors) = schema.load([map[key] for key in keys], many=True)
+    if not errors:
+        for key, converted in zip(keys, converted_values):
+            map[key] = converted
+        return map
+
+    # Load individually to collect the errors of each entry
     errors = []
     for key in map.keys():
         value = map[key]
@@ -38,13 +47,31 @@ class DataReader:
             data_path: str):
         self.languages = languages
         self.data_path = data_path
+        self._accessed_files = None
 
     def get_data_path(self, *rel_path):
         """Returns a file path to a file stored in the data folder using one or more
         path components. Used internally
         """
-        data_dir = os.path.join(self.data_path, *rel_path)
-        return os.path.normpath(data_dir)
+        data_dir = os.path.normpath(os.path.join(self.data_path, *rel_path))
+        if self._accessed_files is not None:
+            self._accessed_files.add(data_dir)
+        return data_dir
+
+    @contextlib.contextmanager
+    def track_files(self):
+        """Context manager that yields a set, which is filled with the path
+        of every data file requested by this reader while inside the context.
+        Files that were requested but do not exist are included."""
+        previous = self._accessed_files
+        self._accessed_files = set()
+        try:
+            yield self._accessed_files
+        finally:
+            accessed = self._accessed_files
+            self._accessed_files = previous
+            if previous is not None:
+                previous.update(accessed)
 
     def _validate_base_map(self, fname, basemap: DataMap, languages, error=True):
         languages_with_errors = set()
@@ -76,6 +103,11 @@ class DataReader:
 
         return data
 
+    def iter_list_csv(self, data_file):
+        """Lazily loads a simple csv without processing, as a generator of rows.
+        The file is read as the rows are consumed."""
+        return iter_csv(self.get_data_path(data_file))
+
     def load_json(self, data_file):
         data_file = self.get_data_path(data_file)
         with open(data_file, encoding="utf-8") as f:
@@ -101,7 +133,7 @@ class DataReader:
         """Loads a simple csv file as a key map. 
         The key column becomes the map's key, and every entry gets an id field (accessed via variable).
         TODO: Polish, might need an interface tweak to be similar to datamap"""
-        items = self.load_list_csv(data_file)
+        items = self.iter_list_csv(data_file)
 
         keymap = { entry['key']:entry for entry in items }
         if schema:
@@ -120,14 +152,14 @@ class DataReader:
         data_file = self.get_data_path(data_file)
         groups = ['name'] + groups
 
-        rows = [group_fields(row, groups=groups) for row in read_csv(data_file)]
+        rows = (group_fields(row, groups=groups) for row in iter_csv(data_file))
 
         basemap = DataMap(languages=languages, keys_ex=keys_ex)
         basemap.extend(rows)
 
         if translation_filename:
             try:
-                translations = fix_id(self.load_list_csv(translation_filename))
+                translations = fix_id(self.iter_list_csv(translation_filename))
                 groups = set(['name'] + translation_extra)
                 merge_list(basemap, translations, groups=groups, many=False)
             except FileNotFoundError:
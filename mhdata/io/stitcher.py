@@ -1,16 +1,19 @@
 import json
 import os.path
-import collections.abc
 
-from mhdata.util import joindicts, extract_fields, group_fields
 from .datamap import DataMap
 from .reader import DataReader
-from .functions import merge_list, fix_id
+from .functions import key_rows, join_keyed_rows, attach_data, fix_id
 
 class DataStitcher:
     """Dynamically creates an object by attaching data to a base object
     Methods in this class chain to each other.
 
+    Attached data is not read until get() is called, which reads every attachment in order,
+    and then joins them and runs the schema in a single pass over the base entries.
+    Keyless attachments are merged as soon as they are read instead,
+    as their columns may be used to join the attachments after them.
+
     Common concepts:
      - key - If given, the added data will be added as entry[keyname] = yourdata.
 
@@ -23,7 +26,8 @@ class DataStitcher:
         self.reader = reader
         self.dir = dir
         self.keys_ex = keys_ex or []
-        self._data_map = None
+        self._base_map = None
+        self._base_indexes = {}
         self.languages = [] if use_id else ['en']
 
         self._base_fname = None
@@ -31,6 +35,10 @@ class DataStitcher:
         self._base_translate_fname = None
         self._base_translate_groups = []
 
+        # Attachments that have not been read yet, as (key, many, read function) tuples.
+        # The read function returns a list of (base_entry, data_entries) tuples
+        self._plan = []
+
     def _get_filename(self, filename):
         "Gets a filename relative to the internal dir, if any."
         if self.dir:
@@ -38,14 +46,15 @@ class DataStitcher:
         return filename
 
     @property
-    def data_map(self):
-        if self._data_map:
-            return self._data_map
+    def base_map(self):
+        "Returns the base map, without any attachments that haven't been stitched yet"
+        if self._base_map:
+            return self._base_map
 
         if not self._base_fname:
             raise Exception("Data Map uninitialized, use base_csv function first")
 
-        self._data_map = self.reader.load_base_csv(
+        self._base_map = self.reader.load_base_csv(
             self._base_fname,
             self.languages,
             groups=self._base_groups,
@@ -53,10 +62,16 @@ class DataStitcher:
             translation_extra=self._base_translate_groups,
             keys_ex=self.keys_ex)
 
-        return self._data_map
+        return self._base_map
+
+    @property
+    def data_map(self):
+        "Returns the stitched data map, with every attachment added"
+        return self.get()
 
     def use_base(self, data_map: DataMap):
-        self._data_map = data_map
+        self._base_map = data_map
+        self._base_indexes = {}
         return self
 
     def base_csv(self, data_file, *, groups=[]):
@@ -73,7 +88,7 @@ class DataStitcher:
 
     def add_json(self, data_file, *, key=None, join=None):
         """
-        Loads a data map from a json file, adds it to the base map, and returns self.
+        Adds a data map from a json file to the base map, and returns self.
         
         If a key is given, it will be added under key, 
         Otherwise it will be merged without overwrite.
@@ -82,39 +97,28 @@ class DataStitcher:
         if not join:
             raise ValueError('Join must have a value')
 
-        data = self.reader.load_json(self._get_filename(data_file))
-
-        def derive_key(d):
-            return d[join]
-
-        # validation, make sure it links
-        entry_map = { str(e[join]):e for e in self.data_map.values() }
-        converted_keys = [str(k) for k in data.keys()]
-        unlinked = [k for k in converted_keys if k not in entry_map.keys()]
-        if unlinked:
-            raise Exception(
-                "Several invalid names found in sub data map. Invalid entries are " +
-                ','.join('None' if e is None else str(e) for e in unlinked))
-
-        # validation complete, it may not link to all base entries but thats ok
-        for data_key, data_entry in data.items():
-            base_entry = entry_map[str(data_key)]
-            
-            if key:
-                base_entry[key] = data_entry
-                
-            elif isinstance(data_entry, collections.Mapping):
-                joindicts(base_entry, data_entry)
-                    
-            else:
-                # If we get here, its a key-less merge with a non-dict
-                # We cannot merge a dictionary with a non-dictionary
-                raise Exception("Invalid data, the data map must be a dictionary for a keyless merge")
+        data_file = self._get_filename(data_file)
+
+        def read():
+            data = self.reader.load_json(data_file)
+
+            # validation, make sure it links
+            entry_map = { str(e[join]):e for e in self.base_map.values() }
+            converted_keys = [str(k) for k in data.keys()]
+            unlinked = [k for k in converted_keys if k not in entry_map.keys()]
+            if unlinked:
+                raise Exception(
+                    "Several invalid names found in sub data map. Invalid entries are " +
+                    ','.join('None' if e is None else str(e) for e in unlinked))
+
+            # validation complete, it may not link to all base entries but thats ok
+            return [(entry_map[str(data_key)], [data_entry]) for (data_key, data_entry) in data.items()]
 
+        self._plan.append((key, False, read))
         return self
 
     def add_csv(self, data_file, *, key=None, groups=[]):
-        """Loads a data map from a csv file, adds to the base map, and returns self.
+        """Adds a data map from a csv file to the base map, and returns self.
         
         :param key: The dictionary key name in the base map to add the new data under. 
                     This field is required
@@ -125,41 +129,109 @@ class DataStitcher:
         if not key:
             raise ValueError('Key must have a value')
 
-        data_file = self._get_filename(data_file)
-        rows = fix_id(self.reader.load_list_csv(data_file))
-        merge_list(self.data_map, rows, key=key, groups=groups, many=True)
-
+        self._plan.append((key, True, self._create_csv_reader(data_file, groups=groups, many=True)))
         return self
 
     def add_csv_ext(self, data_file, *, key=None, groups=[]):
-        """Loads a data map from a csv file, adds to the base map (1-1), and returns self.
+        """Adds a data map from a csv file to the base map (1-1), and returns self.
         
         Data loaded through this method are joined one to one and available as a dictionary.
 
         If a key is given, it will be added under key, 
         Otherwise it will be merged without overwrite.
         """
+        self._plan.append((key, False, self._create_csv_reader(data_file, groups=[], many=False)))
+        return self
 
+    def _create_csv_reader(self, data_file, *, groups, many):
+        "Returns a function that reads a csv file and joins it to the base map"
         data_file = self._get_filename(data_file)
-        rows = fix_id(self.reader.load_list_csv(data_file))
-        merge_list(self.data_map, rows, key=key, many=False)
 
-        return self
-    
-    def get(self, *, schema=None):
+        def read():
+            rows = fix_id(self.reader.iter_list_csv(data_file))
+            keyed = key_rows(self.base_map, rows, groups=groups, many=many)
+            if keyed is None:
+                return []
+
+            (key_fields, keyed_data) = keyed
+            return join_keyed_rows(self.base_map, key_fields, keyed_data,
+                base_indexes=self._base_indexes)
+        return read
+
+    def _read_plan(self, data_map, fields=None):
+        """Reads the attachments that are still pending in declaration order, and removes them from the plan.
+        Returns a list of (key, many, entry id -> data_entries) tuples of the keyed attachments.
+        Keyless attachments are merged into data_map before the attachments after them are read,
+        so that their columns can be used as join keys.
+        Keyed attachments that are not in fields are skipped and stay in the plan."""
+        steps = self._plan
+        if fields is not None:
+            fields = set(fields)
+            steps = [step for step in steps if step[0] is None or step[0] in fields]
+
+        self._plan = [step for step in self._plan if step not in steps]
+
+        results = []
+        for (key, many, read) in steps:
+            joined = { base_entry.id:data_entries for (base_entry, data_entries) in read() }
+            results.append((key, many, joined))
+
+            if key is None:
+                # Attach everything read so far, to keep the order attachments are applied in
+                self._attach_all(data_map, results)
+                results = []
+                self._base_indexes = {}
+        return results
+
+    @staticmethod
+    def _attach_all(data_map, joins):
+        for entry in data_map.values():
+            DataStitcher._attach_entry(entry, joins)
+
+    @staticmethod
+    def _attach_entry(entry, joins):
+        entry_id = entry.id
+        for (key, many, joined) in joins:
+            data_entries = joined.get(entry_id, None)
+            if data_entries is not None:
+                attach_data(entry, data_entries, key=key, many=many)
+
+    def get(self, *, schema=None, fields=None):
         """Returns the stiched result. 
         If schema is provided, returns the items run through the marshmallow schema
+
+        If fields is provided, keyed attachments that are not in fields are not read or added.
+        Skipped attachments are added by a later call to get() that includes them.
         """
-        if schema:
-            results = DataMap(languages=self.languages, keys_ex=self.keys_ex)
-            for entry in self.data_map.values():
-                data = entry.to_dict()
-                (converted, errors) = schema.load(data, many=False) # converted
+        data_map = self.base_map
+        joins = self._read_plan(data_map, fields)
+
+        # Attach all data and convert the entries for the schema in one pass
+        entries = []
+        rows = []
+        for entry in data_map.values():
+            if joins:
+                self._attach_entry(entry, joins)
 
-                if errors:
-                    name = entry.name('en')
-                    raise Exception(f"Error loading {name}: {str(errors)}")
+            if schema:
+                entries.append(entry)
+                rows.append(entry.to_dict())
 
+        if schema:
+            # All entries are loaded as one batch, which is much faster for compiled schemas
+            (converted_rows, batch_errors) = schema.load(rows, many=True)
+
+            if batch_errors:
+                # Load individually to report the failing entry by name
+                for entry, data in zip(entries, rows):
+                    (_, errors) = schema.load(data, many=False)
+                    if errors:
+                        name = entry.name('en')
+                        raise Exception(f"Error loading {name}: {str(errors)}")
+                raise Exception(str(batch_errors))
+
+            results = DataMap(languages=self.languages, keys_ex=self.keys_ex)
+            for entry, converted in zip(entries, converted_rows):
                 # id may have changed type or value:
                 # get the converted id before the original,
                 # but default to original if missing or falsey
@@ -169,4 +241,4 @@ class DataStitcher:
                 
             return results
 
-        return self.data_map
+        return data_map
@@ -11,13 +11,14 @@ collection of helper functions to better read this data.
 from .loaddata import load_data
 from .validate import validate
 
-def load_data_processed():
-    "Loads data from source_data/ folder, and validates and post-processes it"
+def load_data_processed(*, workers=1, use_cache=False):
+    """Loads data from source_data/ folder, and validates and post-processes it.
+    See load_data for the workers and use_cache parameters."""
     from . import process
 
-    mhdata = load_data()
-    process.copy_skill_descriptions(mhdata.skill_map)
-    process.extend_decoration_chances(mhdata.decoration_map)
+    mhdata = load_data(workers=workers, use_cache=use_cache)
+    for processor in process.processors.values():
+        processor(mhdata)
 
     if not validate(mhdata):
         raise Exception("Validation Failed")
@@ -0,0 +1,97 @@
+"""
+A persistent on-disk cache for the results of the load_data() loaders.
+
+Every loader result is pickled to its own file in the cache directory,
+along with the files it read and a hash of their contents.
+A cached result is only reused if none of those files have changed,
+and the code used to load them (this package, mhdata.io, and mhdata.util) is the same.
+"""
+
+import os
+import glob
+import pickle
+import hashlib
+import functools
+from os.path import abspath, join, dirname, relpath
+
+import marshmallow
+
+_mhdata_path = dirname(dirname(abspath(__file__)))
+
+cache_path = join(dirname(_mhdata_path), '.cache', 'mhdata')
+
+# Modules that affect the results of loading. Any change to these invalidates the cache
+_code_globs = ('load/*.py', 'io/**/*.py', 'util/*.py', 'cfg.py')
+
+# Bump to invalidate all existing cache files if the file layout changes
+_cache_version = 1
+
+def hash_file(path):
+    "Returns the sha1 hash of the file at the given path, or None if it doesn't exist"
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+@functools.lru_cache(maxsize=None)
+def get_code_hash():
+    "Returns a hash of all python source files that affect the loaded data"
+    h = hashlib.sha1()
+    h.update(f'{_cache_version}:{marshmallow.__version__}'.encode())
+    for pattern in _code_globs:
+        for path in sorted(glob.glob(join(_mhdata_path, pattern), recursive=True)):
+            h.update(relpath(path, _mhdata_path).encode())
+            h.update(hash_file(path).encode())
+    return h.hexdigest()
+
+def _get_cache_file(name):
+    return join(cache_path, name + '.pickle')
+
+def _read_cache(name, reader):
+    """Returns a tuple of (hit, result) for a cached loader result.
+    A cache file that cannot be read is treated as a miss."""
+    try:
+        with open(_get_cache_file(name), 'rb') as f:
+            header = pickle.load(f)
+            if header['code'] != get_code_hash():
+                return (False, None)
+            for fname, expected in header['files'].items():
+                if hash_file(reader.get_data_path(fname)) != expected:
+                    return (False, None)
+            return (True, pickle.load(f))
+    except Exception:
+        return (False, None)
+
+def _write_cache(name, reader, files, result):
+    files = { relpath(path, reader.data_path):hash_file(path) for path in sorted(files) }
+    header = { 'code': get_code_hash(), 'files': files }
+
+    os.makedirs(cache_path, exist_ok=True)
+
+    # Written to a temporary file first so that an interrupted write is never loaded
+    cache_file = _get_cache_file(name)
+    temp_file = f'{cache_file}.{os.getpid()}.tmp'
+    with open(temp_file, 'wb') as f:
+        pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_file, cache_file)
+
+def load_cached(name, loader, reader):
+    """Returns the result of calling loader, using the cached result stored under name if valid.
+    The reader must be the DataReader used by the loader, and is used to track the files it reads.
+    On a miss the loader is called and its result is stored for next time."""
+    (hit, result) = _read_cache(name, reader)
+    if hit:
+        return result
+
+    with reader.track_files() as files:
+        result = loader()
+
+    _write_cache(name, reader, files, result)
+    return result
+
+def clear_cache():
+    "Removes all cached loader results"
+    for path in glob.glob(join(cache_path, '*.pickle')):
+        os.remove(path)
@@ -3,7 +3,8 @@ Custom fields used by the marshmallow schema
 """
 
 from collections.abc import Mapping
-from marshmallow import fields, ValidationError, Schema, pre_load, post_dump, pre_dump
+from marshmallow import fields, ValidationError, Schema, UnmarshalResult, pre_load, post_dump, pre_dump
+from marshmallow.utils import is_collection
 
 from mhdata.util import group_fields, ungroup_fields
 from mhdata import cfg
@@ -13,6 +14,7 @@ def choice_check(*items):
         if check not in items:
             item_str = ", ".join(map(lambda i: i or "None", items))
             raise ValidationError(f"Value {check} not one of ({item_str})")
+    validate_fn.choices = items # used by the compiled decoder to validate in bulk
     return validate_fn
 
 
@@ -63,6 +65,30 @@ class BaseSchema(Schema):
     class Meta:
         ordered = True
 
+    def load(self, data, many=None, partial=None):
+        """Deserializes data, same as marshmallow's Schema.load().
+        Uses the schema's compiled decoder when possible (see mhdata.load.decoder),
+        and falls back to marshmallow for unsupported options or data that fails to decode,
+        so that errors are reported the same way.
+        Only DecodeErrors fall back, any other error from the decoder is a bug and is raised."""
+        from .decoder import get_decoder, DecodeError
+
+        many = self.many if many is None else bool(many)
+        decoder = None
+        if not (partial or self.partial or self.only or self.exclude or self.load_only or self.dump_only):
+            decoder = get_decoder(type(self))
+
+        if decoder is not None and decoder.dict_class is self.dict_class:
+            try:
+                if not many:
+                    return UnmarshalResult(decoder.decode_rows([data])[0], {})
+                if is_collection(data):
+                    return UnmarshalResult(decoder.decode_rows(list(data)), {})
+            except DecodeError:
+                pass # marshmallow will handle it, and produce the errors
+
+        return super().load(data, many=many, partial=partial)
+
     def identify_prefixes(self):
         "Identifies all potential prefixes by examining the fields"
         if not self._saved_prefixes:
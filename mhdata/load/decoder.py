@@ -0,0 +1,330 @@
+"""
+Compiled decoders for the marshmallow schemas in this project.
+
+Marshmallow deserializes one row and one field at a time through several layers of
+generic machinery, which ends up being most of the time spent loading data.
+A SchemaDecoder is generated once per schema class, and decodes a batch of rows
+one column at a time using plain python conversions that mirror the marshmallow fields.
+
+Decoders only support what the schemas in this project use. Schemas with anything else
+can't be compiled, and rows that fail to decode (invalid values, unexpected types)
+raise DecodeError so that the caller can use marshmallow to get the proper errors.
+BaseSchema.load() does this automatically.
+"""
+
+from collections.abc import Mapping
+
+from marshmallow import fields, ValidationError
+from marshmallow.decorators import PRE_LOAD, POST_LOAD, VALIDATES, VALIDATES_SCHEMA
+from marshmallow.utils import missing
+from marshmallow.validate import Validator
+
+from .cfields import BaseSchema, NullableBool, NestedPrefix
+
+class DecodeError(Exception):
+    "Raised when a row cannot be decoded by the fast path, and needs to be loaded by marshmallow"
+
+# Cached decoders by schema class. None if the schema cannot be compiled
+_decoders = {}
+
+def get_decoder(schema_cls):
+    "Returns the compiled decoder for a schema class, or None if the schema is not supported"
+    try:
+        return _decoders[schema_cls]
+    except KeyError:
+        pass
+
+    try:
+        decoder = SchemaDecoder(schema_cls())
+    except DecodeError:
+        decoder = None
+
+    _decoders[schema_cls] = decoder
+    return decoder
+
+def _check_missing(field, values):
+    "Substitutes the field's missing value into the column, marking fields that stay missing"
+    if missing not in values:
+        return values
+
+    miss = field.missing
+    if miss is missing:
+        if field.required:
+            raise DecodeError("Missing required field")
+        return values
+
+    return [(miss() if callable(miss) else miss) if v is missing else v for v in values]
+
+def _map_present(fn, values):
+    "Runs fn over every value that is not None or missing"
+    if None not in values and missing not in values:
+        return list(map(fn, values))
+    return [v if (v is None or v is missing) else fn(v) for v in values]
+
+def _check_none(field, values):
+    "Raises if the column contains nulls that the field doesn't allow"
+    if field.allow_none is not True and None in values:
+        raise DecodeError("Field may not be null")
+
+class SchemaDecoder:
+    """Decodes rows for a single marshmallow schema, producing the same result as schema.load().
+    Nested schemas are compiled recursively."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.dict_class = schema.dict_class
+        self.groups = self._resolve_groups(schema)
+        self._group_plans = {}
+
+        self.fields = []
+        for name, field in schema.fields.items():
+            if field.dump_only:
+                continue
+            if field.load_from or field.attribute:
+                raise DecodeError("load_from and attribute are not supported")
+            self.fields.append((name, self._compile_field(field)))
+
+        processors = schema.__processors__
+        for tag in [(PRE_LOAD, True), (POST_LOAD, True), (POST_LOAD, False), (VALIDATES_SCHEMA, True)]:
+            if processors[tag]:
+                raise DecodeError(f"Schema processor {tag} is not supported")
+
+        self.field_validators = []
+        for attr_name in processors[(VALIDATES, False)]:
+            validator = getattr(schema, attr_name)
+            field_name = validator.__marshmallow_kwargs__[(VALIDATES, False)]['field_name']
+            self.field_validators.append((field_name, validator))
+
+        self.schema_validators = []
+        for attr_name in processors[(VALIDATES_SCHEMA, False)]:
+            validator = getattr(schema, attr_name)
+            if validator.__marshmallow_kwargs__[(VALIDATES_SCHEMA, False)].get('pass_original'):
+                raise DecodeError("Schema validators with pass_original are not supported")
+            self.schema_validators.append(validator)
+
+    def _resolve_groups(self, schema):
+        "Returns the groups used by the group_fields pre_load, or None if there is no grouping"
+        pre_load = schema.__processors__[(PRE_LOAD, False)]
+        if not pre_load:
+            return None
+        if not isinstance(schema, BaseSchema) or pre_load != ['group_fields'] \
+                or type(schema).group_fields is not BaseSchema.group_fields:
+            raise DecodeError("Only the BaseSchema pre_load is supported")
+        return list(schema.__groups__ or []) + schema.identify_prefixes()
+
+    def _compile_field(self, field):
+        "Returns a function that decodes a list of values for the field"
+        field_type = type(field)
+
+        if field_type is fields.Integer:
+            convert = self._decode_int
+        elif field_type is fields.String:
+            convert = self._decode_str
+        elif field_type is fields.Dict:
+            convert = self._decode_dict
+        elif field_type in (fields.Boolean, NullableBool) or issubclass(field_type, NullableBool):
+            convert = self._compile_bool(field)
+        elif field_type is fields.List:
+            convert = self._compile_list(field)
+        elif field_type in (fields.Nested, NestedPrefix):
+            convert = self._compile_nested(field)
+        else:
+            raise DecodeError(f"Field type {field_type.__name__} is not supported")
+
+        validate = self._compile_validators(field)
+        null_is_false = getattr(field, 'null_is_false', False)
+
+        def decode(values):
+            values = _check_missing(field, values)
+            if null_is_false and None in values:
+                # NullableBool converts nulls directly, skipping validation
+                values = [False if v is None else v for v in values]
+            _check_none(field, values)
+
+            result = convert(values)
+            if validate:
+                validate(result)
+            return result
+        return decode
+
+    def _compile_validators(self, field):
+        "Returns a function that validates decoded values, or None if the field has no validators"
+        validators = list(field.validators)
+        if not validators:
+            return None
+
+        # choice_check validators are tested for the whole column at once
+        choices = [getattr(v, 'choices', None) for v in validators]
+        other_validators = [v for (v, c) in zip(validators, choices) if c is None]
+        choices = [frozenset(c) for c in choices if c is not None]
+
+        def validate(values):
+            present = [v for v in values if not (v is None or v is missing)]
+            for choice_set in choices:
+                if not choice_set.issuperset(present):
+                    raise DecodeError("Invalid choice")
+            for validator in other_validators:
+                for value in present:
+                    try:
+                        valid = validator(value)
+                    except ValidationError as ex:
+                        raise DecodeError("Validator failed") from ex
+                    if valid is False and not isinstance(validator, Validator):
+                        raise DecodeError("Validator failed")
+        return validate
+
+    @staticmethod
+    def _decode_int(values):
+        try:
+            return _map_present(int, values)
+        except (TypeError, ValueError) as ex:
+            raise DecodeError("Not an integer") from ex
+
+    @staticmethod
+    def _decode_str(values):
+        for v in values:
+            if type(v) is not str and v is not None and v is not missing:
+                raise DecodeError("Not a string")
+        return values
+
+    @staticmethod
+    def _decode_dict(values):
+        for v in values:
+            if not isinstance(v, Mapping) and v is not None and v is not missing:
+                raise DecodeError("Not a mapping")
+        return values
+
+    def _compile_bool(self, field):
+        mapping = { v:True for v in field.truthy }
+        mapping.update({ v:False for v in field.falsy })
+
+        def convert(values):
+            try:
+                return _map_present(mapping.__getitem__, values)
+            except (KeyError, TypeError) as ex:
+                raise DecodeError("Not a boolean") from ex
+        return convert
+
+    def _compile_list(self, field):
+        container = type(field.container)
+        if container is not fields.Dict or field.container.validators:
+            raise DecodeError("Only lists of dictionaries are supported")
+
+        def convert(values):
+            result = []
+            for v in values:
+                if v is None or v is missing:
+                    result.append(v)
+                    continue
+                if not isinstance(v, (list, tuple)):
+                    raise DecodeError("Not a list")
+                for item in v:
+                    if not isinstance(item, Mapping):
+                        raise DecodeError("Not a mapping")
+                result.append(list(v))
+            return result
+        return convert
+
+    def _compile_nested(self, field):
+        if field.only or field.exclude:
+            raise DecodeError("Nested only and exclude are not supported")
+        if field.nested == 'self':
+            raise DecodeError("Recursive nesting is not supported")
+
+        nested = SchemaDecoder(field.schema)
+        many = field.many
+
+        def convert(values):
+            # All nested rows are decoded together as a single batch
+            rows = []
+            for v in values:
+                if v is None or v is missing:
+                    continue
+                if many:
+                    if not isinstance(v, (list, tuple)):
+                        raise DecodeError("Not a list")
+                    rows.extend(v)
+                else:
+                    rows.append(v)
+
+            decoded = iter(nested.decode_rows(rows))
+
+            result = []
+            for v in values:
+                if v is None or v is missing:
+                    result.append(v)
+                elif many:
+                    result.append([next(decoded) for _ in range(len(v))])
+                else:
+                    result.append(next(decoded))
+            return result
+        return convert
+
+    def _group(self, row):
+        "Equivalent to BaseSchema.group_fields, with the grouping worked out once per set of keys"
+        if not isinstance(row, Mapping):
+            raise DecodeError("Invalid data type")
+
+        keys = tuple(row)
+        grouped = tuple(isinstance(row.get(g, None), Mapping) for g in self.groups)
+        try:
+            plan = self._group_plans[(keys, grouped)]
+        except KeyError:
+            groups = [g for (g, done) in zip(self.groups, grouped) if not done]
+            plan = []
+            for key in keys:
+                group_name = next((g for g in groups if key.startswith(g+'_')), None)
+                plan.append((group_name, key[len(group_name)+1:] if group_name else None))
+            plan = self._group_plans[(keys, grouped)] = tuple(plan)
+
+        result = {}
+        for (group_name, subkey), key in zip(plan, keys):
+            if group_name is None:
+                result[key] = row[key]
+            else:
+                group = result.setdefault(group_name, {})
+                group[subkey] = row[key]
+        return result
+
+    def decode_rows(self, rows):
+        """Decodes a list of rows, returning a list of results.
+        Raises DecodeError if any of the rows cannot be decoded by the fast path."""
+        if self.groups is not None:
+            rows = [self._group(row) for row in rows]
+        else:
+            for row in rows:
+                if not isinstance(row, Mapping):
+                    raise DecodeError("Invalid data type")
+
+        names = []
+        columns = []
+        for name, decode in self.fields:
+            column = decode([row.get(name, missing) for row in rows])
+            names.append(name)
+            columns.append(column)
+
+        dict_class = self.dict_class
+        results = [dict_class(zip(names, values)) for values in zip(*columns)]
+        if not columns:
+            results = [dict_class() for _ in rows]
+
+        # Fields that are still missing are left out of the result
+        for name, column in zip(names, columns):
+            if missing in column:
+                for result, value in zip(results, column):
+                    if value is missing:
+                        del result[name]
+
+        for result in results:
+            try:
+                for field_name, validator in self.field_validators:
+                    if field_name in result:
+                        if validator(result[field_name]) is missing:
+                            raise DecodeError("Validator removed a value")
+                for validator in self.schema_validators:
+                    if validator(result) is False:
+                        raise DecodeError("Schema validator failed")
+            except ValidationError as ex:
+                raise DecodeError("Validator failed") from ex
+
+        return results
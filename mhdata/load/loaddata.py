@@ -1,4 +1,5 @@
 import os.path
+from concurrent.futures import ProcessPoolExecutor
 from os.path import abspath, join, dirname
 from types import SimpleNamespace
 
@@ -6,7 +7,7 @@ from mhdata import cfg
 from mhdata.io import DataMap, DataReader, DataStitcher, create_reader
 from mhdata.io.csv import read_csv
 
-from . import schema
+from . import schema, cache
 
 reader = create_reader()
 
@@ -24,115 +25,171 @@ def transform_dmap(dmap: DataMap, obj_schema):
         results.add_entry(entry_id, converted)
     return results
 
-def load_data():
+def load_item_map():
+    return (DataStitcher(reader, dir="items")
+                .base_csv("item_base.csv")
+                .translate("item_base_translations.csv")
+                .get(schema=schema.ItemSchema()))
+
+def load_item_combinations():
+    return reader.load_list_csv(
+        'items/item_combination_list.csv',
+        schema=schema.ItemCombinationSchema())
+
+def load_location_map():
+    return (DataStitcher(reader, dir="locations/")
+                .base_csv('location_base.csv')
+                .add_csv("location_items.csv", key="items")
+                .add_csv("location_camps.csv", key="camps")
+                .get(schema=schema.LocationSchema()))
+
+def load_skill_map():
+    return (DataStitcher(reader, dir="skills/")
+                .base_csv("skill_base.csv")
+                .translate('skill_base_translations.csv')
+                .add_csv("skill_levels.csv", key="levels")
+                .get(schema=schema.SkillSchema()))
+
+def load_charm_map():
+    return (DataStitcher(reader, dir="charms/")
+                .base_csv("charm_base.csv")
+                .translate('charm_base_translations.csv')
+                .add_csv("charm_craft.csv", key="craft")
+                .get(schema=schema.CharmSchema()))
+
+def load_monster_reward_conditions_map():
+    return reader.load_base_csv("monsters/reward_conditions_base.csv", ['en'])
+
+def load_monster_map():
+    return (DataStitcher(reader, dir="monsters/")
+                .base_csv("monster_base.csv")
+                .translate("monster_base_translations.csv")
+                .add_csv("monster_weaknesses.csv", key="weaknesses")
+                .add_csv("monster_hitzones.csv", key="hitzones", groups=["hitzone"])
+                .add_csv("monster_breaks.csv", key="breaks", groups=["part"])
+                .add_csv_ext("monster_ailments.csv", key="ailments")
+                .add_csv("monster_habitats.csv", key="habitats")
+                .add_csv("monster_rewards.csv", key="rewards")
+                .get(schema=schema.MonsterSchema()))
+
+def load_armor_map():
+    return (DataStitcher(reader, dir="armors/")
+                .base_csv("armor_base.csv")
+                .translate("armor_base_translations.csv")
+                .add_csv_ext("armor_craft_ext.csv", key="craft")
+                .add_csv_ext("armor_skills_ext.csv", key="skills")
+                .get(schema=schema.ArmorSchema()))
+
+def load_armorset_map():
+    return (DataStitcher(reader, dir="armors/")
+                .base_csv("armorset_base.csv")
+                .translate("armorset_base_translations.csv")
+                .get(schema=schema.ArmorSetSchema()))
+
+def load_armorset_bonus_map():
+    return (DataStitcher(reader, dir="armors/")
+                .base_csv("armorset_bonus_base.csv")
+                .translate("armorset_bonus_base_translations.csv")
+                .get(schema=schema.ArmorSetBonus()))
+
+def load_weapon_ammo_map():
+    "Loads ammo config"
+    return reader.load_keymap_csv("weapons/weapon_ammo.csv", schema.WeaponAmmoSchema())
+
+def load_weapon_map():
+    return (DataStitcher(reader, dir="weapons/", keys_ex=['weapon_type'])
+                .base_csv("weapon_base.csv")
+                .translate('weapon_base_translations.csv')
+                .add_csv_ext("weapon_sharpness.csv", key="sharpness")
+                .add_csv_ext("weapon_bow_ext.csv", key="bow")
+                .add_csv("weapon_craft.csv", key="craft")
+                .get(schema=schema.WeaponSchema()))
+
+def load_weapon_melodies():
+    "Loads weapon hunting horn songs"
+    return (DataStitcher(reader, dir="weapons")
+                .base_csv("weapon_melody_base.csv")
+                .translate('weapon_melody_base_translations.csv')
+                .add_csv("weapon_melody_notes.csv", key='notes')
+                .get(schema=schema.WeaponMelodySchema()))
+
+def load_kinsect_map():
+    return (DataStitcher(reader, dir='weapons/')
+                .base_csv('kinsect_base.csv')
+                .translate('kinsect_base_translations.csv')
+                .add_csv_ext('kinsect_craft_ext.csv', key='craft')
+                .get(schema=schema.KinsectSchema()))
+
+def load_decoration_map():
+    return (DataStitcher(reader, dir="decorations/")
+                .base_csv("decoration_base.csv")
+                .translate('decoration_base_translations.csv')
+                .get(schema=schema.DecorationSchema()))
+
+def load_quest_map():
+    return (DataStitcher(reader, dir="quests/", use_id=True)
+                .base_csv("quest_base.csv")
+                .translate('quest_base_translations.csv')
+                .add_csv('quest_monsters.csv', key='monsters')
+                .add_csv('quest_rewards.csv', key='rewards')
+                .get(schema=schema.QuestSchema()))
+
+def load_tool_map():
+    return (DataStitcher(reader, dir="tools/")
+                .base_csv("tool_base.csv")
+                .translate('tool_base_translations.csv')
+                .get(schema=schema.ToolSchema()))
+
+# Mapping of load_data() result field -> function that loads it, in result order.
+# The loaders don't depend on each other, so they can run in any order or in parallel
+data_loaders = {
+    'item_map': load_item_map,
+    'item_combinations': load_item_combinations,
+    'location_map': load_location_map,
+    'skill_map': load_skill_map,
+    'charm_map': load_charm_map,
+    'monster_reward_conditions_map': load_monster_reward_conditions_map,
+    'monster_map': load_monster_map,
+    'armor_map': load_armor_map,
+    'armorset_map': load_armorset_map,
+    'armorset_bonus_map': load_armorset_bonus_map,
+    'weapon_ammo_map': load_weapon_ammo_map,
+    'weapon_map': load_weapon_map,
+    'weapon_melodies': load_weapon_melodies,
+    'kinsect_map': load_kinsect_map,
+    'decoration_map': load_decoration_map,
+    'quest_map': load_quest_map,
+    'tool_map': load_tool_map
+}
+
+def _run_loader(name, use_cache):
+    "Runs the data loader with the given name, through the loader cache if use_cache is set"
+    loader = data_loaders[name]
+    if not use_cache:
+        return loader()
+    return cache.load_cached(name, loader, reader)
+
+def load_data(*, workers=1, use_cache=False):
     """Loads all data from the source_data/ directory
     
     All data is merged together using data stitchers and run through a schema.
     The schemas perform additional type transformations, column merging into dicts (groups),
     and minor validations.
-    """
-    result = SimpleNamespace()
 
-    result.item_map = (DataStitcher(reader, dir="items")
-                    .base_csv("item_base.csv")
-                    .translate("item_base_translations.csv")
-                    .get(schema=schema.ItemSchema()))
+    Each field of the result is loaded independently by a function in data_loaders.
+    If workers is not 1, those are run in parallel over a process pool
+    of that many processes. If None, the pool uses one process per core.
+    The result is the same regardless of the number of workers.
 
-    result.item_combinations = reader.load_list_csv(
-        'items/item_combination_list.csv',
-        schema=schema.ItemCombinationSchema())
+    If use_cache is set, results are cached on disk per field (see the cache module),
+    and only fields whose source files have changed since the last load are reloaded.
+    """
+    if workers == 1:
+        results = { name:_run_loader(name, use_cache) for name in data_loaders.keys() }
+        return SimpleNamespace(**results)
 
-    result.location_map = (DataStitcher(reader, dir="locations/")
-                    .base_csv('location_base.csv')
-                    .add_csv("location_items.csv", key="items")
-                    .add_csv("location_camps.csv", key="camps")
-                    .get(schema=schema.LocationSchema()))
-
-    result.skill_map = (DataStitcher(reader, dir="skills/")
-                    .base_csv("skill_base.csv")
-                    .translate('skill_base_translations.csv')
-                    .add_csv("skill_levels.csv", key="levels")
-                    .get(schema=schema.SkillSchema()))
-
-    result.charm_map = (DataStitcher(reader, dir="charms/")
-                    .base_csv("charm_base.csv")
-                    .translate('charm_base_translations.csv')
-                    .add_csv("charm_craft.csv", key="craft")
-                    .get(schema=schema.CharmSchema()))
-
-    result.monster_reward_conditions_map = reader.load_base_csv("monsters/reward_conditions_base.csv", ['en'])
-
-    result.monster_map = (DataStitcher(reader, dir="monsters/")
-                    .base_csv("monster_base.csv")
-                    .translate("monster_base_translations.csv")
-                    .add_csv("monster_weaknesses.csv", key="weaknesses")
-                    .add_csv("monster_hitzones.csv", key="hitzones", groups=["hitzone"])
-                    .add_csv("monster_breaks.csv", key="breaks", groups=["part"])
-                    .add_csv_ext("monster_ailments.csv", key="ailments")
-                    .add_csv("monster_habitats.csv", key="habitats")
-                    .add_csv("monster_rewards.csv", key="rewards")
-                    .get(schema=schema.MonsterSchema()))
-
-    result.armor_map = (DataStitcher(reader, dir="armors/")
-                    .base_csv("armor_base.csv")
-                    .translate("armor_base_translations.csv")
-                    .add_csv_ext("armor_craft_ext.csv", key="craft")
-                    .add_csv_ext("armor_skills_ext.csv", key="skills")
-                    .get(schema=schema.ArmorSchema()))
-
-    result.armorset_map = (DataStitcher(reader, dir="armors/")
-                    .base_csv("armorset_base.csv")
-                    .translate("armorset_base_translations.csv")
-                    .get(schema=schema.ArmorSetSchema()))
-
-    result.armorset_bonus_map = (DataStitcher(reader, dir="armors/")
-                    .base_csv("armorset_bonus_base.csv")
-                    .translate("armorset_bonus_base_translations.csv")
-                    .get(schema=schema.ArmorSetBonus()))
-
-    # Load Ammo config.
-    result.weapon_ammo_map = reader.load_keymap_csv("weapons/weapon_ammo.csv", schema.WeaponAmmoSchema())
-
-    # Load weapon data
-    result.weapon_map = (DataStitcher(reader, dir="weapons/", keys_ex=['weapon_type'])
-                    .base_csv("weapon_base.csv")
-                    .translate('weapon_base_translations.csv')
-                    .add_csv_ext("weapon_sharpness.csv", key="sharpness")
-                    .add_csv_ext("weapon_bow_ext.csv", key="bow")
-                    .add_csv("weapon_craft.csv", key="craft")
-                    .get(schema=schema.WeaponSchema()))
-
-    # Load weapon hunting horn songs
-    result.weapon_melodies = (DataStitcher(reader, dir="weapons")
-                    .base_csv("weapon_melody_base.csv")
-                    .translate('weapon_melody_base_translations.csv')
-                    .add_csv("weapon_melody_notes.csv", key='notes')
-                    .get(schema=schema.WeaponMelodySchema()))
-
-    # Load Kinsects
-    result.kinsect_map = (DataStitcher(reader, dir='weapons/')
-                    .base_csv('kinsect_base.csv')
-                    .translate('kinsect_base_translations.csv')
-                    .add_csv_ext('kinsect_craft_ext.csv', key='craft')
-                    .get(schema=schema.KinsectSchema()))
-
-    # Load decoration data
-    result.decoration_map = (DataStitcher(reader, dir="decorations/")
-                    .base_csv("decoration_base.csv")
-                    .translate('decoration_base_translations.csv')
-                    .get(schema=schema.DecorationSchema()))
-
-    # Load Quest data
-    result.quest_map = (DataStitcher(reader, dir="quests/", use_id=True)
-                    .base_csv("quest_base.csv")
-                    .translate('quest_base_translations.csv')
-                    .add_csv('quest_monsters.csv', key='monsters')
-                    .add_csv('quest_rewards.csv', key='rewards')
-                    .get(schema=schema.QuestSchema()))
-
-    result.tool_map = (DataStitcher(reader, dir="tools/")
-                .base_csv("tool_base.csv")
-                .translate('tool_base_translations.csv')
-                .get(schema=schema.ToolSchema()))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = { name:executor.submit(_run_loader, name, use_cache) for name in data_loaders.keys() }
+        results = { name:future.result() for (name, future) in futures.items() }
 
-    return result
\ No newline at end of file
+    return SimpleNamespace(**results)
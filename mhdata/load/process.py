@@ -73,3 +73,10 @@ def extend_decoration_chances(decoration_map: DataMap):
     # Assign the odds map for the drop table level to the decoration itself
     for entry in decoration_map.values():
         entry['chances'] = odds_map[entry['rarity']]
+
+# Post-processing steps run by load_data_processed, in order.
+# Each step takes the loaded data and modifies it in place
+processors = {
+    'copy_skill_descriptions': lambda mhdata: copy_skill_descriptions(mhdata.skill_map),
+    'extend_decoration_chances': lambda mhdata: extend_decoration_chances(mhdata.decoration_map)
+}
@@ -10,16 +10,8 @@ from . import datafn
 def validate(mhdata):
     "Perform all validations, print out the errors, and return if it succeeded or not"
     errors = []
-    errors.extend(validate_items(mhdata))
-    errors.extend(validate_locations(mhdata))
-    errors.extend(validate_monsters(mhdata))
-    errors.extend(validate_monster_rewards(mhdata))
-    errors.extend(validate_skills(mhdata))
-    errors.extend(validate_armor(mhdata))
-    errors.extend(validate_weapons(mhdata))
-    errors.extend(validate_decorations(mhdata))
-    errors.extend(validate_charms(mhdata))
-    errors.extend(validate_quests(mhdata))
+    for validator in validators:
+        errors.extend(validator(mhdata))
 
     if errors:
         for error in errors:
@@ -361,4 +353,18 @@ def validate_quests(mhdata):
             if reward['item_en'] not in mhdata.item_map.names('en'):
                 errors.append(f"Quest {name} rewards has invalid item {reward['item_en']}")
 
-    return errors
\ No newline at end of file
+    return errors
+
+# Validations run by validate(), in order. Each returns a list of error messages
+validators = [
+    validate_items,
+    validate_locations,
+    validate_monsters,
+    validate_monster_rewards,
+    validate_skills,
+    validate_armor,
+    validate_weapons,
+    validate_decorations,
+    validate_charms,
+    validate_quests
+]
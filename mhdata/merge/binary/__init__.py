@@ -1,5 +1,6 @@
-def update_all():
-    "Updates all supported entity types using merged chunk data from ingame binaries."
+def update_all(*, workers=1):
+    """Updates all supported entity types using merged chunk data from ingame binaries.
+    See load_quests for the workers parameter."""
     from mhdata.binary import metadata
     from mhdata.binary import ItemCollection, ArmorCollection, MonsterCollection
     from mhdata.load import load_data
@@ -12,7 +13,7 @@ def update_all():
     from .tools import update_tools
     from . import simple_translate
 
-    mhdata = load_data()
+    mhdata = load_data(use_cache=True)
     print("Existing Data loaded. Using it as a base to merge new data")
 
     area_map = metadata.load_area_map()
@@ -42,7 +43,7 @@ def update_all():
     update_tools(mhdata)
     update_weapon_songs(mhdata)
     #update_kinsects(mhdata, item_updater)
-    update_quests(mhdata, item_updater, monster_data, area_map)
+    update_quests(mhdata, item_updater, monster_data, area_map, workers=workers)
     
     # Now finalize the item updates from parsing the rest of the data
     register_combinations(mhdata, item_updater)
@@ -13,9 +13,9 @@ from mhdata.binary.parsers import struct_to_json
 from .artifacts import write_dicts_artifact, create_artifact_writer
 from .items import ItemUpdater, DummyItemError
 
-def update_quests(mhdata, item_updater: ItemUpdater, monster_data: MonsterCollection, area_map):
+def update_quests(mhdata, item_updater: ItemUpdater, monster_data: MonsterCollection, area_map, *, workers=1):
     print('Beginning load of quest binary data')
-    quests = load_quests()
+    quests = load_quests(workers=workers)
     print('Loaded quest binary data')
     
     quest_data = [get_quest_data(q, item_updater, monster_data, area_map) for q in quests]
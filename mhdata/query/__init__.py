@@ -0,0 +1,11 @@
+"""
+Read-only queries over a built database file (mhw.db).
+
+Use MHWDatabase to run the common lookups of an app or service, such as an item by id
+or a monster with its hitzones and rewards. The database file is opened read only,
+and results are plain dictionaries that are cached, so they must not be modified.
+"""
+
+from .pool import ConnectionPool
+from .cache import LRUCache
+from .database import MHWDatabase
@@ -0,0 +1,258 @@
+from mhdata.build.search import search_types
+
+from .pool import ConnectionPool
+from .cache import LRUCache
+
+# Queries are plain parameterized SQL strings, executed as is every time
+# so that every connection of the pool compiles them once and reuses the prepared statement.
+
+ITEM_QUERY = """
+    SELECT i.*, t.name, t.description
+    FROM item i
+        JOIN item_text t ON t.id = i.id AND t.lang_id = ?
+    WHERE i.id = ?
+"""
+
+MONSTER_QUERY = """
+    SELECT m.*, t.name, t.ecology, t.description, t.alt_state_description
+    FROM monster m
+        JOIN monster_text t ON t.id = m.id AND t.lang_id = ?
+    WHERE m.id = ?
+"""
+
+MONSTER_HITZONES_QUERY = """
+    SELECT h.*, t.name
+    FROM monster_hitzone h
+        LEFT JOIN monster_hitzone_text t ON t.id = h.id AND t.lang_id = ?
+    WHERE h.monster_id = ?
+    ORDER BY h.id
+"""
+
+MONSTER_BREAKS_QUERY = """
+    SELECT b.*, t.part_name
+    FROM monster_break b
+        LEFT JOIN monster_break_text t ON t.id = b.id AND t.lang_id = ?
+    WHERE b.monster_id = ?
+    ORDER BY b.id
+"""
+
+MONSTER_REWARDS_QUERY = """
+    SELECT r.*, it.name AS item_name, ct.name AS condition_name
+    FROM monster_reward r
+        LEFT JOIN item_text it ON it.id = r.item_id AND it.lang_id = ?1
+        LEFT JOIN monster_reward_condition_text ct ON ct.id = r.condition_id AND ct.lang_id = ?1
+    WHERE r.monster_id = ?2
+    ORDER BY r.id
+"""
+
+WEAPON_TREE_QUERY = """
+    SELECT w.*, t.name
+    FROM weapon w
+        JOIN weapon_text t ON t.id = w.id AND t.lang_id = ?
+    WHERE w.weapon_type = ?
+    ORDER BY w.order_id
+"""
+
+ARMORSET_QUERY = """
+    SELECT s.*, t.name, bt.name AS armorset_bonus_name
+    FROM armorset s
+        JOIN armorset_text t ON t.id = s.id AND t.lang_id = ?1
+        LEFT JOIN armorset_bonus_text bt ON bt.id = s.armorset_bonus_id AND bt.lang_id = ?1
+    WHERE s.id = ?2
+"""
+
+ARMORSET_ARMOR_QUERY = """
+    SELECT a.*, t.name
+    FROM armor a
+        LEFT JOIN armor_text t ON t.id = a.id AND t.lang_id = ?
+    WHERE a.armorset_id = ?
+    ORDER BY a.order_id
+"""
+
+ARMORSET_SKILLS_QUERY = """
+    SELECT s.armor_id, s.skilltree_id, s.level, t.name AS skill_name
+    FROM armor_skill s
+        JOIN armor a ON a.id = s.armor_id
+        LEFT JOIN skilltree_text t ON t.id = s.skilltree_id AND t.lang_id = ?
+    WHERE a.armorset_id = ?
+    ORDER BY s.armor_id, s.skilltree_id
+"""
+
+ARMORSET_BONUS_SKILLS_QUERY = """
+    SELECT b.skilltree_id, b.required, t.name AS skill_name
+    FROM armorset_bonus_skill b
+        LEFT JOIN skilltree_text t ON t.id = b.skilltree_id AND t.lang_id = ?
+    WHERE b.setbonus_id = ?
+    ORDER BY b.required, b.skilltree_id
+"""
+
+SEARCH_QUERY = """
+    SELECT entity_type, id, name, description
+    FROM search_text
+    WHERE search_text MATCH ? AND lang_id = ?{types_filter}
+    ORDER BY rank
+    LIMIT ?
+"""
+
+# The trigram index can't match less than 3 characters, so shorter queries scan the table
+SEARCH_SHORT_QUERY = """
+    SELECT entity_type, id, name, description
+    FROM search_text
+    WHERE lang_id = ?{types_filter} AND (instr(lower(name), lower(?)) > 0{description_filter})
+    ORDER BY length(name)
+    LIMIT ?
+"""
+
+def _fetch_one(connection, sql, params):
+    row = connection.execute(sql, params).fetchone()
+    return dict(row) if row is not None else None
+
+def _fetch_all(connection, sql, params):
+    return [dict(row) for row in connection.execute(sql, params)]
+
+class MHWDatabase:
+    """Runs the common lookups against a built database file, opened read only.
+
+    Results are plain dictionaries, and are kept in an LRU cache of cache_size entries
+    keyed by (query, params, lang). The same result object is returned for repeated calls,
+    so callers must copy a result before modifying it.
+    Results are None if the entity doesn't exist or has no text in that language.
+    """
+
+    def __init__(self, filename, *, pool_size=4, cache_size=1024):
+        self.pool = ConnectionPool(filename, size=pool_size)
+        self.cache = LRUCache(cache_size)
+
+    def _cached(self, query_name, params, lang, query_fn):
+        key = (query_name, params, lang)
+        def create():
+            with self.pool.connection() as connection:
+                return query_fn(connection, lang, *params)
+        return self.cache.get_or_create(key, create)
+
+    def item(self, item_id, lang='en'):
+        "Returns an item and its text"
+        return self._cached('item', (item_id,), lang, self._query_item)
+
+    def monster(self, monster_id, lang='en'):
+        "Returns a monster and its text, with its hitzones, breaks and rewards"
+        return self._cached('monster', (monster_id,), lang, self._query_monster)
+
+    def weapon_tree(self, weapon_type, lang='en'):
+        """Returns the weapons of a weapon type as a list of trees.
+        Each weapon has a children list of the weapons upgraded from it.
+        The roots are the weapons that are not upgraded from another weapon."""
+        return self._cached('weapon_tree', (weapon_type,), lang, self._query_weapon_tree)
+
+    def armorset(self, armorset_id, lang='en'):
+        "Returns an armor set and its text, with its armor pieces and their skills, and its set bonus skills"
+        return self._cached('armorset', (armorset_id,), lang, self._query_armorset)
+
+    def search(self, query, lang='en', *, types=None, descriptions=False, limit=50):
+        """Searches names containing query, for a database built with a search table.
+        Returns a list of results with the entity_type, id, name and description of each match,
+        with the best matches first.
+
+        types is an entity type or a list of them to limit the results to: 'item', 'monster', 'weapon', 'armor',
+        'armorset', 'skilltree', 'quest', 'decoration', 'charm', 'kinsect', 'tool' or 'location'.
+        Raises a ValueError for unknown types.
+        If descriptions is set, descriptions are searched as well."""
+        if isinstance(types, str):
+            types = [types]
+        if types:
+            unknown = [t for t in types if t not in search_types]
+            if unknown:
+                raise ValueError(f"Unknown search types {', '.join(map(repr, unknown))}")
+
+        query = query.strip()
+        if not query:
+            return []
+        params = (query, tuple(types) if types else None, descriptions, limit)
+        return self._cached('search', params, lang, self._query_search)
+
+    def close(self):
+        self.pool.close()
+        self.cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _query_search(connection, lang, query, types, descriptions, limit):
+        types_filter = ''
+        types_params = ()
+        if types:
+            types_filter = f" AND entity_type IN ({', '.join('?' * len(types))})"
+            types_params = types
+
+        if len(query) < 3:
+            description_filter = ''
+            query_params = (query,)
+            if descriptions:
+                description_filter = " OR instr(lower(description), lower(?)) > 0"
+                query_params = (query, query)
+            sql = SEARCH_SHORT_QUERY.format(types_filter=types_filter, description_filter=description_filter)
+            return _fetch_all(connection, sql, (lang, *types_params, *query_params, limit))
+
+        # The query is matched as a single quoted phrase, so FTS syntax is not interpreted
+        phrase = '"' + query.replace('"', '""') + '"'
+        match = phrase if descriptions else 'name : ' + phrase
+        sql = SEARCH_QUERY.format(types_filter=types_filter)
+        return _fetch_all(connection, sql, (match, lang, *types_params, limit))
+
+    @staticmethod
+    def _query_item(connection, lang, item_id):
+        return _fetch_one(connection, ITEM_QUERY, (lang, item_id))
+
+    @staticmethod
+    def _query_monster(connection, lang, monster_id):
+        monster = _fetch_one(connection, MONSTER_QUERY, (lang, monster_id))
+        if monster is None:
+            return None
+
+        monster['hitzones'] = _fetch_all(connection, MONSTER_HITZONES_QUERY, (lang, monster_id))
+        monster['breaks'] = _fetch_all(connection, MONSTER_BREAKS_QUERY, (lang, monster_id))
+        monster['rewards'] = _fetch_all(connection, MONSTER_REWARDS_QUERY, (lang, monster_id))
+        return monster
+
+    @staticmethod
+    def _query_weapon_tree(connection, lang, weapon_type):
+        weapons = _fetch_all(connection, WEAPON_TREE_QUERY, (lang, weapon_type))
+        weapons_by_id = {}
+        for weapon in weapons:
+            weapon['children'] = []
+            weapons_by_id[weapon['id']] = weapon
+
+        roots = []
+        for weapon in weapons:
+            parent = weapons_by_id.get(weapon['previous_weapon_id'], None)
+            if parent is not None:
+                parent['children'].append(weapon)
+            else:
+                roots.append(weapon)
+        return roots
+
+    @staticmethod
+    def _query_armorset(connection, lang, armorset_id):
+        armorset = _fetch_one(connection, ARMORSET_QUERY, (lang, armorset_id))
+        if armorset is None:
+            return None
+
+        armor = _fetch_all(connection, ARMORSET_ARMOR_QUERY, (lang, armorset_id))
+        armor_by_id = {}
+        for piece in armor:
+            piece['skills'] = []
+            armor_by_id[piece['id']] = piece
+
+        for skill in _fetch_all(connection, ARMORSET_SKILLS_QUERY, (lang, armorset_id)):
+            armor_by_id[skill.pop('armor_id')]['skills'].append(skill)
+
+        armorset['armor'] = armor
+        armorset['bonus_skills'] = []
+        if armorset['armorset_bonus_id'] is not None:
+            bonus_params = (lang, armorset['armorset_bonus_id'])
+            armorset['bonus_skills'] = _fetch_all(connection, ARMORSET_BONUS_SKILLS_QUERY, bonus_params)
+        return armorset
@@ -0,0 +1,68 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+def get_readonly_uri(filename):
+    """Returns the sqlite URI to open a database file read only.
+    The file is opened as immutable, so SQLite skips all locking and change detection.
+    The file must not be modified while it is open."""
+    return Path(filename).resolve().as_uri() + '?mode=ro&immutable=1'
+
+class ConnectionPool:
+    """A pool of read only sqlite connections to a database file, usable from multiple threads.
+
+    Connections are created as needed up to size, and afterwards callers wait for one to be returned.
+    Each connection keeps its own cache of prepared statements, so queries executed with the same
+    SQL string are only compiled once per connection.
+    """
+
+    def __init__(self, filename, *, size=4, cached_statements=128):
+        self.uri = get_readonly_uri(filename)
+        self.size = size
+        self.cached_statements = cached_statements
+
+        self._idle = queue.LifoQueue()
+        self._connections = []
+        self._lock = threading.Lock()
+
+        # Open the first connection right away, so that a missing file fails here
+        self._idle.put(self._connect())
+
+    def _connect(self):
+        connection = sqlite3.connect(self.uri, uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements)
+        connection.row_factory = sqlite3.Row
+        self._connections.append(connection)
+        return connection
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._connections) < self.size:
+                return self._connect()
+
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self):
+        "Context manager that borrows a connection from the pool, returning it on exit"
+        connection = self._acquire()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    def close(self):
+        "Closes every connection of the pool. Connections must not be in use"
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+            self._idle = queue.LifoQueue()
@@ -3,7 +3,8 @@ This module contains mapppings to read and write from the database.
 Use recreate_database if you want to start a build.
 
 Feel free to copy this module if you want to run queries from your own project.
+To run the common lookups against a built database, use mhdata.query instead.
 """
 
-from .functions import recreate_database, session_scope
+from .functions import recreate_database, open_database, merge_database, finalize_database, session_scope
 from .mappings import *
@@ -2,21 +2,103 @@ import os
 
 import sqlalchemy
 import sqlalchemy.orm
+from sqlalchemy.schema import CreateTable
 from contextlib import contextmanager
 
 from .mappings import Base
 
-def recreate_database(output_filename):
-    "Recreates the database file, returning a session manager"
+# Pragmas used while building the database. These trade crash safety for speed,
+# which is fine as a failed build is thrown away and rebuilt anyways.
+build_pragmas = (
+    'PRAGMA journal_mode = MEMORY',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA cache_size = -65536', # negative values are in KiB, so 64MB
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA locking_mode = EXCLUSIVE'
+)
+
+def _set_build_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for pragma in build_pragmas:
+        cursor.execute(pragma)
+    cursor.close()
+
+def recreate_database(output_filename, *, fast=False):
+    """Recreates the database file, returning a session manager.
+
+    If fast is set, connections use the build pragmas and table indexes are not created.
+    Call finalize_database() once all data is loaded to create them.
+    """
     if os.path.exists(output_filename):
         os.remove(output_filename)
-   
+
     dbpath = f'sqlite:///{output_filename}'
     engine = sqlalchemy.create_engine(dbpath, echo=False)
-    Base.metadata.create_all(engine)
+
+    if fast:
+        sqlalchemy.event.listen(engine, 'connect', _set_build_pragmas)
+        with engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                conn.execute(CreateTable(table))
+    else:
+        Base.metadata.create_all(engine)
 
     return sqlalchemy.orm.sessionmaker(bind=engine)
 
+def open_database(output_filename):
+    """Opens an existing database file for an incremental build, returning a session manager.
+    Returns None if the file doesn't exist or is missing any tables, in which case it must be recreated.
+    """
+    if not os.path.exists(output_filename):
+        return None
+
+    dbpath = f'sqlite:///{output_filename}'
+    engine = sqlalchemy.create_engine(dbpath, echo=False)
+
+    with engine.connect() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not engine.dialect.has_table(conn, table.name):
+                engine.dispose()
+                return None
+
+    return sqlalchemy.orm.sessionmaker(bind=engine)
+
+def merge_database(sessionmaker, filename, tables):
+    """Copies every row of the given mapped tables from another database file into this one.
+    The other database must have been created by recreate_database, so that the columns match.
+    All sessions must be closed before calling this."""
+    engine = sessionmaker.kw['bind']
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("ATTACH DATABASE ? AS shard", (filename,))
+        for table in tables:
+            name = table.__tablename__
+            cursor.execute(f'INSERT INTO main."{name}" SELECT * FROM shard."{name}"')
+        connection.commit()
+        cursor.execute("DETACH DATABASE shard")
+        cursor.close()
+    finally:
+        connection.close()
+
+def finalize_database(sessionmaker):
+    """Completes a database created by recreate_database.
+    Creates any deferred indexes, and then runs ANALYZE and VACUUM.
+    All sessions must be closed before calling this."""
+    engine = sessionmaker.kw['bind']
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn)
+        conn.execute('ANALYZE')
+
+    # VACUUM cannot run inside of a transaction
+    with engine.connect() as conn:
+        conn.execution_options(autocommit=True).execute('VACUUM')
+
+    engine.dispose()
+
 # adapted from sqlalchemy docs
 @contextmanager
 def session_scope(sessionmaker):
@@ -765,4 +765,10 @@ class ToolText(Base):
     lang_id = Column(Text, ForeignKey('language.id'), primary_key=True)
     name = Column(Text)
     name_base = Column(Text)
-    description = Column(Text)
\ No newline at end of file
+    description = Column(Text)
+
+class BuildMetadata(Base):
+    "Fingerprints of the data each build category was built from, used for incremental builds"
+    __tablename__ = "build_metadata"
+    category = Column(Text, primary_key=True)
+    fingerprint = Column(Text)
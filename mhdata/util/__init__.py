@@ -84,14 +84,14 @@ def group_fields(obj, groups=[]):
         raise TypeError("groups needs to be a list or tuple")
     
     groups = check_not_grouped(obj, groups)
+    prefixes = tuple(g+'_' for g in groups)
     result = {}
     for key, value in obj.items():
-        group_results = list(filter(lambda g: key.startswith(g+'_'), groups))
-        if not group_results:
+        if not prefixes or not key.startswith(prefixes):
             result[key] = value
             continue
 
-        group_name = group_results[0]
+        group_name = next(g for (g, prefix) in zip(groups, prefixes) if key.startswith(prefix))
         subkey = key[len(group_name)+1:]
         
         group = result.setdefault(group_name, {})
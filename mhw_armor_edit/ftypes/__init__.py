@@ -209,7 +209,12 @@ class StructFile:
 
     @classmethod
     def load(cls, fp):
-        data = bytearray(fp.read())
+        return cls.from_buffer(bytearray(fp.read()))
+
+    @classmethod
+    def from_buffer(cls, data):
+        """Loads from a writable buffer such as a bytearray or mmap, without copying it.
+        Entries read and write their fields in the buffer directly."""
         cls.check_header(data)
         return cls(data)
 
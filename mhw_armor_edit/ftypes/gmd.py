@@ -240,6 +240,11 @@ class Gmd:
 
     @classmethod
     def load(cls, fp):
-        data = bytearray(fp.read())
+        return cls.from_buffer(bytearray(fp.read()))
+
+    @classmethod
+    def from_buffer(cls, data):
+        """Loads from a buffer such as a bytearray or mmap, without copying it.
+        The buffer must support slicing to bytes."""
         cls.check_header(data)
         return cls(data)
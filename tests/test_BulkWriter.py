@@ -0,0 +1,74 @@
+import pytest
+
+import mhdata.sql as db
+from mhdata.build.bulkwriter import BulkWriter
+
+@pytest.fixture()
+def session(tmpdir):
+    sessionbuilder = db.recreate_database(str(tmpdir.join('bulk.db')))
+    session = sessionbuilder()
+    yield session
+    session.close()
+
+def test_writes_rows_on_exit(session):
+    with BulkWriter(session) as writer:
+        writer.add(db.Language, id='en', name='English', is_complete=True)
+        writer.add(db.Language, id='ja', name='Japanese', is_complete=True)
+
+    assert session.query(db.Language).count() == 2, "expected 2 rows to be written"
+
+def test_no_write_on_exception(session):
+    with pytest.raises(ValueError):
+        with BulkWriter(session) as writer:
+            writer.add(db.Language, id='en', name='English')
+            raise ValueError("test")
+
+    assert session.query(db.Language).count() == 0, "expected nothing to be written"
+
+def test_flushes_when_batch_is_full(session):
+    writer = BulkWriter(session, batch_size=2)
+    writer.add(db.Language, id='en', name='English')
+    writer.add(db.Language, id='ja', name='Japanese')
+    writer.add(db.Language, id='fr', name='French')
+
+    assert session.query(db.Language).count() == 2, "expected the first batch to be written"
+    writer.flush()
+    assert session.query(db.Language).count() == 3, "expected all rows to be written"
+
+def test_missing_and_null_use_defaults(session):
+    with BulkWriter(session) as writer:
+        writer.add(db.LocationItem, location_id=1, item_id=1)
+        writer.add(db.LocationItem, location_id=1, item_id=2, nodes=None)
+        writer.add(db.LocationItem, location_id=1, item_id=3, nodes=4)
+
+    nodes = [r.nodes for r in session.query(db.LocationItem).order_by(db.LocationItem.item_id)]
+    assert nodes == [1, 1, 4], "expected missing or null values to use the column default"
+
+def test_ignores_unknown_columns(session):
+    with BulkWriter(session) as writer:
+        writer.add(db.Language, id='en', name='English', not_a_column=5)
+
+    assert session.query(db.Language).count() == 1
+
+def test_translated_rows_per_language(session):
+    with BulkWriter(session, languages=['en', 'ja', 'fr']) as writer:
+        item = { 'name': { 'en': 'Potion', 'ja': '回復薬' }, 'description': { 'en': 'Heals' } }
+        writer.add_translated(db.ItemText, item, ['name', 'description'], id=1)
+
+    rows = session.query(db.ItemText).order_by(db.ItemText.lang_id).all()
+    names = { r.lang_id:r.name for r in rows }
+    assert names == { 'en': 'Potion', 'ja': '回復薬', 'fr': 'Potion' }, "expected a fallback to english"
+    assert all(r.description == 'Heals' for r in rows)
+
+def test_translated_without_fallback(session):
+    with BulkWriter(session, languages=['en', 'ja']) as writer:
+        writer.add_translated(db.ItemText, { 'name': { 'en': 'Potion' } }, ['name'], fallback=False, id=1)
+
+    names = { r.lang_id:r.name for r in session.query(db.ItemText) }
+    assert names == { 'en': 'Potion', 'ja': None }
+
+def test_translated_fields_must_match(session):
+    writer = BulkWriter(session)
+    writer.add_translated(db.ItemText, { 'name': { 'en': 'Potion' } }, ['name'], id=1)
+    with pytest.raises(ValueError):
+        writer.add_translated(db.ItemText, { 'name': { 'en': 'Potion' } }, ['name', 'description'], id=2)
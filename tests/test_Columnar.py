@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from mhdata.io import DataMap
+
+@pytest.fixture()
+def monster_map():
+    map = DataMap()
+    map.insert({
+        'name': { 'en': 'monster1' },
+        'size': 'large',
+        'hitzones': [{ 'fire': 10, 'water': 20 }, { 'fire': 30, 'water': None }]
+    })
+    map.insert({
+        'name': { 'en': 'monster2' },
+        'size': None,
+        'hitzones': [{ 'fire': 50, 'water': 5 }]
+    })
+    return map
+
+def test_entries_to_columns(monster_map):
+    columns = monster_map.to_columns()
+
+    assert columns.dtype.names == ('id', 'name_en', 'size'), "expected lists to be skipped"
+    assert list(columns['id']) == [1, 2]
+    assert list(columns['size']) == ['large', None]
+
+def test_nested_list_to_columns(monster_map):
+    hitzones = monster_map.to_columns('hitzones', parent_key='monster_id')
+
+    assert list(hitzones['monster_id']) == [1, 1, 2]
+    assert hitzones['fire'].dtype == np.int64
+    assert hitzones['fire'][hitzones['monster_id'] == 1].mean() == 20
+
+def test_missing_numbers_become_nan(monster_map):
+    hitzones = monster_map.to_columns('hitzones')
+
+    assert hitzones['water'].dtype == np.float64
+    assert np.isnan(hitzones['water'][1])
+    assert np.nanmax(hitzones['water']) == 20
+
+def test_selected_fields(monster_map):
+    hitzones = monster_map.to_columns('hitzones', fields=['water'])
+    assert hitzones.dtype.names == ('parent_id', 'water')
@@ -1,4 +1,5 @@
 import pytest
+import pickle
 
 from mhdata.io import DataMap, merge_list
 
@@ -131,4 +132,131 @@ def test_merge_on_multikey_single():
     merge_list(datamap, merge_data, many=False)
 
     assert datamap.entry_of("en", "test", "great-sword")['attack'] == 25
-    assert datamap.entry_of("en", "test", "bow")['attack'] == 10
\ No newline at end of file
+    assert datamap.entry_of("en", "test", "bow")['attack'] == 10
+
+def test_merge_reuses_base_index():
+    datamap = DataMap()
+    datamap.insert(create_test_entry_en("test1"))
+    datamap.insert(create_test_entry_en("test2"))
+
+    base_indexes = {}
+    merge_list(datamap, [{ 'base_name_en': 'test1', 'name_en': 'renamed', 'attack': 25 }],
+        key='attack_data', base_indexes=base_indexes)
+    merge_list(datamap, [{ 'name_en': 'test2', 'defense': 10 }],
+        key='defense_data', base_indexes=base_indexes)
+
+    assert list(base_indexes.keys()) == [('name_en',)], "expected one index for both merges"
+    assert datamap.entry_of('en', 'test1')['attack_data'] == { 'name_en': 'renamed', 'attack': 25 }
+    assert datamap.entry_of('en', 'test2')['defense_data'] == { 'defense': 10 }
+
+def test_pickled_map_continues_ids():
+    datamap = DataMap()
+    datamap.add_entry(25, create_test_entry_en('test1'))
+
+    unpickled = pickle.loads(pickle.dumps(datamap))
+    new_entry = unpickled.insert(create_test_entry_en('test2'))
+
+    assert unpickled.entry_of('en', 'test1').id == 25
+    assert new_entry.id == 26, "expected id generation to continue after unpickling"
+
+def test_index_lookup():
+    map = DataMap()
+    map.insert(create_test_entry_en("test1", { 'rarity': 5 }))
+    map.insert(create_test_entry_en("test2", { 'rarity': 8 }))
+    map.create_index('rarity')
+    map.insert(create_test_entry_en("test3", { 'rarity': 5 }))
+
+    names = [e.name('en') for e in map.lookup('rarity', 5)]
+    assert names == ['test1', 'test3'], "expected rows before and after index creation"
+    assert map.lookup('rarity', 3) == []
+
+def test_index_on_nested_field():
+    map = DataMap()
+    map.insert(create_test_entry_en("test1"))
+    map.create_index('name_en')
+
+    assert map.lookup('name_en', 'test1')[0].id == 1
+
+def test_index_updates_on_change_and_delete():
+    map = DataMap()
+    map.insert(create_test_entry_en("test1", { 'rarity': 5 }))
+    map.insert(create_test_entry_en("test2", { 'rarity': 5 }))
+    map.create_index('rarity')
+    map.create_index(lambda e: e['rarity'] * 2, name='double')
+
+    map[1]['rarity'] = 6
+    del map[2]
+
+    assert map.lookup('rarity', 5) == []
+    assert [e.id for e in map.lookup('rarity', 6)] == [1]
+    assert [e.id for e in map.lookup('double', 12)] == [1]
+
+def test_index_ignores_removed_rows():
+    map = DataMap()
+    map.insert(create_test_entry_en("test1", { 'rarity': 5 }))
+    map.create_index('rarity')
+    entry = map.pop(1)
+    entry['rarity'] = 6
+
+    assert map.lookup('rarity', 6) == []
+
+def test_ordered_index_range():
+    map = DataMap()
+    for rarity in [8, 3, 5, 6, None, 5]:
+        map.insert(create_test_entry_en(f"test{len(map)}", { 'rarity': rarity }))
+    map.create_index('rarity', ordered=True)
+
+    rarities = [e['rarity'] for e in map.range('rarity', 5, 8)]
+    assert rarities == [5, 5, 6, 8]
+    assert [e.id for e in map.range('rarity', high=3)] == [2]
+    assert [e.id for e in map.lookup('rarity', 5)] == [3, 6]
+
+def test_range_requires_ordered_index():
+    map = DataMap()
+    map.create_index('rarity')
+    with pytest.raises(ValueError):
+        map.range('rarity', 1, 2)
+
+def test_max_id_tracks_adds_and_removes():
+    map = DataMap()
+    assert map.max_id == 0, "expected an empty map to have max id 0"
+
+    map.add_entry(5, create_test_entry_en("test1"))
+    map.add_entry(2, create_test_entry_en("test2"))
+    map.add_entry(9, create_test_entry_en("test3"))
+    assert map.max_id == 9
+
+    del map[9]
+    assert map.max_id == 5, "expected max id to fall back after removing the max"
+
+def test_generated_ids_never_reuse_removed_ids():
+    map = DataMap()
+    map.insert(create_test_entry_en("test1"))
+    map.insert(create_test_entry_en("test2"))
+    del map[2]
+
+    new_entry = map.insert(create_test_entry_en("test3"))
+    assert new_entry.id == 3
+
+def test_rows_with_same_keys_share_layout():
+    map = DataMap()
+    entry1 = map.insert(create_test_entry_en("test1", { 'a': 1 }))
+    entry2 = map.insert(create_test_entry_en("test2", { 'a': 2 }))
+    assert entry1._layout is entry2._layout
+
+    entry2['b'] = 3
+    assert entry1._layout is not entry2._layout
+    assert 'b' not in entry1
+    assert list(entry2.keys()) == ['id', 'name', 'a', 'b']
+
+    del entry2['b']
+    assert entry1._layout is entry2._layout
+
+def test_row_nested_key_lookup():
+    map = DataMap()
+    entry = map.insert(create_test_entry({ 'en': 'test1', 'ja': 'test1j' }))
+
+    assert entry['name_ja'] == 'test1j'
+    assert entry.get('name_fr') is None
+    with pytest.raises(KeyError):
+        entry['other_en']
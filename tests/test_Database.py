@@ -0,0 +1,28 @@
+import sqlite3
+
+import mhdata.sql as db
+
+def get_index_names(fname):
+    with sqlite3.connect(fname) as conn:
+        results = conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")
+        return set(r[0] for r in results)
+
+def test_fast_database_defers_indexes(tmpdir):
+    fname = str(tmpdir.join('fast.db'))
+    sessionbuilder = db.recreate_database(fname, fast=True)
+    assert not get_index_names(fname), "indexes should not exist before finalize"
+
+    with db.session_scope(sessionbuilder) as session:
+        session.add(db.Language(id='en', name='English'))
+
+    db.finalize_database(sessionbuilder)
+    assert 'ix_location_item_item_id' in get_index_names(fname), "indexes should exist after finalize"
+
+def test_fast_database_has_same_indexes(tmpdir):
+    fast_fname = str(tmpdir.join('fast.db'))
+    db.finalize_database(db.recreate_database(fast_fname, fast=True))
+
+    normal_fname = str(tmpdir.join('normal.db'))
+    db.recreate_database(normal_fname)
+
+    assert get_index_names(fast_fname) == get_index_names(normal_fname)
@@ -0,0 +1,85 @@
+import pytest
+
+from marshmallow import Schema
+
+from mhdata.load import schema
+from mhdata.load.decoder import get_decoder
+
+def marshmallow_load(schema_obj, data, many=False):
+    "Loads data using marshmallow directly, bypassing the compiled decoder"
+    return Schema.load(schema_obj, data, many=many)
+
+def test_all_schemas_compile():
+    for name in dir(schema):
+        value = getattr(schema, name)
+        if isinstance(value, type) and issubclass(value, schema.BaseSchema):
+            assert get_decoder(value) is not None, f"expected {name} to compile"
+
+def test_matches_marshmallow_for_groups_and_defaults():
+    data = [
+        { 'id': '1', 'name_en': 'Potion', 'name_ja': '回復薬', 'description_en': 'Heals', 'category': 'item', 'rarity': '1' },
+        { 'id': '2', 'name_en': 'Mega Potion', 'category': 'item', 'rarity': None, 'icon_color': None }
+    ]
+    expected = marshmallow_load(schema.ItemSchema(), data, many=True)
+    result = schema.ItemSchema().load(data, many=True)
+
+    assert result == expected
+    assert not result.errors
+    assert list(result.data[0].keys()) == list(expected.data[0].keys()), "expected the same key order"
+
+def test_matches_marshmallow_for_nested_prefixes():
+    data = {
+        'key': 'test', 'weapon_type': 'bow', 'deviation': 'none', 'special': 'none',
+        'normal1_clip': '3', 'normal1_rapid': 'TRUE', 'normal1_recoil': None, 'normal1_reload': 'fast',
+        'normal2_clip': '2', 'normal2_rapid': None, 'normal2_recoil': '1', 'normal2_reload': 'normal'
+    }
+    expected = marshmallow_load(schema.WeaponAmmoSchema(), data)
+    result = schema.WeaponAmmoSchema().load(data)
+
+    assert result == expected
+    assert result.data['normal1'] == { 'clip': 3, 'rapid': True, 'recoil': None, 'reload': 'fast' }
+
+def test_matches_marshmallow_for_nested_lists():
+    data = {
+        'id': 1, 'name': { 'en': 'Great Jagras' },
+        'weaknesses': [{ 'fire': '2' }],
+        'hitzones': [
+            { 'hitzone_en': 'Head', 'cut': '70', 'impact': '75', 'shot': '65', 'fire': '5',
+              'water': '10', 'thunder': '15', 'ice': '20', 'dragon': '5', 'ko': '100' }
+        ],
+        'rewards': [],
+        'pitfall_trap': 'TRUE', 'shock_trap': None
+    }
+    expected = marshmallow_load(schema.MonsterSchema(), data)
+    result = schema.MonsterSchema().load(data)
+
+    assert result == expected
+    assert result.data['shock_trap'] is False, "expected null_is_false bools to default to False"
+
+def test_invalid_data_reports_marshmallow_errors():
+    data = { 'id': '1', 'name_en': 'Potion', 'category': 'not-a-category', 'rarity': 'abc' }
+    expected = marshmallow_load(schema.ItemSchema(), data)
+    result = schema.ItemSchema().load(data)
+
+    assert result.errors, "expected errors"
+    assert result.errors == expected.errors
+
+def test_schema_validators_run():
+    data = {
+        'id': '1', 'name_en': 'Test Jewel', 'slot': '1', 'rarity': '5',
+        'skill1_name': 'Attack Boost', 'skill1_level': '1',
+        'skill2_name': 'Guard', 'skill2_level': None,
+        'chances': {}
+    }
+    result = schema.DecorationSchema().load(data)
+    assert result.errors, "expected the skill2 validator to fail"
+
+def test_decoder_bugs_are_raised(monkeypatch):
+    decoder = get_decoder(schema.ItemSchema)
+    def broken_decode(rows):
+        raise AttributeError("bug in the decoder")
+    monkeypatch.setattr(decoder, 'decode_rows', broken_decode)
+
+    data = { 'id': '1', 'name_en': 'Potion', 'category': 'item', 'rarity': '1' }
+    with pytest.raises(AttributeError):
+        schema.ItemSchema().load(data)
@@ -0,0 +1,45 @@
+import pytest
+
+from Crypto.Cipher import Blowfish
+
+from mhdata.binary.parsers import decrypt
+
+KEY = b'TestKey0123456789'
+
+def swap_words(data):
+    return b''.join(data[i:i+4][::-1] for i in range(0, len(data), 4))
+
+def capcom_encrypt(data, key):
+    "Reference encryption, the inverse of the Capcom decryption scheme"
+    cipher = Blowfish.new(key, Blowfish.MODE_ECB)
+    return swap_words(cipher.encrypt(swap_words(data)))
+
+def test_endianness_reversal():
+    assert decrypt.endianness_reversal(b'\x01\x02\x03\x04\x05\x06\x07\x08') == b'\x04\x03\x02\x01\x08\x07\x06\x05'
+    assert decrypt.endianness_reversal(b'\x01\x02\x03\x04\x05\x06') == b'\x04\x03\x02\x01\x06\x05'
+    assert decrypt.endianness_reversal(b'') == b''
+
+def test_decrypt_roundtrip(tmp_path):
+    plaintext = bytes(range(256)) * 4
+    encrypted = capcom_encrypt(plaintext, KEY)
+    assert decrypt.CapcomBlowfish(encrypted, KEY) == plaintext
+
+    paths = []
+    for i in range(3):
+        path = tmp_path / f'file{i}.bin'
+        path.write_bytes(capcom_encrypt(plaintext[i*8:], KEY))
+        paths.append(path)
+
+    assert decrypt.decrypt_file(paths[0], KEY) == plaintext
+    results = list(decrypt.decrypt_files(paths, KEY))
+    assert [path for (path, _) in results] == paths
+    assert [data for (_, data) in results] == [plaintext[i*8:] for i in range(3)]
+
+def test_decrypt_requires_whole_blocks(tmp_path):
+    with pytest.raises(ValueError):
+        decrypt.CapcomBlowfish(b'\x00' * 12, KEY)
+
+    path = tmp_path / 'partial.bin'
+    path.write_bytes(b'\x00' * 12)
+    with pytest.raises(ValueError):
+        decrypt.decrypt_file(path, KEY)
@@ -0,0 +1,80 @@
+import pytest
+import json
+
+from mhdata.io import DataReader
+from mhdata.load import cache
+
+def save_json(obj, path):
+    with open(path, 'w') as f:
+        json.dump(obj, f)
+
+@pytest.fixture()
+def reader(tmpdir, monkeypatch):
+    "Returns a reader pointed to a temporary directory, with the cache stored alongside it"
+    monkeypatch.setattr(cache, 'cache_path', str(tmpdir.join('cache')))
+    return DataReader(
+        data_path=str(tmpdir),
+        languages=['en']
+    )
+
+@pytest.fixture()
+def counting_loader(reader):
+    "Returns a loader reading test.json and extra.json (if it exists), that counts its calls"
+    def loader():
+        loader.calls += 1
+        data = reader.load_json('test.json')
+        try:
+            data.update(reader.load_json('extra.json'))
+        except FileNotFoundError:
+            pass
+        return data
+    loader.calls = 0
+    return loader
+
+def test_tracks_requested_files(reader):
+    save_json({}, reader.get_data_path('test.json'))
+
+    with reader.track_files() as files:
+        reader.load_json('test.json')
+
+    assert files == { reader.get_data_path('test.json') }
+
+def test_cache_reused_if_unchanged(reader, counting_loader):
+    save_json({ 'a': 1 }, reader.get_data_path('test.json'))
+
+    first = cache.load_cached('test', counting_loader, reader)
+    second = cache.load_cached('test', counting_loader, reader)
+
+    assert counting_loader.calls == 1, "expected the second load to use the cache"
+    assert first == second == { 'a': 1 }
+
+def test_cache_invalidated_on_change(reader, counting_loader):
+    save_json({ 'a': 1 }, reader.get_data_path('test.json'))
+    cache.load_cached('test', counting_loader, reader)
+
+    save_json({ 'a': 2 }, reader.get_data_path('test.json'))
+    result = cache.load_cached('test', counting_loader, reader)
+
+    assert counting_loader.calls == 2, "expected a changed file to reload"
+    assert result == { 'a': 2 }
+
+def test_cache_invalidated_on_new_file(reader, counting_loader):
+    save_json({ 'a': 1 }, reader.get_data_path('test.json'))
+    cache.load_cached('test', counting_loader, reader)
+
+    save_json({ 'b': 2 }, reader.get_data_path('extra.json'))
+    result = cache.load_cached('test', counting_loader, reader)
+
+    assert counting_loader.calls == 2, "expected a previously missing file to reload"
+    assert result == { 'a': 1, 'b': 2 }
+
+def test_cache_ignores_corrupt_file(reader, counting_loader):
+    save_json({ 'a': 1 }, reader.get_data_path('test.json'))
+    cache.load_cached('test', counting_loader, reader)
+
+    with open(cache._get_cache_file('test'), 'wb') as f:
+        f.write(b'garbage')
+
+    result = cache.load_cached('test', counting_loader, reader)
+    assert counting_loader.calls == 2
+    assert result == { 'a': 1 }
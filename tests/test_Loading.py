@@ -35,3 +35,20 @@ def test_load_base_json_has_auto_ids(loader_mock, basedata):
 
     idval = bmap.id_of('ja', 'test2j')
     assert idval == 2, "expected auto id to have value 2"
+
+def test_iter_csv_streams_rows(tmpdir, capsys):
+    from mhdata.io.csv import iter_csv
+    path = str(tmpdir.join('test.csv'))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("id,name_en,extra\n1,test1,\n\n2, test2 ,x\n3\n")
+
+    rows = iter_csv(path)
+    assert next(rows) == { 'id': '1', 'name_en': 'test1', 'extra': None }, "expected empty values to be None"
+    assert capsys.readouterr().out == '', "expected warnings only after reading the file"
+
+    remaining = list(rows)
+    assert remaining == [
+        { 'id': '2', 'name_en': ' test2 ', 'extra': 'x' },
+        { 'id': '3', 'name_en': None, 'extra': None }
+    ]
+    assert "(2, 2)" in capsys.readouterr().out, "expected a warning for the untrimmed cell"
@@ -0,0 +1,96 @@
+import sqlite3
+import pytest
+
+import mhdata.sql as db
+from mhdata.build.bulkwriter import BulkWriter
+from mhdata.build.search import build_search_table
+from mhdata.query import MHWDatabase, LRUCache
+
+@pytest.fixture()
+def dbfile(tmpdir):
+    fname = str(tmpdir.join('query.db'))
+    sessionbuilder = db.recreate_database(fname)
+    with db.session_scope(sessionbuilder) as session:
+        with BulkWriter(session, languages=['en', 'ja']) as writer:
+            writer.add(db.Item, id=1, category='item', rarity=1)
+            writer.add_translated(db.ItemText, { 'name': { 'en': 'Potion', 'ja': '回復薬' } }, ['name'], id=1)
+
+            writer.add(db.Monster, id=1, order_id=1, size='large')
+            writer.add_translated(db.MonsterText, { 'name': { 'en': 'Rathian' } }, ['name'], id=1)
+            writer.add(db.MonsterHitzone, id=1, monster_id=1, cut=45)
+            writer.add_translated(db.MonsterHitzoneText, { 'name': { 'en': 'Head' } }, ['name'], id=1)
+            writer.add(db.MonsterReward, monster_id=1, condition_id=1, rank='LR', item_id=1, stack=1, percentage=10)
+            writer.add_translated(db.MonsterRewardConditionText, { 'name': { 'en': 'Carve' } }, ['name'], id=1)
+
+            for (weapon_id, previous_id) in [(1, None), (2, 1), (3, 1), (4, None)]:
+                writer.add(db.Weapon, id=weapon_id, order_id=weapon_id, weapon_type='bow', previous_weapon_id=previous_id)
+                writer.add_translated(db.WeaponText, { 'name': { 'en': f'Bow {weapon_id}' } }, ['name'], id=weapon_id)
+    build_search_table(sessionbuilder)
+    sessionbuilder.kw['bind'].dispose()
+    return fname
+
+def test_item_by_language(dbfile):
+    with MHWDatabase(dbfile) as mhw:
+        assert mhw.item(1, 'ja')['name'] == '回復薬'
+        assert mhw.item(1, 'en')['name'] == 'Potion'
+        assert mhw.item(5) is None
+
+def test_monster_includes_children(dbfile):
+    with MHWDatabase(dbfile) as mhw:
+        monster = mhw.monster(1)
+        assert monster['name'] == 'Rathian'
+        assert [h['name'] for h in monster['hitzones']] == ['Head']
+        assert monster['rewards'][0]['item_name'] == 'Potion'
+        assert monster['rewards'][0]['condition_name'] == 'Carve'
+
+def test_weapon_tree(dbfile):
+    with MHWDatabase(dbfile) as mhw:
+        roots = mhw.weapon_tree('bow')
+        assert [w['id'] for w in roots] == [1, 4]
+        assert [w['id'] for w in roots[0]['children']] == [2, 3]
+
+def test_results_are_cached(dbfile):
+    with MHWDatabase(dbfile) as mhw:
+        assert mhw.item(1) is mhw.item(1), "expected the cached result"
+        assert mhw.item(1, 'ja') is not mhw.item(1), "expected the language to be part of the key"
+        assert mhw.cache.hits == 2
+
+def test_database_is_read_only(dbfile):
+    with MHWDatabase(dbfile) as mhw:
+        with mhw.pool.connection() as connection:
+            with pytest.raises(sqlite3.OperationalError):
+                connection.execute("DELETE FROM item")
+
+def test_missing_file_fails(tmpdir):
+    with pytest.raises(sqlite3.OperationalError):
+        MHWDatabase(str(tmpdir.join('missing.db')))
+
+def test_lru_discards_oldest():
+    cache = LRUCache(2)
+    cache.get_or_create('a', lambda: 1)
+    cache.get_or_create('b', lambda: 2)
+    cache.get_or_create('a', lambda: 1)
+    cache.get_or_create('c', lambda: 3)
+
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache, "expected the least recently used entry to be discarded"
+
+def test_search_substring(dbfile):
+    with MHWDatabase(dbfile) as mhw:
+        assert [(r['entity_type'], r['id']) for r in mhw.search('otio')] == [('item', 1)]
+        assert [r['name'] for r in mhw.search('回復薬', 'ja')] == ['回復薬']
+        assert len(mhw.search('bow')) == 4, "expected the search to be case insensitive"
+
+def test_search_short_query(dbfile):
+    with MHWDatabase(dbfile) as mhw:
+        assert [r['name'] for r in mhw.search('回復', 'ja')] == ['回復薬']
+        assert [r['name'] for r in mhw.search('4')] == ['Bow 4']
+
+def test_search_types(dbfile):
+    with MHWDatabase(dbfile) as mhw:
+        assert mhw.search('Rathian', types=['item']) == []
+        assert [r['entity_type'] for r in mhw.search('Rathian', types=['item', 'monster'])] == ['monster']
+        assert [r['entity_type'] for r in mhw.search('Rathian', types='monster')] == ['monster']
+
+        with pytest.raises(ValueError):
+            mhw.search('Rathian', types=['monsters'])
@@ -0,0 +1,18 @@
+from mhdata.binary.load import bcore
+from mhdata.binary.load import quest_bload
+
+def test_find_quest_files_in_id_order(tmp_path):
+    names = [('event', 'questData_90001.mib'), ('low', 'questData_00101.mib'),
+        ('high', 'questData_01001.mib'), ('low', 'questData_00502.mib')]
+    for folder, name in names:
+        (tmp_path / folder).mkdir(exist_ok=True)
+        (tmp_path / folder / name).write_bytes(b'')
+
+    paths = quest_bload.find_quest_files(tmp_path)
+    assert [quest_bload.get_quest_id(p) for p in paths] == [101, 502, 1001, 90001]
+
+def test_load_quests_without_quests(tmp_path, monkeypatch):
+    (tmp_path / 'quest').mkdir()
+    monkeypatch.setattr(bcore, 'CHUNK_DIRECTORY', str(tmp_path))
+    assert quest_bload.load_quests() == []
+    assert quest_bload.load_quests(workers=2) == []
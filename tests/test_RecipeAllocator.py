@@ -0,0 +1,19 @@
+from mhdata.build.recipes import RecipeAllocator
+
+def test_identical_recipes_share_id():
+    recipes = RecipeAllocator()
+    first_id = recipes.id({ 1: 2, 5: 1 })
+    second_id = recipes.id({ 7: 1 })
+
+    assert recipes.id({ 5: 1, 1: 2 }) == first_id, "expected item order to not matter"
+    assert first_id != second_id
+    assert recipes.recipes == { first_id: { 1: 2, 5: 1 }, second_id: { 7: 1 } }
+
+def test_different_quantities_are_different_recipes():
+    recipes = RecipeAllocator()
+    assert recipes.id({ 1: 2 }) != recipes.id({ 1: 3 })
+
+def test_empty_recipe_has_no_id():
+    recipes = RecipeAllocator()
+    assert recipes.id({}) is None
+    assert not recipes.recipes
@@ -73,3 +73,39 @@ def test_save_data_csv_symmetric_listmode(writer: DataReaderWriter):
     abc = new_data.to_dict()
 
     assert extdata.to_dict() == new_data.to_dict(), "expected data to match"
+
+def test_stitcher_reads_on_get(writer):
+    basedata = DataMap()
+    basedata.add_entry(1, create_entry_en('test1'))
+
+    extdata = DataMap()
+    extdata.add_entry(1, { **basedata[1], 'data': [{'a': 'test1'}] })
+    writer.save_data_csv('testdatalazy.csv', extdata, key='data')
+
+    stitcher = (DataStitcher(writer)
+        .use_base(basedata.copy())
+        .add_csv('testdatalazy.csv', key='data')
+        .add_csv('missing.csv', key='missing'))
+
+    # missing.csv would raise if it were read
+    new_data = stitcher.get(fields=['data'])
+    assert new_data[1]['data'] == [{'a': 'test1'}]
+    assert 'missing' not in new_data[1]
+
+def test_stitcher_joins_on_merged_columns(writer):
+    basedata = DataMap()
+    basedata.add_entry(1, create_entry_en('test1'))
+    basedata.add_entry(2, create_entry_en('test2'))
+
+    # The keyless attachment adds the base_ column the next attachment joins on
+    writer.save_csv('testoldnames.csv', [{ 'id': 1, 'base_name_en': 'old1' }, { 'id': 2, 'base_name_en': 'old2' }])
+    writer.save_csv('testolddata.csv', [{ 'name_en': 'old2', 'value': 'x' }])
+
+    new_data = (DataStitcher(writer)
+        .use_base(basedata)
+        .add_csv_ext('testoldnames.csv')
+        .add_csv_ext('testolddata.csv', key='data')
+        .get())
+
+    assert new_data[2]['data'] == { 'value': 'x' }
+    assert 'data' not in new_data[1]
@@ -0,0 +1,114 @@
+import struct
+import pytest
+
+from mhdata.binary.parsers import structreader as sr
+
+class Entry(sr.AnnotatedStruct):
+    id: sr.uint()
+    kind: sr.MappedValue(sr.ubyte(), { 0: 'a', 1: 'b' })
+    values: sr.blist(sr.ushort(), 3)
+
+class Container(sr.AnnotatedStruct):
+    magic: sr.short()
+    pair: sr.blist(Entry(), 2)
+    entries: sr.DynamicList(Entry)
+    trailer: sr.int()
+
+def pack_entry(entry_id, kind, values):
+    return struct.pack('<IB3H', entry_id, kind, *values)
+
+@pytest.fixture()
+def container_data():
+    return (struct.pack('<h', 7) + pack_entry(1, 0, (1, 2, 3)) + pack_entry(2, 1, (4, 5, 6))
+        + struct.pack('<I', 2) + pack_entry(3, 1, (7, 8, 9)) + pack_entry(4, 0, (0, 0, 1))
+        + struct.pack('<i', -5))
+
+def test_fixed_structs_compile_to_one_struct():
+    assert Entry._plan.fixed
+    assert Entry._plan.steps[0][2] == 'IB3H'
+    assert not Container._plan.fixed, "expected the dynamic list to be read on its own"
+
+def test_compiled_read(container_data):
+    result = sr.read_struct(container_data, Container)
+
+    assert result.magic == 7
+    assert [e.as_dict() for e in result.pair] == [
+        { 'id': 1, 'kind': 'a', 'values': [1, 2, 3] },
+        { 'id': 2, 'kind': 'b', 'values': [4, 5, 6] }]
+    assert [e.id for e in result.entries] == [3, 4]
+    assert result.trailer == -5
+    assert result.fields == ['magic', 'pair', 'entries', 'trailer']
+
+def test_matches_field_by_field_read(container_data):
+    compiled = sr.read_struct(container_data, Container)
+
+    plan = Container._plan
+    reader = sr.StructReader(container_data)
+    generic = Container()
+    plan.read_fields(generic, reader, plan.names)
+
+    assert reader.offset == len(container_data)
+    assert compiled.pair[1].as_dict() == generic.pair[1].as_dict()
+    assert compiled.entries[0].as_dict() == generic.entries[0].as_dict()
+
+def test_errors_name_the_field(container_data):
+    with pytest.raises(Exception) as ex:
+        sr.read_struct(container_data[:9], Container)
+    assert str(ex.value) == 'Failed to read prop pair in Container'
+    assert str(ex.value.__cause__) == 'Failed to read prop values in Entry'
+
+def test_invalid_mapped_value():
+    with pytest.raises(Exception) as ex:
+        sr.read_struct(pack_entry(1, 5, (0, 0, 0)), Entry)
+    assert isinstance(ex.value.__cause__, KeyError)
+
+def test_read_array():
+    data = struct.pack('<5I', 10, 20, 30, 40, 50) + struct.pack('<h', -1)
+    reader = sr.StructReader(data)
+    assert reader.read_array(sr.uint, 5) == [10, 20, 30, 40, 50]
+    assert reader.offset == 20
+
+    entries = sr.StructReader(pack_entry(1, 0, (1, 2, 3)) + pack_entry(2, 1, (4, 5, 6))).read_array(Entry(), 2)
+    assert [e.as_dict() for e in entries] == [
+        { 'id': 1, 'kind': 'a', 'values': [1, 2, 3] },
+        { 'id': 2, 'kind': 'b', 'values': [4, 5, 6] }]
+    assert entries[0] is not entries[1]
+
+def test_dynamic_list_errors_name_the_entry():
+    data = struct.pack('<I', 2) + pack_entry(3, 1, (7, 8, 9)) + pack_entry(4, 5, (0, 0, 1))
+    reader = sr.StructReader(data)
+    with pytest.raises(Exception) as ex:
+        sr.DynamicList(Entry).read(reader)
+    assert str(ex.value) == 'Failed to read list with 2 entries - failed at entry 1'
+    assert str(ex.value.__cause__) == 'Failed to read prop kind in Entry'
+
+def make_kire(path, entries):
+    data = struct.pack('<IHI', 0, 0x01C1, len(entries))
+    for entry in entries:
+        data += struct.pack('<I7H', *entry)
+    path.write_bytes(data)
+
+@pytest.mark.parametrize('mapped', [True, False])
+def test_load_schema_copy_on_write(tmp_path, monkeypatch, mapped):
+    from mhdata.binary.load import bcore
+    from mhw_armor_edit.ftypes import kire
+
+    monkeypatch.setattr(bcore, 'CHUNK_DIRECTORY', str(tmp_path))
+    make_kire(tmp_path / 'test.kire', [(1, 10, 20, 30, 40, 50, 60, 70), (2, 1, 2, 3, 4, 5, 6, 7)])
+    original = (tmp_path / 'test.kire').read_bytes()
+
+    data = bcore.load_schema(kire.Kire, 'test.kire', mapped=mapped)
+    assert isinstance(data.data, bytearray) != mapped, "expected only mapped loads to keep the file open"
+    assert [e.id for e in data.entries] == [1, 2]
+    assert data.entries[1].purple == 7
+
+    data.modified_cb = lambda modified: None
+    data.entries[1].purple = 100
+    assert data.entries[1].purple == 100
+    assert (tmp_path / 'test.kire').read_bytes() == original
+
+def test_read_struct_from_mapped_file(tmp_path):
+    path = tmp_path / 'entry.bin'
+    path.write_bytes(pack_entry(1, 1, (4, 5, 6)))
+    result = sr.read_struct_from_file(path, Entry)
+    assert result.as_dict() == { 'id': 1, 'kind': 'b', 'values': [4, 5, 6] }
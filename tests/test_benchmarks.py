@@ -0,0 +1,26 @@
+from benchmarks import StageResult, save_results, load_results, compare_results
+from benchmarks.stages import measure
+
+def test_measure_stage():
+    result = measure('test', lambda: 5)
+    assert result.name == 'test'
+    assert result.rows == 5
+    assert result.wall >= 0
+
+def test_results_roundtrip(tmpdir):
+    fname = str(tmpdir.join('results', 'baseline.json'))
+    results = [StageResult('load.item_map', 0.5, 1024, 100), StageResult('validate.items', 0.1)]
+    save_results(fname, results)
+
+    loaded = load_results(fname)
+    assert [r.to_dict() for r in loaded] == [r.to_dict() for r in results]
+    assert [r.name for r in loaded] == ['load.item_map', 'validate.items'], "expected the order to be kept"
+
+def test_flags_regressions():
+    baseline = [StageResult('slower', 1.0), StageResult('same', 1.0), StageResult('tiny', 0.02),
+        StageResult('noisy', 0.5, spread=0.2)]
+    results = [StageResult('slower', 1.5), StageResult('same', 1.1), StageResult('tiny', 0.06),
+        StageResult('noisy', 0.65), StageResult('new', 5.0)]
+
+    regressions = compare_results(baseline, results, threshold=0.2)
+    assert [r.name for (r, _) in regressions] == ['slower'], "expected noise and new stages to be ignored"
@@ -16,6 +16,16 @@ def mhdata():
 def test_validates(mhdata_raw):
     assert validate(mhdata_raw), "Validation should have succeeded"
 
+def test_parallel_load_matches(mhdata_raw):
+    mhdata_parallel = load_data(workers=2)
+
+    assert list(vars(mhdata_parallel).keys()) == list(vars(mhdata_raw).keys())
+    for name, value in vars(mhdata_raw).items():
+        parallel_value = getattr(mhdata_parallel, name)
+        if hasattr(value, 'to_dict'):
+            value, parallel_value = value.to_dict(), parallel_value.to_dict()
+        assert value == parallel_value, f"Expected {name} to match"
+
 def test_builds_sql(tmpdir, mhdata):
     "Integration test to ensure the database builds"
 
@@ -25,3 +35,77 @@ def test_builds_sql(tmpdir, mhdata):
 
     dbexists = os.path.exists(fname)
     assert dbexists, 'Database should have been created'
+
+def test_parallel_build_matches(tmpdir, mhdata):
+    import sqlite3
+
+    def dump(fname):
+        with sqlite3.connect(fname) as conn:
+            tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+            return { t:conn.execute(f'SELECT * FROM "{t}" ORDER BY rowid').fetchall() for t in tables }
+
+    serial_fname = str(tmpdir.join('serial.sql'))
+    parallel_fname = str(tmpdir.join('parallel.sql'))
+    build.build_sql_database(serial_fname, mhdata)
+    build.build_sql_database(parallel_fname, mhdata, workers=2)
+
+    assert dump(serial_fname) == dump(parallel_fname), "expected the same rows in the same order"
+
+def test_build_categories_cover_all_tables():
+    import mhdata.sql as db
+    from mhdata.build.sql import build_categories
+
+    shared = { db.Language, db.RecipeItem, db.BuildMetadata }
+    category_tables = [t for c in build_categories for t in c.tables]
+    assert len(category_tables) == len(set(category_tables)), "tables should belong to one category"
+
+    all_tables = set(m.__table__ for m in db.Base._decl_class_registry.values() if hasattr(m, '__table__'))
+    assert set(t.__table__ for t in category_tables) | set(t.__table__ for t in shared) == all_tables
+
+def test_incremental_build_rebuilds_changed_data(tmpdir, mhdata, capsys):
+    import sqlite3
+
+    fname = str(tmpdir.join('tmpdb.sql'))
+    build.build_sql_database(fname, mhdata, fingerprint=True)
+
+    weapon = next(e for e in mhdata.weapon_map.values() if e.get('craft'))
+    weapon['craft'][0]['item1_qty'] = 99
+
+    capsys.readouterr()
+    build.build_sql_database(fname, mhdata, incremental=True)
+    output = capsys.readouterr().out
+    assert "Built Weapons" in output
+    assert "Built Items" not in output, "expected unchanged categories to be skipped"
+
+    with sqlite3.connect(fname) as conn:
+        orphans = conn.execute(
+            "SELECT count(*) FROM recipe_item WHERE recipe_id NOT IN (" +
+            "SELECT create_recipe_id FROM weapon UNION SELECT upgrade_recipe_id FROM weapon " +
+            "UNION SELECT recipe_id FROM armor UNION SELECT recipe_id FROM charm " +
+            "UNION SELECT recipe_id FROM kinsect)").fetchone()
+    assert orphans == (0,), "expected the old weapon recipes to be removed"
+
+def test_builds_derived_tables(tmpdir, mhdata):
+    import sqlite3
+    from mhdata import cfg
+
+    fname = str(tmpdir.join('tmpdb.sql'))
+    build.build_sql_database(fname, mhdata, lookups=True, search=True)
+
+    with sqlite3.connect(fname) as conn:
+        count = lambda sql: conn.execute(sql).fetchone()[0]
+        assert count("SELECT count(*) FROM lookup_monster_reward") == \
+            count("SELECT count(*) FROM monster_reward") * len(cfg.supported_languages)
+
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM lookup_item_source " +
+            "WHERE item_id = 1 AND lang_id = 'en'").fetchall()
+        assert 'USING PRIMARY KEY' in plan[0][-1], "expected an index only lookup"
+
+        assert count("SELECT count(*) FROM search_text WHERE search_text MATCH 'potion'") > 0
+
+    # Derived tables would be stale after an incremental build without them
+    build.build_sql_database(fname, mhdata, incremental=True)
+    with sqlite3.connect(fname) as conn:
+        tables = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        assert 'lookup_item_source' not in tables
+        assert 'search_text' not in tables